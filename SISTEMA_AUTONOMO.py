@@ -3,60 +3,70 @@
 # Este archivo es el jefe que nunca duerme.
 # Cambia su velocidad: corre mucho si hay peligro, y descansa si no pasa nada.
 
+import sys  # Para leer las opciones de arranque.
 import time  # Para saber la hora.
-import json  # Para leer la memoria del robot.
 import asyncio  # Para hacer varias cosas a la vez (asíncrono).
+import argparse  # Para las opciones de la línea de comandos.
 from datetime import datetime  # Para saber el día exacto.
 
+# Si nos piden el perfil de arranque, el cronómetro se engancha ANTES de importar nada más.
+PERFILAR_ARRANQUE = "--profile-startup" in sys.argv
+if PERFILAR_ARRANQUE:
+    from nucleo.perfil_arranque import PERFIL
+    PERFIL.iniciar()
+
 # Importamos el cerebro y la boca del robot.
-from nucleo.orquestador_agentes import CEREBRO_ZEROX  # El cerebro inteligente.
+# Las librerías pesadas (LangGraph, CCXT, web3) se cargan solas la primera vez que hacen falta.
+from nucleo.orquestador_agentes import obtener_cerebro  # El cerebro inteligente (se compila al primer uso).
+from nucleo.orquestador_agentes import cerrar_estadisticas, cerrar_auditor  # Lo que hay que cerrar al salir.
 from nucleo.sentidos import Comunicador  # La boca para hablar por Discord.
+from nucleo.flujo_mercado import DespertadorMercado, crear_fuente  # El oído que nos despierta.
+from nucleo.memoria_estado import GestorEstado  # La memoria a prueba de apagones.
 import config  # Las instrucciones secretas.
 
-def cargar_estado():
-    """
-    Lee el archivo 'estado_bot.json' para recordar qué estaba haciendo.
-    Es como leer un diario al despertarse.
-    """
-    try:
-        # Intentamos abrir el archivo de memoria.
-        with open("estado_bot.json", "r") as f:
-            return json.load(f)  # Devuelve lo que recuerda.
-    except FileNotFoundError:
-        # Si no encuentra el diario, empieza de cero con 15 euros y sin posiciones.
-        return {"capital": 15.0, "posiciones": []}
-
-def guardar_estado(estado):
-    """
-    Escribe en el diario lo que ha pasado para no olvidarlo.
-    """
-    # Abrimos el archivo para escribir (w = write).
-    with open("estado_bot.json", "w") as f:
-        json.dump(estado, f, indent=4)  # Lo guarda bonito y ordenado.
+if PERFILAR_ARRANQUE:
+    PERFIL.marcar("módulos del sistema importados")
 
-async def ciclo_vida():
+async def ciclo_vida(perfilar_arranque: bool = False):
     """
     LA RUTINA PRINCIPAL (EL ALMA DEL ROBOT).
     Aquí el robot decide si corre (Scalping) o camina (Escaneo).
+    Con perfilar_arranque=True se para tras la primera decisión e imprime el perfil de arranque.
     """
     print("🚀 SISTEMA ZEROX: Iniciando motores de Alta Frecuencia...")
     
-    # Preparamos la boca para hablar.
+    # Despertamos la memoria: última foto + diario de cambios (solo se lee del disco aquí).
+    # (La primera vez se trae la foto de cuando vivía suelta en la raíz del proyecto.)
+    memoria = GestorEstado(config.RUTA_ESTADO, ruta_heredada="estado_bot.json")
+
+    # Preparamos la boca para hablar (con cartero en segundo plano: avisar nunca nos frena).
     comunicador = Comunicador()
+    comunicador.iniciar_despachador()
     comunicador.enviar_alerta("🟢 ZEROX ONLINE: Sistema de Frecuencia Dinámica activado.")
 
+    # Preparamos el oído: si hay fuente en directo, despertamos por eventos.
+    # El temporizador de siempre queda como red de seguridad.
+    fuente = crear_fuente()
+    despertador = None
+    if fuente is not None:
+        despertador = DespertadorMercado(fuente)
+        despertador.iniciar()
+        print(f"📡 Oído activado ({config.MODO_DESPERTAR}): despertamos al cerrar vela o con movimientos de {config.UMBRAL_DESPERTAR_PCT}%.")
+
+    cerebro = None  # Se compila en la primera vuelta (no al importar).
+
     # Bucle Infinito: Esto no para nunca.
     while True:
         try:
             # 1. Miramos la hora.
             ahora = datetime.now().strftime("%H:%M:%S")
             
-            # 2. Leemos la memoria para saber si tenemos dinero en juego.
-            memoria = cargar_estado()
+            # 2. Miramos la memoria (en RAM) para saber si tenemos dinero en juego.
+            posiciones = memoria.obtener("posiciones", [])
             
             # Buscamos si hay algo en la lista de "posiciones" (inversiones abiertas).
             # Si la lista tiene cosas (len > 0), es que estamos jugando.
-            tengo_posiciones = len(memoria.get("posiciones", [])) > 0
+            tengo_posiciones = len(posiciones) > 0
 
             # 3. DECIDIMOS LA VELOCIDAD (FRECUENCIA DINÁMICA).
             if tengo_posiciones:
@@ -74,15 +84,19 @@ async def ciclo_vida():
 
             # 4. PREPARAMOS LOS DATOS PARA EL CEREBRO.
             inputs = {
-                "capital_real": memoria.get("capital", 15.0), # Cuánto dinero tenemos.
+                "capital_real": memoria.obtener("capital", 15.0), # Cuánto dinero tenemos.
                 "decision": orden_cerebro, # Qué queremos que haga.
-                "posiciones": memoria.get("posiciones", []) # Le pasamos las inversiones actuales.
+                "posiciones": posiciones # Le pasamos las inversiones actuales.
             }
 
             # 5. EJECUTAR EL CEREBRO (PENSAR).
             # Usamos 'await' porque el cerebro es asíncrono.
             print(f"🧠 Cerebro: Ejecutando orden '{orden_cerebro}'...")
-            resultado = await CEREBRO_ZEROX.ainvoke(inputs)
+            if cerebro is None:
+                cerebro = obtener_cerebro()
+                if perfilar_arranque:
+                    PERFIL.marcar("cerebro compilado")
+            resultado = await cerebro.ainvoke(inputs)
             
             # 6. Analizar la respuesta.
             ultima_accion = resultado.get("mensaje", "Sin novedad")
@@ -90,32 +104,53 @@ async def ciclo_vida():
 
             print(f"🤖 Resultado: {decision_final} -> {ultima_accion}")
 
+            # Medimos los reflejos: cuánto tardamos desde el despertar hasta decidir.
+            if despertador is not None:
+                latencia_ms = despertador.registrar_decision(resultado.get("precio_actual"))
+                print(f"⚡ Reflejos: {latencia_ms:.1f} ms desde el despertar hasta la decisión.")
+
             # 7. Si pasó algo importante, avisamos por Discord.
             if decision_final in ["CALCULAR_RIESGO", "AUDITAR", "CERRAR_POSICION", "ABORTAR"]:
                  comunicador.enviar_alerta(f"📢 {modo}: {ultima_accion}")
 
             # 8. Guardamos los cambios en la memoria.
             # Si el cerebro nos devuelve un capital nuevo o posiciones nuevas, actualizamos.
-            cambios_importantes = False
+            # Solo se apunta en el diario lo que ha cambiado de verdad.
+            cambios = {}
             if "capital_real" in resultado:
-                memoria["capital"] = resultado["capital_real"]
-                cambios_importantes = True
+                cambios["capital"] = resultado["capital_real"]
             if "posiciones" in resultado: # Si el cerebro abre/cierra posiciones.
-                memoria["posiciones"] = resultado["posiciones"]
-                cambios_importantes = True
+                cambios["posiciones"] = resultado["posiciones"]
             
-            if cambios_importantes:
-                guardar_estado(memoria)
+            if cambios:
+                memoria.actualizar(**cambios)
+
+            # Modo perfil: con la primera decisión ya sabemos lo que cuesta arrancar.
+            if perfilar_arranque:
+                PERFIL.marcar(f"primera decisión ({decision_final})")
+                PERFIL.detener()
+                print(PERFIL.informe())
+                break
 
             # 9. A DORMIR.
-            print(f"💤 Durmiendo {tiempo_dormir} segundos...")
-            await asyncio.sleep(tiempo_dormir)
+            if despertador is not None:
+                # Dormimos con un ojo abierto: nos despierta el mercado o el temporizador.
+                print(f"💤 Durmiendo hasta {tiempo_dormir} segundos (o hasta que el mercado se mueva)...")
+                motivo = await despertador.esperar(tiempo_dormir)
+                print(f"⏰ Despertado por: {motivo}")
+            else:
+                print(f"💤 Durmiendo {tiempo_dormir} segundos...")
+                await asyncio.sleep(tiempo_dormir)
 
         except KeyboardInterrupt:
             # Si pulsamos Ctrl+C para apagarlo.
             print("\n🛑 APAGANDO SISTEMA...")
             comunicador.enviar_alerta("🔴 ZEROX OFF: Sistema detenido manualmente.")
             break 
+
+        except asyncio.CancelledError:
+            # Si nos cancelan desde fuera, paramos igual que con Ctrl+C.
+            break
             
         except Exception as e:
             # Si el robot se marea (Error).
@@ -125,15 +160,48 @@ async def ciclo_vida():
                 comunicador.enviar_alerta(error_msg)
             except:
                 pass # Si no hay internet, no hacemos nada.
+
+            # Modo perfil: no hay primera decisión que esperar. Enseñamos lo medido hasta el fallo y salimos.
+            if perfilar_arranque:
+                PERFIL.marcar(f"error antes de la primera decisión ({type(e).__name__})")
+                PERFIL.detener()
+                print(PERFIL.informe())
+                break
             
             # Si hay error, esperamos 1 minuto y probamos otra vez.
             print("🔄 Reiniciando en 60 segundos...")
             await asyncio.sleep(60)
 
+    # Dejamos la memoria en una foto limpia antes de salir (y las estadísticas, si llegaron a cargarse).
+    memoria.cerrar()
+    cerrar_estadisticas()
+
+    # Apagamos el oído antes de salir.
+    if despertador is not None:
+        print(f"📊 Reflejos finales: {despertador.metricas()}")
+        await despertador.detener()
+
+    # Cerramos las conexiones del auditor con los nodos RPC (si llegó a auditar algo).
+    await cerrar_auditor()
+
+    # Entregamos los avisos pendientes antes de apagar.
+    await comunicador.detener_despachador()
+
+    # Colgamos la línea con el exchange de forma ordenada (si es que llegamos a abrirla).
+    sesion_exchange = sys.modules.get("nucleo.sesion_exchange")
+    if sesion_exchange is not None:
+        print(f"📊 Centralita: {sesion_exchange.REGISTRO_EXCHANGES.metricas()}")
+        await sesion_exchange.REGISTRO_EXCHANGES.cerrar_todos()
+
 # PUNTO DE ARRANQUE.
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ZEROX: el sistema autónomo de trading.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mide lo que tarda cada módulo en importarse y hasta la primera decisión, y sale.")
+    argumentos = parser.parse_args()
+
     # Arrancamos el bucle asíncrono.
     try:
-        asyncio.run(ciclo_vida())
+        asyncio.run(ciclo_vida(perfilar_arranque=argumentos.profile_startup))
     except KeyboardInterrupt:
         pass
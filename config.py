@@ -35,3 +35,87 @@ SYMBOL = "SOL/USDT"  # Operamos Solana porque es rápido y barato
 TIMEFRAME = "15m"    # Velas de 15 minutos
 MONTO_APUESTA = 15.0 # Jugamos con 15 USD (o lo que permita la cuenta)
 LEVERAGE = 5         # Apalancamiento x5 (Cuidado aquí)
+# Tope del margen de UNA posición (fracción de la cuenta). None = sin tope propio: el riesgo lo fija
+# Kelly (máx. 20% de la cuenta por stop) y el margen total nunca pasa del capital.
+LIMITE_MARGEN_POSICION = None
+# La memoria del robot (foto + diario) vive en 'datos/', que Docker monta entero:
+# así el diario sobrevive a recrear el contenedor y la foto se puede renombrar de forma atómica.
+RUTA_ESTADO = "datos/estado_bot.json"
+
+# --- 6. DESPERTADOR POR EVENTOS (REFLEJOS) ---
+# STREAM = escuchar el WebSocket del exchange, REPLAY = velas grabadas (pruebas),
+# TEMPORIZADOR = dormir a ciegas como antes.
+MODO_DESPERTAR = os.getenv("ZEROX_MODO_DESPERTAR", "STREAM")
+UMBRAL_DESPERTAR_PCT = 0.5  # Si el precio se mueve un 0.5% desde la última decisión, despertamos.
+ARCHIVO_REPLAY = os.getenv("ZEROX_ARCHIVO_REPLAY", "")  # Velas grabadas para el modo REPLAY.
+PAUSA_REPLAY = 1.0  # Segundos entre velas del replay.
+PAUSA_SONDEO = 10.0  # Sin WebSocket (ccxt.pro), cada cuánto preguntamos por las velas por REST.
+
+# --- 7. CENTRALITA DEL EXCHANGE (CONEXIÓN COMPARTIDA) ---
+CARPETA_CACHE = "cache"       # Aquí guardamos cosas que no queremos volver a descargar.
+TTL_MERCADOS = 6 * 3600       # La lista de mercados caduca a las 6 horas.
+KEEPALIVE_EXCHANGE = 1200     # Segundos que mantenemos viva la conexión (más que el MODO TORTUGA).
+
+# --- 8. RADAR MULTIMERCADO (ESCÁNER CONCURRENTE) ---
+# Universo a vigilar. Se puede ampliar desde el .env: ZEROX_UNIVERSO="SOL/USDT,BTC/USDT,ETH/USDT"
+UNIVERSO_SIMBOLOS = [s.strip() for s in os.getenv("ZEROX_UNIVERSO", SYMBOL).split(",") if s.strip()]
+UNIVERSO_TIMEFRAMES = [t.strip() for t in os.getenv("ZEROX_TIMEFRAMES", TIMEFRAME).split(",") if t.strip()]
+MAX_CONCURRENCIA_ESCANER = 32  # Cuántos mercados miramos a la vez como máximo.
+PETICIONES_POR_SEGUNDO = 10    # Presupuesto compartido de peticiones al exchange.
+VELAS_ESCANER = 100            # Velas que descargamos por mercado en cada barrido.
+
+# --- 9. ALMACÉN DE VELAS (HISTORIA LOCAL) ---
+CARPETA_VELAS = "datos/velas"  # Una carpeta por exchange/símbolo/temporalidad, una columna por archivo.
+TIMEFRAME_BASE = "15m"         # Lo único que se descarga: 1h/4h/1d se sacan de aquí (nucleo/multi_temporalidad.py).
+
+# --- 10. WALK-FORWARD (EXAMEN DEL LABORATORIO) ---
+TIMEFRAME_LABORATORIO = TIMEFRAME_BASE  # Temporalidad del torneo ('1h', '4h'... se sacan de las velas base).
+VELAS_LABORATORIO = 20000     # Velas de esa temporalidad para el torneo (de 15m, ~7 meses; el almacén solo baja lo nuevo).
+WF_VELAS_ENTRENO = 4000       # Velas de cada ventana de entrenamiento (~6 semanas).
+WF_VELAS_PRUEBA = 1000        # Velas de cada ventana de prueba (~10 días).
+WF_PASO = None                # Cuánto avanzan las ventanas (None = lo mismo que la prueba).
+WF_ANCLADA = False            # True = el entrenamiento siempre empieza en la primera vela y crece.
+WF_MIN_VENTANAS_GANADORAS = 0.6  # Fracción de ventanas de prueba que deben ganar dinero.
+
+# --- 11. SIMULADOR DE OPERACIONES (COSTES REALES) ---
+COMISION_TAKER = 0.0006   # 0.06% por lado (comisión taker de futuros en Bitget).
+DESLIZAMIENTO = 0.0005    # 0.05% de precio peor al entrar y al salir (mercado).
+RATIO_OBJETIVO = 2.0      # Take profit a 2 veces la distancia del stop (el mismo ratio que usa Kelly).
+MAX_VELAS_OPERACION = 96  # Si en 96 velas (1 día de 15m) no pasa nada, cerramos por tiempo.
+
+# --- 12. AUDITOR EVM (POLICÍA DE CONTRATOS) ---
+AUDITOR_TTL_INFORME = 3600  # Un informe vale 1 hora... mientras el código del contrato no cambie.
+AUDITOR_TTL_CODIGO = 60     # Cada cuánto volvemos a pedir el código para ver si ha cambiado (proxies).
+RPC_TIMEOUT = 10            # Segundos máximos por petición al nodo.
+RPC_CONEXIONES = 8          # Conexiones HTTP abiertas por nodo (sesión compartida).
+# Grupo de nodos para el auditor concurrente (el más rápido y fiable va primero).
+# Se puede cambiar desde el .env: ZEROX_RPC_BASE="https://nodo1,https://nodo2"
+RPC_BASE_NODOS = [u.strip() for u in os.getenv(
+    "ZEROX_RPC_BASE", f"{RPC_BASE},https://base-rpc.publicnode.com,https://base.llamarpc.com").split(",") if u.strip()]
+RPC_COBERTURA_MAX = 0.5     # Segundos máximos antes de lanzar la misma petición a un segundo nodo.
+AUDITORIAS_CONCURRENTES = 16  # Auditorías en vuelo a la vez como máximo.
+AUDITOR_RIESGO_MAXIMO = 100   # Riesgo del análisis de bytecode a partir del cual se rechaza sin simular.
+
+# --- 13. MONTE CARLO DE RUINA (AFINAR LAS FASES DE KELLY) ---
+MC_CAMINOS = 1_000_000      # Caminos de capital simulados por configuración.
+MC_OPERACIONES = 500        # Operaciones por camino.
+MC_CAPITAL_MINIMO = 5.0     # Por debajo de esto ya no se puede abrir una orden: ruina.
+MC_DISTANCIA_STOP = 0.01    # Stop típico (2 ATR en 15m) como fracción del precio.
+MC_DISTANCIA_STOP_ANCHA = 0.03  # Stop ancho: ahí el margen ya no iguala las fases y se ve su factor Kelly.
+MC_PROB_HUECO = 0.02        # De las pérdidas, cuántas saltan el stop con hueco...
+MC_HUECO = 3.0              # ...y cuántas veces la distancia del stop se pierde entonces.
+
+# --- 14. ESTADÍSTICAS EN VIVO DE CADA ESTRATEGIA (LO QUE ALIMENTA A KELLY) ---
+ESTADISTICAS_RUTA = "datos/estadisticas_estrategias.json"  # Foto + diario propios (misma memoria a prueba de apagones).
+ESTADISTICAS_DECAIMIENTO = 0.995  # Peso que conserva lo anterior en cada operación (1.0 = sin olvido; 0.995 ≈ vida media de 140).
+ESTADISTICAS_PESO_PREVIO = 20     # Cuántas operaciones "vale" lo que midió el laboratorio antes de operar en vivo.
+ESTADISTICAS_Z = 1.64             # Confianza de las cotas (1.64 = 90% a dos colas).
+ESTADISTICAS_CONSERVADOR = True   # Kelly usa la cota baja del acierto y del ratio, no el valor central.
+
+# --- 15. CACHÉ DE DECISIONES DEL CEREBRO IA ---
+CACHE_DECISIONES_RUTA = "datos/decisiones.sqlite"  # SQLite local (sobrevive a los reinicios).
+CACHE_DECISIONES_TTL = 300          # Segundos que vale una decisión (el mercado cambia).
+CACHE_DECISIONES_CAPACIDAD = 5000   # Decisiones guardadas como máximo (se echan las menos usadas).
+CACHE_DECISIONES_PASO = 0.002       # Números a menos de un 0.2% son la misma situación.
+CACHE_DECISIONES_PASO_SALDO = 0.05  # El saldo, más grueso: un 5%.
+CACHE_DECISIONES_IGNORAR = ("timestamp", "hora", "fecha")  # Claves que cambian siempre y no cuentan.
@@ -0,0 +1,309 @@
+# nucleo/almacen_velas.py
+# 🗄️ EL ALMACÉN DE VELAS (HISTORIA LOCAL EN COLUMNAS)
+# Antes el Laboratorio descargaba las mismas 1000 velas en cada ejecución y el Scout no guardaba nada.
+# Ahora todas las velas viven en disco, una carpeta por exchange/símbolo/temporalidad,
+# con una columna por archivo (binario puro que se puede mapear en memoria sin copiarlo).
+# Al sincronizar solo se piden al exchange las velas NUEVAS y los huecos que falten.
+
+import os  # Para carpetas y tamaños de archivo.
+import json  # Para el archivo de metadatos.
+import time  # Para saber qué hora es en milisegundos.
+
+import numpy as np  # Las columnas son arrays de NumPy mapeados en disco.
+import pandas as pd  # Para entregar tablas a quien las quiera.
+import ccxt  # Solo para traducir '15m' a segundos.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config  # Las instrucciones secretas.
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+from nucleo.sesion_exchange import REGISTRO_EXCHANGES  # La línea compartida con el exchange.
+
+# Columnas que guardamos y su tipo (little-endian explícito para que el disco sea portable).
+COLUMNAS = {
+    "timestamp": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+
+
+def timeframe_a_ms(timeframe: str) -> int:
+    """Traduce '15m', '1h', '1d'... a milisegundos."""
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+class AlmacenVelas:
+    """
+    Almacén columnar de velas OHLCV.
+    - 'anexar' añade al final (rápido) o mezcla si llegan velas antiguas (rellenar huecos).
+    - 'leer' devuelve vistas de NumPy mapeadas en disco (sin copiar).
+    - 'sincronizar' pide al exchange solo lo que falta desde la última vela guardada.
+    """
+
+    def __init__(self, carpeta: str = None, exchange_id: str = None):
+        self.carpeta = carpeta or config.CARPETA_VELAS
+        self.exchange_id = exchange_id or config.EXCHANGE_ID
+
+    # --- RUTAS Y METADATOS ---
+
+    def _ruta(self, simbolo: str, timeframe: str) -> str:
+        # 'SOL/USDT:USDT' no es un nombre de carpeta válido: cambiamos los caracteres raros.
+        nombre = simbolo.replace("/", "_").replace(":", "-")
+        return os.path.join(self.carpeta, self.exchange_id, nombre, timeframe)
+
+    def _leer_meta(self, ruta: str) -> dict:
+        try:
+            with open(os.path.join(ruta, "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"filas": 0, "huecos_vacios": []}
+
+    def _guardar_meta(self, ruta: str, meta: dict):
+        # El número de filas se escribe DESPUÉS de los datos y de forma atómica:
+        # si nos apagan a mitad, las filas a medias simplemente no cuentan.
+        temporal = os.path.join(ruta, "meta.json.tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporal, os.path.join(ruta, "meta.json"))
+
+    # --- LECTURA (SIN COPIAS) ---
+
+    def filas(self, simbolo: str, timeframe: str) -> int:
+        return self._leer_meta(self._ruta(simbolo, timeframe))["filas"]
+
+    def leer(self, simbolo: str, timeframe: str, desde: int = None, hasta: int = None, ultimas: int = None) -> dict:
+        """
+        Devuelve {columna: array} con vistas de solo lectura mapeadas en disco.
+        'desde'/'hasta' son timestamps en ms (hasta incluido); 'ultimas' recorta al final.
+        """
+        ruta = self._ruta(simbolo, timeframe)
+        n = self._leer_meta(ruta)["filas"]
+        if n == 0:
+            return {col: np.empty(0, dtype=tipo) for col, tipo in COLUMNAS.items()}
+
+        columnas = {
+            col: np.memmap(os.path.join(ruta, f"{col}.bin"), dtype=tipo, mode="r", shape=(n,))
+            for col, tipo in COLUMNAS.items()
+        }
+
+        # Buscamos el rango con búsqueda binaria sobre los timestamps (están ordenados).
+        ts = columnas["timestamp"]
+        inicio = 0 if desde is None else int(np.searchsorted(ts, desde, side="left"))
+        fin = n if hasta is None else int(np.searchsorted(ts, hasta, side="right"))
+        if ultimas is not None:
+            inicio = max(inicio, fin - ultimas)
+        return {col: arr[inicio:fin] for col, arr in columnas.items()}
+
+    def leer_df(self, simbolo: str, timeframe: str, desde: int = None, hasta: int = None, ultimas: int = None) -> pd.DataFrame:
+        """Igual que 'leer', pero en forma de tabla con las columnas de siempre."""
+        columnas = self.leer(simbolo, timeframe, desde, hasta, ultimas)
+        return pd.DataFrame(columnas, copy=False)
+
+    def ultimo_timestamp(self, simbolo: str, timeframe: str):
+        ts = self.leer(simbolo, timeframe, ultimas=1)["timestamp"]
+        return int(ts[0]) if len(ts) else None
+
+    def huecos(self, simbolo: str, timeframe: str) -> list:
+        """
+        Lista de huecos [(primer_ts_que_falta, ultimo_ts_que_falta), ...].
+        Ignora los huecos que ya sabemos que el exchange no puede rellenar.
+        """
+        paso = timeframe_a_ms(timeframe)
+        ruta = self._ruta(simbolo, timeframe)
+        conocidos = set(self._leer_meta(ruta).get("huecos_vacios", []))
+        ts = self.leer(simbolo, timeframe)["timestamp"]
+        if len(ts) < 2:
+            return []
+        saltos = np.flatnonzero(np.diff(ts) > paso)
+        return [(int(ts[i]) + paso, int(ts[i + 1]) - paso) for i in saltos if int(ts[i]) + paso not in conocidos]
+
+    # --- ESCRITURA ---
+
+    def anexar(self, simbolo: str, timeframe: str, velas) -> int:
+        """
+        Guarda velas (lista CCXT o array Nx6). Devuelve cuántas filas nuevas hay.
+        - Camino rápido: todas son iguales o posteriores a la última → se añaden al final
+          (la última vela guardada, que podía estar sin cerrar, se sobrescribe).
+        - Camino lento: llegan velas antiguas → mezclamos, quitamos repetidas y reescribimos.
+        """
+        nuevas = np.asarray(velas, dtype=np.float64).reshape(-1, 6)
+        if len(nuevas) == 0:
+            return 0
+        # Ordenamos y nos quedamos con la última versión de cada timestamp.
+        nuevas = nuevas[np.argsort(nuevas[:, 0], kind="stable")]
+        ts_nuevos = nuevas[:, 0].astype(np.int64)
+        ultima_de_cada = np.append(ts_nuevos[1:] != ts_nuevos[:-1], True)
+        nuevas, ts_nuevos = nuevas[ultima_de_cada], ts_nuevos[ultima_de_cada]
+
+        ruta = self._ruta(simbolo, timeframe)
+        os.makedirs(ruta, exist_ok=True)
+        meta = self._leer_meta(ruta)
+        n = meta["filas"]
+        actuales = self.leer(simbolo, timeframe)
+        ultimo_ts = int(actuales["timestamp"][-1]) if n else None
+
+        if ultimo_ts is None or ts_nuevos[0] >= ultimo_ts:
+            # CAMINO RÁPIDO: añadir al final.
+            del actuales  # Soltamos los mapas antes de tocar los archivos.
+            if ultimo_ts is not None and ts_nuevos[0] == ultimo_ts:
+                n -= 1  # La última vela se reescribe con su versión más reciente.
+            for i, (col, tipo) in enumerate(COLUMNAS.items()):
+                archivo = os.path.join(ruta, f"{col}.bin")
+                datos = ts_nuevos if col == "timestamp" else nuevas[:, i]
+                with open(archivo, "r+b" if os.path.exists(archivo) else "wb") as f:
+                    # Escribimos en su sitio (encima de la vela que reescribimos o de restos a medias),
+                    # sin encoger nunca el archivo: otros pueden tenerlo mapeado y leer de él (SIGBUS).
+                    # Lo que sobre detrás no cuenta: las filas válidas las dice meta.json.
+                    f.seek(n * tipo.itemsize)
+                    f.write(np.ascontiguousarray(datos, dtype=tipo).tobytes())
+            filas_nuevas = n + len(nuevas) - meta["filas"]
+            meta["filas"] = n + len(nuevas)
+        else:
+            # CAMINO LENTO: mezclar con lo que ya había (relleno de huecos).
+            viejas = np.column_stack([np.asarray(actuales[col], dtype=np.float64) for col in COLUMNAS])
+            todas = np.concatenate([viejas, nuevas])
+            ts_todos = todas[:, 0].astype(np.int64)
+            # 'stable' + quedarnos con la última aparición: lo nuevo gana a lo viejo.
+            orden = np.argsort(ts_todos, kind="stable")
+            todas, ts_todos = todas[orden], ts_todos[orden]
+            ultima_de_cada = np.append(ts_todos[1:] != ts_todos[:-1], True)
+            todas, ts_todos = todas[ultima_de_cada], ts_todos[ultima_de_cada]
+            del actuales, viejas  # Soltamos los mapas antes de reescribir los archivos.
+            for i, (col, tipo) in enumerate(COLUMNAS.items()):
+                archivo = os.path.join(ruta, f"{col}.bin")
+                datos = ts_todos if col == "timestamp" else todas[:, i]
+                with open(archivo + ".tmp", "wb") as f:
+                    f.write(np.ascontiguousarray(datos, dtype=tipo).tobytes())
+                os.replace(archivo + ".tmp", archivo)
+            filas_nuevas = len(todas) - meta["filas"]
+            meta["filas"] = len(todas)
+
+        self._guardar_meta(ruta, meta)
+        return filas_nuevas
+
+    def _marcar_hueco_vacio(self, simbolo: str, timeframe: str, inicio_hueco: int):
+        """Apunta que el exchange no tiene velas para este hueco (mercado parado, etc.)."""
+        ruta = self._ruta(simbolo, timeframe)
+        meta = self._leer_meta(ruta)
+        meta.setdefault("huecos_vacios", []).append(int(inicio_hueco))
+        self._guardar_meta(ruta, meta)
+
+    # --- SINCRONIZACIÓN CON EL EXCHANGE ---
+
+    async def _descargar_exchange(self, simbolo: str, timeframe: str, desde: int, limite: int):
+        return await REGISTRO_EXCHANGES.llamar("fetch_ohlcv", simbolo, timeframe, since=desde, limit=limite)
+
+    async def sincronizar(self, simbolo: str, timeframe: str, minimo: int = 1000,
+                          descargar=None, velas_por_peticion: int = 1000) -> int:
+        """
+        Pone al día el almacén pidiendo solo lo que falta:
+        1. Si no hay nada (o hay menos de 'minimo' velas), descargamos hacia atrás.
+        2. Desde la última vela guardada (incluida, porque podía estar sin cerrar) hasta ahora.
+        3. Rellenamos los huecos que hayan quedado en medio.
+        Devuelve cuántas velas nuevas se han guardado.
+        """
+        descargar = descargar or self._descargar_exchange
+        paso = timeframe_a_ms(timeframe)
+        ahora = int(time.time() * 1000)
+        inicio_deseado = (ahora // paso - minimo + 1) * paso
+        nuevas = 0
+
+        async def _pedir_rango(desde: int, hasta: int = None) -> int:
+            """Pide velas por páginas desde 'desde' hasta 'hasta' (o hasta el presente)."""
+            guardadas = 0
+            while True:
+                velas = await descargar(simbolo, timeframe, desde, velas_por_peticion)
+                if hasta is not None:
+                    velas = [v for v in velas if v[0] <= hasta]
+                if not velas:
+                    break
+                guardadas += self.anexar(simbolo, timeframe, velas)
+                siguiente = int(velas[-1][0]) + paso
+                if siguiente <= desde or len(velas) < velas_por_peticion or (hasta is not None and siguiente > hasta):
+                    break
+                desde = siguiente
+            return guardadas
+
+        # 1. Historia hacia atrás si no tenemos suficiente.
+        primero = self.leer(simbolo, timeframe)["timestamp"][:1]
+        if len(primero) == 0:
+            nuevas += await _pedir_rango(inicio_deseado)
+        elif int(primero[0]) > inicio_deseado:
+            nuevas += await _pedir_rango(inicio_deseado, int(primero[0]) - paso)
+
+        # 2. Lo nuevo desde la última vela guardada.
+        ultimo = self.ultimo_timestamp(simbolo, timeframe)
+        if ultimo is not None:
+            nuevas += await _pedir_rango(ultimo)
+
+        # 3. Huecos en medio.
+        for inicio_hueco, fin_hueco in self.huecos(simbolo, timeframe):
+            nuevas += await _pedir_rango(inicio_hueco, fin_hueco)
+            # Lo que siga faltando dentro del hueco (todo o solo un trozo) es que el exchange
+            # no lo tiene: lo apuntamos para no volver a pedirlo en cada sincronización.
+            for inicio_resto, _ in self.huecos(simbolo, timeframe):
+                if inicio_hueco <= inicio_resto <= fin_hueco:
+                    self._marcar_hueco_vacio(simbolo, timeframe, inicio_resto)
+
+        return nuevas
+
+
+# El almacén único del proceso (Scout y Laboratorio leen del mismo sitio).
+ALMACEN_VELAS = AlmacenVelas()
+
+
+# Prueba rápida: exchange falso, sincronización incremental y lecturas sin copia.
+if __name__ == "__main__":
+    import asyncio
+    import tempfile
+
+    paso = timeframe_a_ms("15m")
+    ahora = int(time.time() * 1000) // paso * paso
+    historia = {ahora - i * paso: [ahora - i * paso, 100.0, 101.0, 99.0, 100.5, 10.0] for i in range(5000)}
+    for ts in list(historia)[2000:2010]:
+        historia.pop(ts)  # Dejamos un hueco de 10 velas que el exchange "no tenía" al principio.
+    peticiones = []
+
+    async def _exchange_falso(simbolo, timeframe, desde, limite):
+        peticiones.append(desde)
+        return [historia[ts] for ts in sorted(historia) if ts >= desde][:limite]
+
+    async def _prueba():
+        almacen = AlmacenVelas(carpeta=tempfile.mkdtemp())
+        nuevas = await almacen.sincronizar("SOL/USDT", "15m", minimo=5000, descargar=_exchange_falso)
+        print(f"📥 Primera sincronización: {nuevas} velas en {len(peticiones)} peticiones. Huecos: {len(almacen.huecos('SOL/USDT', '15m'))}")
+
+        peticiones.clear()
+        nuevas = await almacen.sincronizar("SOL/USDT", "15m", minimo=5000, descargar=_exchange_falso)
+        print(f"🔁 Segunda sincronización: {nuevas} velas nuevas en {len(peticiones)} peticiones.")
+
+        # Reescribir la última vela con un lector mapeado vivo: se escribe en su sitio, no se corta el archivo.
+        vivo = almacen.leer("SOL/USDT", "15m")["close"]
+        almacen.anexar("SOL/USDT", "15m", [[ahora, 100.0, 101.0, 99.0, 123.0, 10.0]])
+        assert float(vivo[-1]) == 123.0 and float(vivo.sum()) > 0
+        print("✍️ Última vela reescrita en su sitio con el mapa de memoria abierto ✅")
+
+        # Un hueco que el exchange solo tiene a medias: lo que falta queda apuntado y no se vuelve a pedir.
+        otro = AlmacenVelas(carpeta=tempfile.mkdtemp())
+        orden = sorted(historia)
+        otro.anexar("SOL/USDT", "15m", [historia[ts] for ts in orden[:3000] + orden[3020:]])  # 20 velas sin bajar.
+        for ts in orden[3004:3020]:
+            historia.pop(ts)  # El exchange solo tiene las 4 primeras.
+        await otro.sincronizar("SOL/USDT", "15m", minimo=4980, descargar=_exchange_falso)
+        peticiones.clear()
+        await otro.sincronizar("SOL/USDT", "15m", minimo=4980, descargar=_exchange_falso)
+        assert not otro.huecos("SOL/USDT", "15m")
+        print(f"🕳️ Hueco rellenado a medias: el resto queda apuntado ({len(peticiones)} petición en la siguiente sincronización) ✅")
+
+        inicio = time.perf_counter()
+        df = almacen.leer_df("SOL/USDT", "15m", ultimas=1000)
+        print(f"📖 Leer 1000 velas: {(time.perf_counter() - inicio) * 1e6:.0f} µs. ¿Vista sin copia? {not df['close'].values.flags.owndata}")
+
+    asyncio.run(_prueba())
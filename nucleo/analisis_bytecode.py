@@ -0,0 +1,256 @@
+# nucleo/analisis_bytecode.py
+# 🔬 EL MICROSCOPIO DE BYTECODE (ANÁLISIS ESTÁTICO ANTES DE SIMULAR)
+# El auditor solo miraba que el contrato tuviera código y probaba un 'approve' simulado.
+# Pero muchas trampas se ven en el propio código, sin preguntar nada a la cadena:
+# - Listas negras: el dueño puede bloquear tu dirección y no dejarte vender.
+# - Comisiones modificables: hoy 1%, mañana 99% al vender.
+# - Interruptores de transferencias (pausas, listas blancas, límites por operación).
+# - SELFDESTRUCT: el contrato puede desaparecer.
+# - DELEGATECALL (proxy): el código que se ejecuta de verdad puede cambiar sin que cambie este.
+# - tx.origin: típico de anti-bots y de trampas.
+#
+# Cómo se hace:
+# 1. Se quitan los metadatos CBOR que el compilador pega al final (no son instrucciones).
+# 2. Se desensambla (saltándose los datos de los PUSH) con UNA expresión regular compilada:
+#    cada coincidencia es una instrucción o una racha de instrucciones que no nos interesan,
+#    así que el recorrido va en C y no instrucción a instrucción en Python.
+# 3. Los selectores de funciones son los PUSH4 del despachador: se comparan con las firmas conocidas.
+# 4. Cada rasgo suma riesgo; a partir de AUDITOR_RIESGO_MAXIMO se rechaza sin más llamadas al nodo.
+# El resultado se guarda por hash del código: el mismo bytecode (clones de fábricas) se analiza una vez.
+#
+# OJO: es una criba por nombres de funciones y opcodes. No demuestra que un contrato sea seguro;
+# por eso la simulación del approve sigue siendo la prueba final para los que pasan.
+
+import re  # El desensamblador.
+import threading  # La caché se comparte entre hilos.
+from collections import OrderedDict  # Caché con límite (se olvida lo más antiguo).
+
+from web3 import Web3  # Para calcular los selectores (keccak) de las firmas.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+# Opcodes que nos interesan.
+SELFDESTRUCT = 0xFF
+DELEGATECALL = 0xF4
+CALLCODE = 0xF2
+ORIGIN = 0x32
+PUSH1, PUSH4, PUSH32 = 0x60, 0x63, 0x7F
+
+# Huecos estándar de los proxies actualizables (EIP-1967): implementación y faro.
+HUECOS_PROXY = {
+    bytes.fromhex("360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"),
+    bytes.fromhex("a3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50"),
+}
+
+# Firmas de funciones sospechosas, por rasgo.
+FIRMAS = {
+    "lista_negra": [
+        "blacklist(address)", "addToBlacklist(address)", "removeFromBlacklist(address)",
+        "setBlacklist(address,bool)", "blacklistAddress(address,bool)", "manageBlacklist(address[],bool)",
+        "isBlacklisted(address)", "_isBlacklisted(address)", "addBot(address)", "addBots(address[])",
+        "setBots(address[])", "blockBots(address[])", "setBot(address,bool)", "isBot(address)", "bots(address)",
+    ],
+    "comisiones_mutables": [
+        "setFee(uint256)", "setFees(uint256,uint256)", "setFees(uint256,uint256,uint256)",
+        "setTaxFeePercent(uint256)", "setLiquidityFeePercent(uint256)", "setBuyFee(uint256)",
+        "setSellFee(uint256)", "setBuyTax(uint256)", "setSellTax(uint256)", "setTaxes(uint256,uint256)",
+        "updateFees(uint256,uint256)", "updateBuyFees(uint256,uint256,uint256)",
+        "updateSellFees(uint256,uint256,uint256)",
+    ],
+    "puerta_transferencias": [
+        "setTradingEnabled(bool)", "enableTrading(bool)", "setTrading(bool)", "pause()",
+        "setWhitelist(address,bool)", "setWhitelisted(address,bool)", "setMaxTxAmount(uint256)",
+        "setMaxTxPercent(uint256)", "setMaxWalletSize(uint256)", "setCooldownEnabled(bool)",
+    ],
+}
+
+# Rasgo -> (riesgo, explicación). Con AUDITOR_RIESGO_MAXIMO = 100: SELFDESTRUCT rechaza solo;
+# lista negra + comisiones, o lista negra + proxy, también.
+RASGOS = {
+    "autodestruccion": (100, "SELFDESTRUCT: el contrato puede borrarse"),
+    "lista_negra": (60, "el dueño puede bloquear direcciones (lista negra)"),
+    "proxy": (50, "DELEGATECALL: el código que se ejecuta puede cambiar sin que cambie este"),
+    "comisiones_mutables": (40, "el dueño puede cambiar las comisiones"),
+    "puerta_transferencias": (30, "el dueño puede pausar o limitar las transferencias"),
+    "tx_origin": (20, "usa tx.origin (anti-bots y trampas)"),
+}
+
+
+def selector(firma: str) -> bytes:
+    """Los 4 primeros bytes del keccak de la firma (lo que empuja el PUSH4 del despachador)."""
+    return bytes(Web3.keccak(text=firma)[:4])
+
+
+SELECTORES = {sel: rasgo for rasgo, firmas in FIRMAS.items() for sel in map(selector, firmas)}
+
+# El desensamblador en una expresión regular. Alternativas (en este orden):
+# - Una racha de instrucciones sin interés: opcodes sueltos o PUSHn con sus n bytes de datos.
+# - PUSH4 con su dato (posible selector) o PUSH32 con el suyo (posible hueco de proxy).
+# - Cualquier otro byte suelto: los opcodes que buscamos.
+# Los datos de los PUSH se aceptan incompletos ({0,n}) por si el código acaba a mitad de uno.
+_OPCODES_INTERES = {SELFDESTRUCT, DELEGATECALL, CALLCODE, ORIGIN}
+_SUELTOS = b"".join(re.escape(bytes([b])) for b in range(256)
+                    if not PUSH1 <= b <= PUSH32 and b not in _OPCODES_INTERES)
+_OTROS_PUSH = b"|".join(re.escape(bytes([PUSH1 - 1 + n])) + b".{0,%d}" % n for n in range(1, 33) if n not in (4, 32))
+_INSTRUCCIONES = re.compile(
+    rb"(?s)(?:[" + _SUELTOS + rb"]|" + _OTROS_PUSH + rb")+" + rb"|\x63(.{0,4})|\x7f(.{0,32})|(.)"
+)
+
+
+def quitar_metadatos(codigo: bytes) -> bytes:
+    """Quita los metadatos CBOR del final (los 2 últimos bytes dicen cuánto miden)."""
+    if len(codigo) < 2:
+        return codigo
+    largo = int.from_bytes(codigo[-2:], "big")
+    inicio = len(codigo) - 2 - largo
+    if 0 < largo and inicio >= 0 and codigo[inicio] in (0xA1, 0xA2, 0xA3, 0xA4):
+        return codigo[:inicio]
+    return codigo
+
+
+def desensamblar(codigo: bytes):
+    """(opcodes de interés presentes, datos de los PUSH4, datos de los PUSH32), sin mirar dentro de los datos."""
+    opcodes, push4, push32 = set(), set(), set()
+    for dato4, dato32, suelto in _INSTRUCCIONES.findall(codigo):
+        if suelto:
+            opcodes.add(suelto[0])
+        elif dato4:
+            push4.add(dato4)
+        elif dato32:
+            push32.add(dato32)
+    return opcodes, push4, push32
+
+
+def analizar_bytecode(codigo, riesgo_maximo: int = None) -> dict:
+    """
+    Análisis estático del código desplegado ('0x...' o bytes). Devuelve:
+    rasgos (nombres), riesgo (suma), rechazar (riesgo >= riesgo_maximo), detalles, funciones y bytes.
+    """
+    riesgo_maximo = config.AUDITOR_RIESGO_MAXIMO if riesgo_maximo is None else riesgo_maximo
+    if isinstance(codigo, str):
+        codigo = bytes.fromhex(codigo[2:] if codigo.startswith("0x") else codigo)
+    opcodes, push4, push32 = desensamblar(quitar_metadatos(codigo))
+
+    rasgos = set()
+    if SELFDESTRUCT in opcodes:
+        rasgos.add("autodestruccion")
+    if DELEGATECALL in opcodes or CALLCODE in opcodes or push32 & HUECOS_PROXY:
+        rasgos.add("proxy")
+    if ORIGIN in opcodes:
+        rasgos.add("tx_origin")
+    rasgos.update(SELECTORES[s] for s in push4 & SELECTORES.keys())
+
+    rasgos = sorted(rasgos, key=lambda r: -RASGOS[r][0])
+    riesgo = sum(RASGOS[r][0] for r in rasgos)
+    return {
+        "rasgos": rasgos,
+        "riesgo": riesgo,
+        "rechazar": riesgo >= riesgo_maximo,
+        "detalles": [RASGOS[r][1] for r in rasgos],
+        "funciones": len(push4),  # Aproximado: PUSH4 del despachador (y alguna constante).
+        "bytes": len(codigo),
+    }
+
+
+class AnalizadorBytecode:
+    """analizar_bytecode() con caché por hash del código (los clones se analizan una sola vez)."""
+
+    def __init__(self, capacidad: int = 10_000, riesgo_maximo: int = None):
+        self.capacidad = capacidad
+        self.riesgo_maximo = riesgo_maximo
+        self._cache = OrderedDict()  # hash -> análisis
+        self._candado = threading.Lock()
+        self.analizados = 0
+        self.aciertos = 0
+
+    def analizar(self, codigo, hash_codigo: str = None) -> dict:
+        clave = hash_codigo
+        if clave is None:
+            clave = (Web3.keccak(hexstr=codigo) if isinstance(codigo, str) else Web3.keccak(codigo)).hex()
+        with self._candado:
+            guardado = self._cache.get(clave)
+            if guardado is not None:
+                self._cache.move_to_end(clave)
+                self.aciertos += 1
+                return guardado
+        analisis = analizar_bytecode(codigo, self.riesgo_maximo)
+        with self._candado:
+            self.analizados += 1
+            self._cache[clave] = analisis
+            if len(self._cache) > self.capacidad:
+                self._cache.popitem(last=False)
+        return analisis
+
+
+# Banco de pruebas: 1.000 contratos sintéticos de 4 a 24 KB con forma de código compilado
+# (despachador de PUSH4, muchos PUSH1/PUSH2, metadatos al final), un 20% con trampas.
+if __name__ == "__main__":
+    import time
+    import random
+
+    azar = random.Random(21)
+    NORMALES = [0x01, 0x02, 0x03, 0x10, 0x11, 0x14, 0x15, 0x16, 0x19, 0x1B, 0x33, 0x35, 0x36,
+                0x50, 0x51, 0x52, 0x54, 0x55, 0x56, 0x57, 0x5B, 0x80, 0x81, 0x82, 0x90, 0x91, 0xF3, 0xFD]
+    ERC20 = ["transfer(address,uint256)", "approve(address,uint256)", "transferFrom(address,address,uint256)",
+             "balanceOf(address)", "totalSupply()", "allowance(address,address)", "decimals()", "name()", "symbol()"]
+    TRAMPAS = [
+        ("lista negra + comisiones", [selector("addBots(address[])"), selector("setSellFee(uint256)")], []),
+        ("autodestrucción", [], [SELFDESTRUCT]),
+        ("proxy + lista negra", [selector("blacklist(address)")], [DELEGATECALL]),
+        ("solo comisiones", [selector("setFees(uint256,uint256)")], []),
+    ]
+
+    def contrato(trampa=None) -> str:
+        selectores = [selector(f) for f in ERC20] + (trampa[1] if trampa else [])
+        cuerpo = bytearray()
+        for s in selectores:  # Despachador: DUP1 PUSH4 <selector> EQ PUSH2 <destino> JUMPI
+            cuerpo += bytes([0x80, PUSH4]) + s + bytes([0x14, 0x61]) + azar.randbytes(2) + bytes([0x57])
+        objetivo = azar.randint(4_000, 24_000)
+        while len(cuerpo) < objetivo:
+            r = azar.random()
+            if r < 0.35:
+                cuerpo += bytes([PUSH1]) + azar.randbytes(1)
+            elif r < 0.45:
+                cuerpo += bytes([0x61]) + azar.randbytes(2)
+            elif r < 0.46:
+                cuerpo += bytes([PUSH32]) + azar.randbytes(32)  # Constantes (a veces con bytes 0xff dentro).
+            else:
+                cuerpo.append(azar.choice(NORMALES))
+        for opcode in (trampa[2] if trampa else []):
+            cuerpo.insert(azar.randrange(len(cuerpo) // 2, len(cuerpo)), 0x5B)
+            cuerpo += bytes([0x5B, opcode])
+        metadatos = bytes([0xA2, 0x64]) + b"ipfs" + bytes([0x58, 0x22]) + azar.randbytes(34) + bytes([0x64]) + b"solc" + bytes([0x43, 0, 8, 0x19])
+        return "0x" + (bytes(cuerpo) + metadatos + len(metadatos).to_bytes(2, "big")).hex()
+
+    contratos, esperado = [], []
+    for i in range(1000):
+        trampa = TRAMPAS[i % len(TRAMPAS)] if i % 5 == 0 else None
+        contratos.append(contrato(trampa))
+        esperado.append(trampa[0] if trampa else None)
+    hashes = [Web3.keccak(hexstr=c).hex() for c in contratos]
+    kb = sum(len(c) // 2 - 1 for c in contratos) / 1024
+
+    analizador = AnalizadorBytecode()
+    inicio = time.perf_counter()
+    analisis = [analizador.analizar(c, h) for c, h in zip(contratos, hashes)]
+    frio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for c, h in zip(contratos, hashes):
+        analizador.analizar(c, h)
+    caliente = time.perf_counter() - inicio
+
+    print(f"🔬 {len(contratos)} contratos ({kb / 1024:.1f} MB): {len(contratos) / frio:,.0f} contratos/s "
+          f"({kb / 1024 / frio:.1f} MB/s) en frío; {len(contratos) / caliente:,.0f} contratos/s desde la caché")
+    for nombre, _, _ in TRAMPAS:
+        casos = [a for a, e in zip(analisis, esperado) if e == nombre]
+        print(f"   {nombre}: {sum(a['rechazar'] for a in casos)}/{len(casos)} rechazados, rasgos {casos[0]['rasgos']}")
+    limpios = [a for a, e in zip(analisis, esperado) if e is None]
+    print(f"   limpios: {sum(a['rechazar'] for a in limpios)}/{len(limpios)} rechazados "
+          f"({sum(bool(a['rasgos']) for a in limpios)} con algún rasgo)")
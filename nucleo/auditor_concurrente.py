@@ -0,0 +1,394 @@
+# nucleo/auditor_concurrente.py
+# 🛡️🛡️ EL AUDITOR CONCURRENTE (MUCHOS TOKENS, VARIOS NODOS)
+# El AuditorEVM es síncrono y habla con un único nodo: auditar una lista de vigilancia
+# es ir token a token, y si ese nodo va lento, todo va lento. Este auditor:
+# - Audita muchos tokens a la vez (asyncio), con un tope de auditorías en vuelo (semáforo).
+#   Las que salen de la caché no ocupan hueco; si dos piden el mismo token a la vez, se comparte.
+# - Reparte las peticiones en un GRUPO de nodos RPC ordenados por lo que hemos visto de ellos
+#   (latencia media y tasa de errores). El mejor va primero.
+# - Peticiones cubiertas: si el nodo elegido tarda más de lo normal en él (su p95), se lanza
+#   la MISMA petición al siguiente nodo y nos quedamos con la primera respuesta buena.
+#   Si un nodo falla, se pasa al siguiente sin esperar.
+# - Mide auditorías por segundo y latencias p50/p99.
+# Los pasos de la auditoría (lotes, caché por hash del código, informe) son los del AuditorEVM.
+
+import asyncio  # Para auditar en paralelo.
+import time  # Para latencias.
+from collections import deque  # Últimas latencias de cada nodo.
+
+import aiohttp  # Peticiones HTTP asíncronas.
+
+from nucleo.supervisor_autonomo import (  # El flujo de auditoría y el JSON-RPC en lotes.
+    AuditorEVM, CacheAuditorias, ErrorRPC, cuerpo_lote, leer_lote, percentil,
+)
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+ALFA_NODO = 0.2           # Peso de cada observación nueva en las medias del nodo.
+PENALIZACION_ERROR = 10   # Un nodo que falla el 10% de las veces "cuenta" como el doble de lento.
+COBERTURA_MIN = 0.02      # Nunca cubrimos antes de 20 ms (sería duplicar todo).
+MUESTRAS_COBERTURA = 64   # Latencias recientes con las que se calcula el p95 de cada nodo.
+
+
+class NodoRPC:
+    """Un nodo del grupo y lo que sabemos de él (medias móviles exponenciales)."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latencia = None    # Segundos (media móvil). None = aún no lo hemos probado.
+        self.tasa_error = 0.0   # Fracción de peticiones fallidas (media móvil).
+        self.recientes = deque(maxlen=MUESTRAS_COBERTURA)
+        self.peticiones = 0
+        self.errores = 0
+        self.ganadas = 0        # Veces que su respuesta fue la que usamos.
+
+    def apuntar(self, segundos: float, fallo: bool):
+        self.peticiones += 1
+        self.errores += fallo
+        self.tasa_error += ALFA_NODO * (float(fallo) - self.tasa_error)
+        if not fallo:
+            self._apuntar_latencia(segundos)
+
+    def apuntar_cancelada(self, segundos: float):
+        """Petición cortada porque ganó otro nodo: solo sabemos que tardaba AL MENOS esto."""
+        if self.latencia is None or segundos > self.latencia:
+            self._apuntar_latencia(segundos)
+
+    def _apuntar_latencia(self, segundos: float):
+        self.latencia = segundos if self.latencia is None else self.latencia + ALFA_NODO * (segundos - self.latencia)
+        self.recientes.append(segundos)
+
+    def puntuacion(self) -> float:
+        """Cuanto más baja, mejor. Los nodos sin probar salen a 0 para que se prueben pronto."""
+        if self.latencia is None:
+            return 0.0
+        return self.latencia * (1 + PENALIZACION_ERROR * self.tasa_error)
+
+    def p95(self):
+        return percentil(sorted(self.recientes), 95) if self.recientes else None
+
+
+class GrupoNodosRPC:
+    """
+    Varios nodos JSON-RPC de la misma cadena detrás de un único lote() asíncrono,
+    con el mismo contrato que ClienteRPC.lote: [(metodo, params)] -> [(resultado, error)].
+    """
+
+    def __init__(self, urls: list = None, timeout: float = None, cobertura_max: float = None, conexiones: int = None):
+        self.nodos = [NodoRPC(u) for u in (urls or config.RPC_BASE_NODOS)]
+        if not self.nodos:
+            raise ValueError("El grupo necesita al menos un nodo RPC")
+        self.timeout = timeout or config.RPC_TIMEOUT
+        self.cobertura_max = config.RPC_COBERTURA_MAX if cobertura_max is None else cobertura_max
+        # Una conexión por auditoría en vuelo: si hicieran cola en el conector, esa espera
+        # se apuntaría como lentitud del nodo y desordenaría el ranking.
+        self.conexiones = conexiones or config.AUDITORIAS_CONCURRENTES
+        self._sesion = None
+        self._bucle = None  # Bucle asíncrono al que pertenece la sesión.
+        self.contadores = {"lotes": 0, "coberturas": 0, "ganadas_por_cobertura": 0, "conmutaciones": 0, "fallos": 0}
+
+    def ranking(self) -> list:
+        """Los nodos del mejor al peor (a igualdad, el orden de la configuración)."""
+        return sorted(self.nodos, key=NodoRPC.puntuacion)
+
+    def _retraso_cobertura(self, nodo: NodoRPC) -> float:
+        """Cuánto esperamos a un nodo antes de preguntar también al siguiente: su p95 reciente."""
+        p95 = nodo.p95()
+        if p95 is None:
+            return self.cobertura_max
+        return min(self.cobertura_max, max(COBERTURA_MIN, p95))
+
+    async def _obtener_sesion(self) -> aiohttp.ClientSession:
+        bucle = asyncio.get_running_loop()
+        # Si nos llaman desde otro bucle (p. ej. un asyncio.run nuevo), la sesión vieja ya no sirve:
+        # la cerramos (o, si sus conexiones ya no se pueden colgar, la soltamos avisando).
+        if self._sesion is not None and not self._sesion.closed and self._bucle is not bucle:
+            try:
+                await self._sesion.close()
+            except Exception as e:
+                self._sesion.detach()
+                print(f"🛡️ Auditor: Sesión RPC del bucle anterior soltada sin cerrar ({e}).")
+            self._sesion = None
+        if self._sesion is None or self._sesion.closed:
+            conector = aiohttp.TCPConnector(limit_per_host=self.conexiones)
+            self._sesion = aiohttp.ClientSession(connector=conector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._bucle = bucle
+        return self._sesion
+
+    async def cerrar(self):
+        if self._sesion is not None and not self._sesion.closed:
+            await self._sesion.close()
+        self._sesion = None
+
+    async def _enviar(self, sesion, nodo: NodoRPC, cuerpo: list) -> list:
+        inicio = time.perf_counter()
+        try:
+            async with sesion.post(nodo.url, json=cuerpo) as respuesta:
+                respuesta.raise_for_status()
+                datos = await respuesta.json(content_type=None)
+            resultado = leer_lote(datos, len(cuerpo))
+        except asyncio.CancelledError:
+            nodo.apuntar_cancelada(time.perf_counter() - inicio)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, ErrorRPC) as e:
+            nodo.apuntar(time.perf_counter() - inicio, fallo=True)
+            raise ErrorRPC(f"{nodo.url}: {type(e).__name__}: {e}") from e
+        nodo.apuntar(time.perf_counter() - inicio, fallo=False)
+        return resultado
+
+    @staticmethod
+    def _descartar(tarea: asyncio.Task):
+        """Cancela una petición que ya no hace falta (o recoge su error si ya había terminado)."""
+        if not tarea.done():
+            tarea.cancel()
+        elif not tarea.cancelled():
+            tarea.exception()  # Recogido: así asyncio no avisa de un error "nunca leído".
+
+    async def lote(self, llamadas: list) -> list:
+        """Envía el lote al mejor nodo; cubre con el siguiente si tarda y conmuta si falla."""
+        cuerpo = cuerpo_lote(llamadas)
+        candidatos = self.ranking()
+        sesion = await self._obtener_sesion()
+        self.contadores["lotes"] += 1
+        en_vuelo = {}  # tarea -> nodo
+        lanzados = 0
+        ultimo_error = None
+
+        def lanzar():
+            nonlocal lanzados
+            nodo = candidatos[lanzados]
+            lanzados += 1
+            en_vuelo[asyncio.ensure_future(self._enviar(sesion, nodo, cuerpo))] = nodo
+
+        lanzar()
+        try:
+            while en_vuelo:
+                quedan_nodos = lanzados < len(candidatos)
+                espera = self._retraso_cobertura(candidatos[lanzados - 1]) if quedan_nodos else None
+                hechas, _ = await asyncio.wait(en_vuelo, timeout=espera, return_when=asyncio.FIRST_COMPLETED)
+                if not hechas:
+                    # El nodo va más lento de lo normal: preguntamos también al siguiente (sin cortar al primero).
+                    self.contadores["coberturas"] += 1
+                    lanzar()
+                    continue
+                for tarea in hechas:
+                    nodo = en_vuelo.pop(tarea)
+                    try:
+                        respuestas = tarea.result()
+                    except ErrorRPC as e:
+                        ultimo_error = e
+                        continue
+                    nodo.ganadas += 1
+                    if nodo is not candidatos[0]:
+                        self.contadores["ganadas_por_cobertura"] += 1
+                    return respuestas
+                if not en_vuelo and lanzados < len(candidatos):
+                    # Todo lo que había en vuelo ha fallado: al siguiente nodo, sin esperar.
+                    self.contadores["conmutaciones"] += 1
+                    lanzar()
+        finally:
+            for tarea in en_vuelo:
+                self._descartar(tarea)
+        self.contadores["fallos"] += 1
+        raise ultimo_error or ErrorRPC("Ningún nodo RPC disponible")
+
+    def estado(self) -> list:
+        """Resumen de cada nodo, del mejor al peor."""
+        return [{
+            "url": n.url,
+            "latencia_ms": 1000 * n.latencia if n.latencia is not None else None,
+            "tasa_error": n.tasa_error,
+            "peticiones": n.peticiones,
+            "errores": n.errores,
+            "ganadas": n.ganadas,
+        } for n in self.ranking()]
+
+
+class AuditorConcurrente(AuditorEVM):
+    """
+    El AuditorEVM en versión asyncio sobre un grupo de nodos:
+    'await auditar(token)' y 'await auditar_lista(tokens)'.
+    Comparte caché, lotes e informe con el auditor síncrono.
+    """
+
+    def __init__(self, grupo: GrupoNodosRPC = None, cache: CacheAuditorias = None, max_concurrencia: int = None):
+        self.grupo = grupo or GrupoNodosRPC()
+        super().__init__(rpc_url=self.grupo.nodos[0].url, cache=cache, rpc=self.grupo)
+        self.max_concurrencia = max_concurrencia or config.AUDITORIAS_CONCURRENTES
+        self._bucle = None
+        self._semaforo = None
+        self._en_curso = {}  # token -> tarea de auditoría que ya está en marcha.
+
+    @staticmethod
+    def _metricas_vacias() -> dict:
+        return {**AuditorEVM._metricas_vacias(), "compartidas": 0, "esperas": [], "primera": None, "ultima": None}
+
+    def estadisticas(self) -> dict:
+        resumen = super().estadisticas()
+        primera, ultima = self.metricas["primera"], self.metricas["ultima"]
+        duracion = (ultima - primera) if primera is not None and ultima is not None else 0.0
+        resumen["compartidas"] = self.metricas["compartidas"]
+        # Parte de la latencia que fue esperar hueco en el semáforo (no culpa de los nodos).
+        resumen["espera_p50_ms"] = 1000 * percentil(sorted(self.metricas["esperas"]), 50)
+        resumen["auditorias_por_segundo"] = resumen["auditorias"] / duracion if duracion > 0 else 0.0
+        resumen["nodos"] = self.grupo.estado()
+        resumen["red"] = dict(self.grupo.contadores)
+        return resumen
+
+    def auditar_token(self, token_address: str) -> dict:
+        """Versión síncrona para scripts sueltos: abre (y cierra) su propio bucle."""
+        async def _una():
+            try:
+                return await self.auditar(token_address)
+            finally:
+                await self.grupo.cerrar()
+        return asyncio.run(_una())
+
+    async def auditar(self, token_address: str) -> dict:
+        """Informe del token (mismo formato que AuditorEVM.auditar_token)."""
+        inicio = time.perf_counter()
+        if self.metricas["primera"] is None:
+            self.metricas["primera"] = inicio
+        self.metricas["auditorias"] += 1
+        try:
+            # shield: si cancelan a quien espera, la auditoría compartida sigue para los demás.
+            reporte = await asyncio.shield(self._tarea_auditoria(token_address))
+        finally:
+            self.metricas["ultima"] = time.perf_counter()
+            self.metricas["latencias"].append(self.metricas["ultima"] - inicio)
+        if reporte.get("desde_cache"):
+            self.metricas["aciertos_cache"] += 1
+        return reporte
+
+    async def auditar_lista(self, tokens: list) -> dict:
+        """Audita todos a la vez (con el tope de concurrencia). Devuelve {token: informe}."""
+        informes = await asyncio.gather(*(self.auditar(t) for t in tokens))
+        return dict(zip(tokens, informes))
+
+    def _tarea_auditoria(self, token_address: str) -> asyncio.Future:
+        bucle = asyncio.get_running_loop()
+        if self._bucle is not bucle:
+            self._bucle, self._en_curso = bucle, {}
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+        clave = str(token_address).lower()
+        tarea = self._en_curso.get(clave)
+        if tarea is not None:
+            self.metricas["compartidas"] += 1
+            return tarea
+        tarea = asyncio.ensure_future(self._recorrer_flujo(token_address))
+        self._en_curso[clave] = tarea
+        tarea.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        return tarea
+
+    async def _recorrer_flujo(self, token_address: str) -> dict:
+        flujo = self._flujo_auditoria(token_address)
+        try:
+            llamadas = next(flujo)  # Si sale de la caché, ni siquiera ocupa hueco en el semáforo.
+            espera = time.perf_counter()
+            async with self._semaforo:
+                self.metricas["esperas"].append(time.perf_counter() - espera)
+                while True:
+                    try:
+                        respuestas = await self._lote_async(llamadas)
+                    except ErrorRPC as e:
+                        llamadas = flujo.throw(e)
+                    else:
+                        llamadas = flujo.send(respuestas)
+        except StopIteration as fin:
+            return fin.value
+
+    async def _lote_async(self, llamadas: list) -> list:
+        self.metricas["llamadas_rpc"] += len(llamadas)
+        self.metricas["peticiones_http"] += 1
+        return await self.grupo.lote(llamadas)
+
+
+# Banco de pruebas: tres nodos falsos (uno rápido pero con colas, uno fiable, uno que falla)
+# y 400 tokens, primero uno a uno y luego en paralelo.
+if __name__ == "__main__":
+    import io
+    import random
+    import contextlib
+    from aiohttp import web
+
+    azar = random.Random(7)
+    TOKENS = [f"0x{i:040x}" for i in range(1, 401)]
+    HONEYPOTS = set(TOKENS[::10])
+
+    def nodo_falso(latencia: float, prob_cola: float = 0.0, prob_error: float = 0.0):
+        """Nodo con 'latencia' normal, a veces una cola de 10x, a veces un 503."""
+        async def atender(peticion):
+            lote = await peticion.json()
+            if azar.random() < prob_error:
+                await asyncio.sleep(latencia)
+                return web.Response(status=503)
+            await asyncio.sleep(latencia * (10 if azar.random() < prob_cola else 1))
+            respuestas = []
+            for llamada in lote:
+                metodo, params = llamada["method"], llamada["params"]
+                respuesta = {"jsonrpc": "2.0", "id": llamada["id"]}
+                if metodo == "eth_chainId":
+                    respuesta["result"] = "0x2105"
+                elif metodo == "eth_getCode":
+                    respuesta["result"] = "0x6080604052"
+                elif params[0]["to"].lower() in HONEYPOTS:
+                    respuesta["error"] = {"code": 3, "message": "execution reverted"}
+                else:
+                    respuesta["result"] = "0x" + "0" * 63 + "1"
+                respuestas.append(respuesta)
+            return web.json_response(respuestas)
+        aplicacion = web.Application()
+        aplicacion.router.add_post("/", atender)
+        return aplicacion
+
+    async def levantar(aplicacion):
+        corredor = web.AppRunner(aplicacion)
+        await corredor.setup()
+        sitio = web.TCPSite(corredor, "127.0.0.1", 0)
+        await sitio.start()
+        return corredor, f"http://127.0.0.1:{corredor.addresses[0][1]}"
+
+    def informar(titulo: str, resumen: dict):
+        print(f"{titulo}: {resumen['auditorias']} auditorías, {resumen['auditorias_por_segundo']:.0f}/s, "
+              f"p50 {resumen['latencia_p50_ms']:.1f} ms, p99 {resumen['latencia_p99_ms']:.1f} ms "
+              f"(de ellos, esperando hueco: p50 {resumen['espera_p50_ms']:.1f} ms), "
+              f"{resumen['aciertos_cache']} de caché, {resumen['compartidas']} compartidas")
+        print(f"   Red: {resumen['red']}")
+        for nodo in resumen["nodos"]:
+            latencia = f"{nodo['latencia_ms']:.1f} ms" if nodo["latencia_ms"] is not None else "sin probar"
+            print(f"   {nodo['url']}: {latencia}, errores {nodo['errores']}/{nodo['peticiones']}, ganadas {nodo['ganadas']}")
+
+    async def banco():
+        corredores, urls = [], []
+        # Orden "de configuración" a propósito malo: el que falla va primero.
+        for aplicacion in (nodo_falso(0.015, prob_error=0.3), nodo_falso(0.010, prob_cola=0.05), nodo_falso(0.030)):
+            corredor, url = await levantar(aplicacion)
+            corredores.append(corredor)
+            urls.append(url)
+
+        silencio = io.StringIO()  # Los avisos de cada token no caben en pantalla.
+        for titulo, concurrencia, tokens in (("🐢 Uno a uno", 1, TOKENS[:100]), ("🐇 En paralelo", 16, TOKENS)):
+            grupo = GrupoNodosRPC(urls, conexiones=concurrencia)
+            auditor = AuditorConcurrente(grupo, CacheAuditorias(), max_concurrencia=concurrencia)
+            with contextlib.redirect_stdout(silencio):
+                if concurrencia == 1:
+                    informes = {t: await auditor.auditar(t) for t in tokens}
+                else:
+                    informes = await auditor.auditar_lista(tokens + tokens[:50])  # 50 repetidos a la vez.
+            seguros = sum(i["es_seguro"] for i in informes.values())
+            sin_red = sum(i["motivo"] == "Sin conexión al nodo RPC" for i in informes.values())
+            informar(titulo, auditor.nuevo_ciclo())
+            print(f"   {seguros} seguros, {len(informes) - seguros} rechazados ({sin_red} por falta de red)")
+            await auditor.grupo.cerrar()
+
+        for corredor in corredores:
+            await corredor.cleanup()
+
+    asyncio.run(banco())
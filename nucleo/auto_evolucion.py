@@ -39,7 +39,7 @@ class GenetistaDigital:
 
         # Rutas de archivos importantes
         self.ruta_logs = "logs/errores.log"
-        self.ruta_estado = "estado_bot.json"
+        self.ruta_estado = config.RUTA_ESTADO
         
         # Aseguramos que exista la carpeta de logs
         if not os.path.exists("logs"):
@@ -0,0 +1,188 @@
+# nucleo/barrido_volman.py
+# 🎛️ EL BARRIDO DE PARÁMETROS (VOLMAN CON MIL AJUSTES A LA VEZ)
+# El Analista Vectorizado trae sus números de serie: EMA 20, ATR 14, bloque de 7 velas,
+# caja < 1.5 ATR y distancia a la EMA < 0.5 ATR. ¿Y si otros números funcionan mejor?
+# Probar miles de combinaciones una a una sería recalcular la misma EMA miles de veces.
+# Aquí cada indicador distinto se calcula UNA vez, y los umbrales (1.5x, 0.5x...) se comparan
+# todos de golpe como matrices (umbrales x velas), por trozos para no reventar la memoria.
+
+import itertools  # Para recorrer las combinaciones.
+import time  # Para medir el barrido.
+
+import numpy as np  # Matemáticas rápidas.
+import pandas as pd  # La tabla mágica (para la tabla de resultados).
+
+from nucleo.almacen_velas import timeframe_a_ms  # Para saber cuántas velas tiene un año.
+from nucleo import indicadores as ind  # Los mismos núcleos NumPy que usa el Analista.
+
+# Velas máximas por trozo. Los momentos van en float32 y cada trozo se suma luego en float64:
+# así los conteos (aciertos, operaciones) son exactos (float32 cuenta sin error hasta 2^24)
+# y el error de redondeo de las sumas de retornos se queda en el de 65.536 sumandos, no en el de toda la historia.
+MAX_VELAS_TROZO = 2 ** 16
+
+# Rejilla por defecto: 5 x 4 x 5 x 6 x 6 = 3.600 combinaciones.
+REJILLA_POR_DEFECTO = {
+    "periodo_ema": [10, 15, 20, 30, 50],
+    "periodo_atr": [7, 10, 14, 21],
+    "bloque_velas": [4, 5, 7, 10, 14],
+    "factor_compresion": [1.0, 1.25, 1.5, 2.0, 2.5, 3.0],
+    "factor_cercania": [0.25, 0.5, 0.75, 1.0, 1.5, 2.0],
+}
+
+
+class BarridoVolman:
+    """
+    Evalúa muchas combinaciones de parámetros de AnalistaVolmanVectorizado sobre la misma historia.
+    Cada combinación se puntúa igual que en el Laboratorio: si hay señal en la vela t,
+    ganamos (o perdemos) el retorno de la vela t+1.
+    """
+
+    def __init__(self, datos: pd.DataFrame, timeframe: str = "15m", max_celdas: int = 2 ** 24):
+        # Arrays sueltos (sin copiar si la tabla viene del almacén).
+        self.apertura = datos["open"].to_numpy(dtype=np.float64)
+        self.maximo = datos["high"].to_numpy(dtype=np.float64)
+        self.minimo = datos["low"].to_numpy(dtype=np.float64)
+        self.cierre = datos["close"].to_numpy(dtype=np.float64)
+        self.n = len(self.cierre)
+        self.periodos_por_ano = 365 * 24 * 3600 * 1000 / timeframe_a_ms(timeframe)
+        self.max_celdas = max_celdas  # Tamaño máximo de cada matriz (combinaciones x velas) en memoria.
+
+        # Retorno de la vela siguiente (la última no tiene siguiente).
+        retornos = np.zeros(self.n)
+        retornos[:-1] = self.cierre[1:] / self.cierre[:-1] - 1.0
+        # Con una sola multiplicación de matrices sacamos, para cada combinación:
+        # suma de retornos, suma de cuadrados, aciertos y número de operaciones.
+        # (float32: la multiplicación va el doble de rápida; ver MAX_VELAS_TROZO para la precisión).
+        self._momentos = np.column_stack([retornos, retornos ** 2, retornos > 0, np.ones(self.n)]).astype(np.float32)
+
+        # Cachés: cada indicador distinto se calcula una sola vez.
+        self._emas, self._atrs_ayer, self._bloques, self._dobles_doji = {}, {}, {}, {}
+        self._es_doji = None
+
+    # --- INDICADORES (UNA VEZ POR VALOR DISTINTO) ---
+
+    def _ema(self, periodo: int) -> np.ndarray:
+        if periodo not in self._emas:
+            self._emas[periodo] = ind.ema(self.cierre, periodo)
+        return self._emas[periodo]
+
+    def _atr_ayer(self, periodo: int) -> np.ndarray:
+        if periodo not in self._atrs_ayer:
+            atr = ind.atr(self.maximo, self.minimo, self.cierre, periodo)
+            self._atrs_ayer[periodo] = ind.desplazar(atr)  # El ATR de la vela anterior.
+        return self._atrs_ayer[periodo]
+
+    def _bloque(self, velas: int):
+        """Donchian de las 'velas' ANTERIORES: (techo, suelo)."""
+        if velas not in self._bloques:
+            techo = ind.desplazar(ind.maximo_movil(self.maximo, velas))
+            suelo = ind.desplazar(ind.minimo_movil(self.minimo, velas))
+            self._bloques[velas] = (techo, suelo)
+        return self._bloques[velas]
+
+    def _doble_doji(self, periodo_ema: int) -> np.ndarray:
+        """Señal de Gemelas: solo depende de la EMA, así que sirve para todas las demás combinaciones."""
+        if periodo_ema not in self._dobles_doji:
+            if self._es_doji is None:
+                mecha = self.maximo - self.minimo
+                self._es_doji = (mecha > 0) & (np.abs(self.apertura - self.cierre) <= mecha * 0.15)
+            ema = self._ema(periodo_ema)
+            with np.errstate(invalid="ignore"):
+                toca = (self.minimo <= ema) & (self.maximo >= ema)
+            senal = np.zeros(self.n, dtype=bool)
+            if self.n > 2:
+                max_dojis = np.maximum(self.maximo[1:-1], self.maximo[:-2])
+                senal[2:] = (self._es_doji[1:-1] & self._es_doji[:-2] & (toca[1:-1] | toca[:-2])
+                             & (self.cierre[2:] > max_dojis))
+            self._dobles_doji[periodo_ema] = senal
+        return self._dobles_doji[periodo_ema]
+
+    # --- BARRIDO ---
+
+    def _evaluar_familia(self, periodo_ema, periodo_atr, bloque_velas, compresiones, cercanias) -> np.ndarray:
+        """
+        Evalúa todos los umbrales de una (EMA, ATR, bloque) de golpe.
+        Devuelve una matriz (compresiones x cercanías, 4) con los momentos de cada combinación.
+        """
+        ema = self._ema(periodo_ema)
+        atr_ayer = self._atr_ayer(periodo_atr)
+        techo, suelo = self._bloque(bloque_velas)
+        doble_doji = self._doble_doji(periodo_ema)
+
+        with np.errstate(invalid="ignore"):
+            altura = techo - suelo
+            distancia = np.abs((techo + suelo) / 2 - ema)
+            ruptura = self.cierre > techo
+
+        compresiones = np.asarray(compresiones, dtype=np.float64)[:, None]
+        cercanias = np.asarray(cercanias, dtype=np.float64)[:, None]
+        combinaciones = len(compresiones) * len(cercanias)
+        momentos = np.zeros((combinaciones, 4))
+
+        # Trozos de velas: la matriz (combinaciones x trozo) nunca pasa de 'max_celdas',
+        # ni el trozo de MAX_VELAS_TROZO velas (precisión del float32).
+        trozo = max(1, min(MAX_VELAS_TROZO, self.max_celdas // combinaciones))
+        with np.errstate(invalid="ignore"):
+            for a in range(0, self.n, trozo):
+                b = min(self.n, a + trozo)
+                atr_t = atr_ayer[a:b]
+                es_comprimido = altura[a:b] < atr_t * compresiones   # (compresiones, trozo)
+                es_cercano = distancia[a:b] < atr_t * cercanias       # (cercanías, trozo)
+                senal = es_comprimido[:, None, :] & es_cercano[None, :, :] & ruptura[a:b]
+                senal |= doble_doji[a:b]
+                momentos += senal.reshape(combinaciones, -1).astype(np.float32) @ self._momentos[a:b]
+        return momentos
+
+    def barrer(self, rejilla: dict = None, minimo_operaciones: int = 10, ordenar_por: str = "sharpe") -> pd.DataFrame:
+        """
+        Prueba todas las combinaciones de la rejilla y devuelve la tabla de resultados,
+        de mejor a peor. Las combinaciones con pocas operaciones van al final.
+        """
+        rejilla = {**REJILLA_POR_DEFECTO, **(rejilla or {})}
+        compresiones = rejilla["factor_compresion"]
+        cercanias = rejilla["factor_cercania"]
+        umbrales = list(itertools.product(compresiones, cercanias))
+
+        filas, bloques_momentos = [], []
+        for periodo_ema, periodo_atr, bloque_velas in itertools.product(
+                rejilla["periodo_ema"], rejilla["periodo_atr"], rejilla["bloque_velas"]):
+            bloques_momentos.append(self._evaluar_familia(periodo_ema, periodo_atr, bloque_velas, compresiones, cercanias))
+            filas.extend((periodo_ema, periodo_atr, bloque_velas, fc, fd) for fc, fd in umbrales)
+
+        momentos = np.vstack(bloques_momentos)
+        suma, suma_cuadrados, aciertos, operaciones = momentos.T
+        media = suma / self.n
+        desviacion = np.sqrt(np.maximum(suma_cuadrados / self.n - media ** 2, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(desviacion > 0, media / desviacion * np.sqrt(self.periodos_por_ano), 0.0)
+            acierto = np.where(operaciones > 0, aciertos / operaciones, 0.0)
+
+        tabla = pd.DataFrame(filas, columns=list(REJILLA_POR_DEFECTO))
+        tabla["operaciones"] = np.rint(operaciones).astype(np.int64)
+        tabla["retorno_total"] = suma
+        tabla["sharpe"] = sharpe
+        tabla["acierto"] = acierto
+        tabla["suficientes_operaciones"] = tabla["operaciones"] >= minimo_operaciones
+        tabla = tabla.sort_values(["suficientes_operaciones", ordenar_por], ascending=[False, False], kind="stable")
+        return tabla.reset_index(drop=True)
+
+
+# Banco de pruebas: miles de combinaciones sobre un año de velas de 15 minutos.
+if __name__ == "__main__":
+    rng = np.random.default_rng(11)
+    n = 365 * 96
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = cierres * (1 + rng.normal(0, 0.001, n))
+    datos = pd.DataFrame({
+        "open": aperturas,
+        "high": np.maximum(aperturas, cierres) * (1 + rng.uniform(0, 0.002, n)),
+        "low": np.minimum(aperturas, cierres) * (1 - rng.uniform(0, 0.002, n)),
+        "close": cierres,
+        "volume": 1.0,
+    })
+
+    inicio = time.perf_counter()
+    tabla = BarridoVolman(datos).barrer()
+    duracion = time.perf_counter() - inicio
+    print(f"🎛️ {len(tabla):,} combinaciones x {n:,} velas en {duracion:.2f}s ({len(tabla) / duracion:,.0f} combinaciones/s)")
+    print(tabla.head(5).to_string())
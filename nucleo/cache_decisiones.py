@@ -0,0 +1,209 @@
+# nucleo/cache_decisiones.py
+# 🗃️ LA CACHÉ DE DECISIONES DEL CEREBRO IA (SQLITE EN DISCO)
+# Cada CerebroAgente.tomar_decision lanza un bucle ReAct entero contra Groq (y a veces busca
+# en DuckDuckGo): segundos y llamadas de API... aunque el mercado esté igual que hace un minuto.
+# Ahora:
+# - Los datos del mercado y el saldo se NORMALIZAN: cada número se redondea a una "cubeta"
+#   logarítmica (un 0.2% de precio arriba o abajo es la misma situación) y el resto se ordena.
+# - La huella (sha256) de eso es la clave en un SQLite local: sobrevive a los reinicios.
+# - Cada decisión caduca a los CACHE_DECISIONES_TTL segundos (el mercado sí cambia) y, si hay
+#   demasiadas, se echan las que hace más tiempo que nadie usa (LRU).
+# - Se cuentan aciertos, fallos y el tiempo ahorrado (lo que tardó el agente en su día).
+
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+_NUMERO = re.compile(r"-?\d+(?:\.\d+)?")  # Números dentro de un texto ("Precio: 65000.5").
+
+
+def cubeta(valor: float, paso: float) -> int:
+    """Cubeta logarítmica: dos valores caen en la misma si se parecen en menos de 'paso' (relativo)."""
+    if not math.isfinite(valor) or valor == 0:
+        return 0
+    signo = 1 if valor > 0 else -1
+    return signo * (1 + round(math.log(abs(valor)) / math.log1p(paso)))
+
+
+def normalizar(datos, paso: float, ignorar=()):
+    """
+    Forma canónica de los datos del mercado: números en cubetas, diccionarios ordenados,
+    textos en minúsculas y sin espacios de más; las claves de 'ignorar' (horas, fechas...) fuera.
+    """
+    if isinstance(datos, bool) or datos is None:
+        return datos
+    if isinstance(datos, (int, float)):
+        return cubeta(float(datos), paso)
+    if isinstance(datos, str):
+        texto = " ".join(datos.lower().split())
+        return _NUMERO.sub(lambda m: f"#{cubeta(float(m.group()), paso)}", texto)
+    if isinstance(datos, dict):
+        return {str(k): normalizar(v, paso, ignorar) for k, v in sorted(datos.items(), key=lambda kv: str(kv[0]))
+                if str(k).lower() not in ignorar}
+    if isinstance(datos, (list, tuple)):
+        return [normalizar(v, paso, ignorar) for v in datos]
+    return normalizar(str(datos), paso, ignorar)
+
+
+class CacheDecisiones:
+    """
+    Decisiones ya tomadas, por situación de mercado normalizada.
+    obtener() devuelve la decisión guardada (o None); guardar() la apunta con lo que costó.
+    """
+
+    def __init__(self, ruta: str = None, ttl: float = None, capacidad: int = None,
+                 paso: float = None, paso_saldo: float = None):
+        self.ruta = ruta or config.CACHE_DECISIONES_RUTA
+        self.ttl = config.CACHE_DECISIONES_TTL if ttl is None else ttl
+        self.capacidad = capacidad or config.CACHE_DECISIONES_CAPACIDAD
+        self.paso = paso or config.CACHE_DECISIONES_PASO
+        self.paso_saldo = paso_saldo or config.CACHE_DECISIONES_PASO_SALDO
+        self.ignorar = tuple(c.lower() for c in config.CACHE_DECISIONES_IGNORAR)
+
+        if self.ruta != ":memory:":
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        self._bloqueo = threading.Lock()
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")  # Leer no bloquea a quien escribe.
+        self._conexion.execute("PRAGMA synchronous=NORMAL")  # Perder la última decisión en un apagón no es grave.
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS decisiones ("
+            "clave TEXT PRIMARY KEY, decision TEXT NOT NULL, creada REAL NOT NULL, "
+            "usada REAL NOT NULL, latencia REAL NOT NULL, usos INTEGER NOT NULL DEFAULT 0)")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS decisiones_usada ON decisiones(usada)")
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.caducadas = 0
+        self.expulsadas = 0
+        self.ahorrado = 0.0  # Segundos de agente que nos hemos ahorrado.
+
+    def clave(self, datos_mercado, saldo) -> str:
+        """Huella de la situación: mercado normalizado + saldo en cubetas más gruesas."""
+        situacion = {
+            "mercado": normalizar(datos_mercado, self.paso, self.ignorar),
+            "saldo": cubeta(float(saldo or 0.0), self.paso_saldo),
+        }
+        canonico = json.dumps(situacion, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+    def obtener(self, clave: str):
+        """La decisión guardada para esta clave, si no ha caducado (y la marca como recién usada)."""
+        ahora = time.time()
+        with self._bloqueo:
+            fila = self._conexion.execute(
+                "SELECT decision, creada, latencia FROM decisiones WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+            decision, creada, latencia = fila
+            if ahora - creada > self.ttl:
+                self._conexion.execute("DELETE FROM decisiones WHERE clave = ?", (clave,))
+                self.caducadas += 1
+                self.fallos += 1
+                return None
+            self._conexion.execute("UPDATE decisiones SET usada = ?, usos = usos + 1 WHERE clave = ?", (ahora, clave))
+            self.aciertos += 1
+            self.ahorrado += latencia
+            return decision
+
+    def guardar(self, clave: str, decision: str, latencia: float):
+        """Apunta una decisión nueva (latencia = segundos que tardó el agente) y echa las más viejas si sobran."""
+        ahora = time.time()
+        with self._bloqueo:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO decisiones (clave, decision, creada, usada, latencia, usos) VALUES (?, ?, ?, ?, ?, 0)",
+                (clave, decision, ahora, ahora, float(latencia)))
+            sobran = self._conexion.execute("SELECT COUNT(*) FROM decisiones").fetchone()[0] - self.capacidad
+            if sobran > 0:
+                # Primero las caducadas; si no basta, las que hace más tiempo que nadie usa (LRU).
+                borradas = self._conexion.execute("DELETE FROM decisiones WHERE creada < ?", (ahora - self.ttl,)).rowcount
+                if sobran - borradas > 0:
+                    self._conexion.execute(
+                        "DELETE FROM decisiones WHERE clave IN "
+                        "(SELECT clave FROM decisiones ORDER BY usada LIMIT ?)", (sobran - borradas,))
+                self.expulsadas += sobran
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        with self._bloqueo:
+            guardadas = self._conexion.execute("SELECT COUNT(*) FROM decisiones").fetchone()[0]
+        return {
+            "consultas": consultas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "caducadas": self.caducadas,
+            "expulsadas": self.expulsadas,
+            "guardadas": guardadas,
+            "segundos_ahorrados": round(self.ahorrado, 3),
+        }
+
+    def cerrar(self):
+        with self._bloqueo:
+            self._conexion.close()
+
+
+# Banco de pruebas: un agente de mentira que tarda 2 s, y un mercado que casi no se mueve.
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    ruta = os.path.join(tempfile.mkdtemp(), "decisiones.sqlite")
+    cache = CacheDecisiones(ruta, ttl=300, capacidad=50)
+    LATENCIA_AGENTE = 2.0
+
+    def agente_lento(datos, saldo):
+        # En vez de dormir 2 s de verdad, lo apuntamos como lo que costaría.
+        return random.choice(["COMPRA", "VENTA", "ESPERA"]), LATENCIA_AGENTE
+
+    random.seed(25)
+    precio, tiempo_real, tiempo_con_cache, rapidas = 65000.0, 0.0, 0.0, []
+    for vuelta in range(500):
+        precio *= 1 + random.gauss(0, 0.0005)  # Movimientos de 0.05%: casi siempre la misma cubeta.
+        datos = {"simbolo": "BTC/USDT", "precio": round(precio, 1), "rsi": round(35 + random.gauss(0, 0.02), 2),
+                 "tendencia": "Lateral", "timestamp": time.time()}
+        inicio = time.perf_counter()
+        clave = cache.clave(datos, 1000 + vuelta * 0.01)
+        decision = cache.obtener(clave)
+        if decision is None:
+            decision, latencia = agente_lento(datos, 1000)
+            cache.guardar(clave, decision, latencia)
+            tiempo_con_cache += LATENCIA_AGENTE
+        else:
+            rapidas.append(time.perf_counter() - inicio)
+            tiempo_con_cache += rapidas[-1]
+        tiempo_real += LATENCIA_AGENTE
+
+    resumen = cache.estadisticas()
+    print(f"🗃️ {resumen['consultas']} decisiones: {resumen['aciertos']} de caché ({resumen['tasa_aciertos']:.0%}), "
+          f"{resumen['fallos']} al agente, {resumen['guardadas']} guardadas, {resumen['expulsadas']} expulsadas (LRU)")
+    if rapidas:
+        print(f"⚡ Decisión repetida: {sum(rapidas) / len(rapidas) * 1000:.3f} ms (el agente tarda {LATENCIA_AGENTE:.0f} s)")
+    print(f"⏱️ Sin caché {tiempo_real:,.0f} s -> con caché {tiempo_con_cache:,.0f} s "
+          f"({resumen['segundos_ahorrados']:,.0f} s ahorrados)")
+
+    # Reinicio: las decisiones siguen en el disco.
+    cache.cerrar()
+    otra = CacheDecisiones(ruta, ttl=300, capacidad=50)
+    assert otra.obtener(clave) == decision
+    print("🧠 Reinicio: la última decisión sigue en el SQLite ✅")
+    # Caducidad: con TTL 0 nada vale.
+    otra.ttl = 0
+    time.sleep(0.01)
+    assert otra.obtener(clave) is None and otra.caducadas == 1
+    print("⌛ Caducidad: una decisión vieja vuelve a preguntar al agente ✅")
+    otra.cerrar()
@@ -5,12 +5,15 @@
 
 import os  # Para hablar con el sistema operativo
 import json  # Para leer datos en formato JSON
+import time  # Para medir lo que tarda el agente (y lo que nos ahorra la caché)
 from langchain_groq import ChatGroq  # El cerebro principal (Groq + LangChain)
 from langchain.agents import AgentExecutor, create_react_agent  # El cuerpo del agente
 from langchain_community.tools import DuckDuckGoSearchResults  # Herramienta: Ojos para ver internet
 from langchain.tools import tool  # Para crear nuestras propias herramientas
 from langchain_core.prompts import PromptTemplate  # Para darle instrucciones al agente
 
+from nucleo.cache_decisiones import CacheDecisiones  # Decisiones ya tomadas (SQLite en disco)
+
 # Importamos la configuración para saber las claves secretas
 try:
     import config
@@ -51,6 +54,9 @@ class CerebroAgente:
         Constructor: Aquí montamos el robot pieza a pieza.
         """
         print("🤖 ENSAMBLANDO AGENTE AUTÓNOMO (LANGCHAIN + GROQ)...")
+
+        # 0. La memoria de decisiones: si el mercado está igual que hace poco, no volvemos a preguntar.
+        self.cache = CacheDecisiones()
         
         # 1. El Cerebro (LLM)
         # Usamos ChatGroq porque es rapidísimo y gratuito
@@ -115,6 +121,15 @@ Pensamiento: {agent_scratchpad}'''
         if not self.agente_ejecutor:
             return "ERROR_SISTEMA"
 
+        # ¿Ya decidimos algo con el mercado así (y el mismo saldo) hace poco? Milisegundos en vez de segundos.
+        clave = self.cache.clave(datos_mercado, saldo_actual)
+        decision = self.cache.obtener(clave)
+        if decision is not None:
+            resumen = self.cache.estadisticas()
+            print(f"🗃️ Decisión de caché: {decision} ({resumen['tasa_aciertos']:.0%} aciertos, "
+                  f"{resumen['segundos_ahorrados']:.1f} s de agente ahorrados)")
+            return decision
+
         # Preparamos la misión para el agente
         mision = f"""
         ACTÚA COMO UN TRADER PROFESIONAL. Tienes estos datos del mercado:
@@ -131,14 +146,19 @@ Pensamiento: {agent_scratchpad}'''
 
         try:
             # ¡Acción! El agente empieza a pensar y usar herramientas
+            inicio = time.perf_counter()
             respuesta = self.agente_ejecutor.invoke({"input": mision})
             
             # Limpiamos la respuesta final
             decision_texto = respuesta['output'].strip().upper()
             
-            if "COMPRA" in decision_texto: return "COMPRA"
-            if "VENTA" in decision_texto: return "VENTA"
-            return "ESPERA"
+            if "COMPRA" in decision_texto: decision = "COMPRA"
+            elif "VENTA" in decision_texto: decision = "VENTA"
+            else: decision = "ESPERA"
+
+            # Solo se guardan las decisiones de verdad (si el agente falla, la próxima vez se vuelve a preguntar).
+            self.cache.guardar(clave, decision, time.perf_counter() - inicio)
+            return decision
 
         except Exception as e:
             print(f"⚠️ El agente se confundió: {e}")
@@ -155,3 +175,9 @@ if __name__ == "__main__":
     print("\n🏁 INICIANDO PRUEBA DE CAMPO...")
     decision = cerebro.tomar_decision(datos_fake, saldo_fake)
     print(f"\n📢 DECISIÓN DEL AGENTE: {decision}")
+
+    # La misma situación otra vez: tiene que salir de la caché.
+    inicio = time.perf_counter()
+    repetida = cerebro.tomar_decision(datos_fake, saldo_fake)
+    print(f"📢 DECISIÓN REPETIDA: {repetida} en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(f"🗃️ Caché: {cerebro.cache.estadisticas()}")
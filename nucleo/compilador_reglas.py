@@ -0,0 +1,404 @@
+# nucleo/compilador_reglas.py
+# 🧩 EL COMPILADOR DE REGLAS (DE LAS RECETAS DEL BIBLIOTECARIO A SEÑALES)
+# El Bibliotecario escribe las estrategias como recetas ("vela_1": "ROJA", "condicion_cierre":
+# "CIERRE_2 > APERTURA_1", "tendencia_previa": "BAJISTA"...), pero el Laboratorio solo sabía
+# simular las que tenían el nombre escrito a mano en el código. Las demás daban cero señales.
+# Este compilador traduce cada receta a UNA función vectorizada (todas las condiciones sobre
+# arrays de NumPy, combinadas en un único array de resultado) y guarda en caché las piezas
+# comunes (cuerpo, sombras, colores, tendencia...) para calcularlas una sola vez por historia.
+#
+# Vocabulario que entiende (las claves "descripcion" y "fuente" se ignoran):
+#   "vela_N": "ROJA" | "VERDE" | "DOJI"               -> color/forma de la vela N del patrón.
+#   "condicion_*": "CIERRE_2 > APERTURA_1"            -> comparación entre velas del patrón.
+#                  "SOMBRA_INF_1 >= 2 * CUERPO_1"        (admite un número multiplicando).
+#   "tendencia_previa": "BAJISTA" | "ALCISTA" | "BAJISTA_20" -> cómo venía el precio antes.
+#   "tendencia_superior": "ALCISTA_4H" | "BAJISTA_1D_5"  -> la tendencia de una temporalidad alta
+#                  (barras sacadas de las velas base y vistas SIN MIRAR EL FUTURO: solo barras ya cerradas).
+#   "forma": "MARTILLO" | "ESTRELLA_FUGAZ" | "DOJI"   -> forma de la última vela.
+#   "sombra_inferior"/"sombra_superior": "DOS_VECES_EL_CUERPO" | "CASI_NULA"
+#   "volumen": "CRECIENTE" | "CRECIENTE_EN_SUBIDA"
+#   "puntos_minimos": 2 (+ "distancia_tiempo": "10_VELAS_MINIMO", "diferencia_precio": "MENOR_AL_2%")
+#                                                     -> suelo doble/triple (sobre el índice de pivotes).
+#   "figura": "HCH_INVERTIDO" | "BANDERA_ALCISTA" | "TRIANGULO_ASCENDENTE" | ... -> ruptura alcista
+#             de una figura de 'nucleo.figuras_chartistas'.
+# La vela N cuenta desde el principio del patrón: en un patrón de 2 velas, la 2 es la actual.
+
+import re  # Para leer las condiciones escritas como texto.
+import json  # Para usar la receta como clave de caché.
+
+import numpy as np  # Matemáticas rápidas.
+
+from nucleo import indicadores as ind  # Extremos móviles y desplazamientos en NumPy puro.
+from nucleo import figuras_chartistas as figuras  # Figuras de Bulkowski sobre el índice de pivotes.
+from nucleo.pivotes import extraer_pivotes  # Índice de giros (compartido por todas las figuras).
+from nucleo.almacen_velas import timeframe_a_ms  # '15m' -> milisegundos.
+from nucleo.multi_temporalidad import remuestrear, alinear  # 1h/4h/1d sin volver a descargar nada.
+
+# Claves que son solo texto para humanos.
+CLAVES_IGNORADAS = {"descripcion", "fuente", "notas"}
+
+# Columnas y piezas que se pueden usar en las condiciones.
+CARACTERISTICAS = {
+    "APERTURA", "CIERRE", "MAXIMO", "MINIMO", "VOLUMEN",
+    "CUERPO", "RANGO", "SOMBRA_INF", "SOMBRA_SUP",
+}
+
+# Números escritos con letras (para "DOS_VECES_EL_CUERPO").
+NUMEROS = {"UNA": 1, "UN": 1, "DOS": 2, "TRES": 3, "CUATRO": 4, "CINCO": 5}
+
+VELAS_TENDENCIA = 10  # Velas hacia atrás para decidir si venía bajando o subiendo.
+VELAS_TENDENCIA_SUPERIOR = 3  # Barras altas hacia atrás (3 de 4h = 48 velas de 15m: caben en el radar).
+SOMBRA_CASI_NULA = 0.1  # Sombra "casi nula" = menos del 10% del rango de la vela.
+CUERPO_DOJI = 0.15  # Igual que Volman: cuerpo <= 15% del rango.
+
+_CONDICION = re.compile(
+    r"^\s*(?:(?P<f1>\d+(?:\.\d+)?)\s*\*\s*)?(?P<a>[A-Z_]+?)_(?P<na>\d+)\s*"
+    r"(?P<op>>=|<=|>|<)\s*"
+    r"(?:(?P<f2>\d+(?:\.\d+)?)\s*\*\s*)?(?P<b>[A-Z_]+?)_(?P<nb>\d+)\s*$"
+)
+_OPERADORES = {">": np.greater, "<": np.less, ">=": np.greater_equal, "<=": np.less_equal}
+
+
+class ReglaDesconocida(ValueError):
+    """La receta usa una clave o un valor que el compilador no sabe traducir."""
+
+
+class ContextoVelas:
+    """
+    Las velas de una historia y la caché de piezas comunes.
+    Cada pieza (cuerpo, sombras, colores, tendencias, mínimos móviles...) se calcula
+    la primera vez que una regla la pide y se reutiliza en todas las demás estrategias.
+    """
+
+    def __init__(self, datos, timeframe: str = "15m"):
+        self.datos = datos
+        self.timeframe = timeframe  # Temporalidad de las velas (la base de las temporalidades altas).
+        self.n = len(datos)
+        self._cache = {}
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+
+    def _pieza(self, clave, calcular):
+        if clave in self._cache:
+            self.aciertos_cache += 1
+            return self._cache[clave]
+        self.fallos_cache += 1
+        valor = calcular()
+        self._cache[clave] = valor
+        return valor
+
+    def columna(self, nombre: str) -> np.ndarray:
+        columnas = {"APERTURA": "open", "CIERRE": "close", "MAXIMO": "high", "MINIMO": "low", "VOLUMEN": "volume"}
+        return self._pieza(("columna", nombre), lambda: ind._array(self.datos[columnas[nombre]]))
+
+    def caracteristica(self, nombre: str, desplazamiento: int = 0) -> np.ndarray:
+        """Una pieza numérica, mirando 'desplazamiento' velas atrás (NaN si no existe)."""
+        if desplazamiento:
+            return self._pieza((nombre, desplazamiento),
+                               lambda: ind.desplazar(self.caracteristica(nombre), desplazamiento))
+        if nombre in ("APERTURA", "CIERRE", "MAXIMO", "MINIMO", "VOLUMEN"):
+            return self.columna(nombre)
+
+        def _calcular():
+            apertura, cierre = self.columna("APERTURA"), self.columna("CIERRE")
+            maximo, minimo = self.columna("MAXIMO"), self.columna("MINIMO")
+            if nombre == "CUERPO":
+                return np.abs(cierre - apertura)
+            if nombre == "RANGO":
+                return maximo - minimo
+            if nombre == "SOMBRA_INF":
+                return np.minimum(apertura, cierre) - minimo
+            if nombre == "SOMBRA_SUP":
+                return maximo - np.maximum(apertura, cierre)
+            raise ReglaDesconocida(f"Pieza desconocida: {nombre}")
+
+        return self._pieza((nombre, 0), _calcular)
+
+    def mascara(self, nombre: str, desplazamiento: int = 0) -> np.ndarray:
+        """Una pieza de sí/no (VERDE, ROJA, DOJI...), mirando 'desplazamiento' velas atrás (False si no existe)."""
+        if desplazamiento:
+            def _desplazada():
+                base = self.mascara(nombre)
+                salida = np.zeros(self.n, dtype=bool)
+                salida[desplazamiento:] = base[:self.n - desplazamiento]
+                return salida
+            return self._pieza((nombre, desplazamiento), _desplazada)
+
+        def _calcular():
+            apertura, cierre = self.columna("APERTURA"), self.columna("CIERRE")
+            if nombre == "VERDE":
+                return cierre > apertura
+            if nombre == "ROJA":
+                return cierre < apertura
+            if nombre == "DOJI":
+                rango = self.caracteristica("RANGO")
+                return (rango > 0) & (self.caracteristica("CUERPO") <= rango * CUERPO_DOJI)
+            raise ReglaDesconocida(f"Forma de vela desconocida: {nombre}")
+
+        return self._pieza((nombre, 0), _calcular)
+
+    def tendencia(self, direccion: str, velas: int, desplazamiento: int) -> np.ndarray:
+        """¿Venía bajando (o subiendo) el precio en las 'velas' anteriores a la vela 'desplazamiento'?"""
+        def _calcular():
+            antes = self.caracteristica("CIERRE", desplazamiento)
+            mucho_antes = self.caracteristica("CIERRE", desplazamiento + velas)
+            with np.errstate(invalid="ignore"):
+                return antes < mucho_antes if direccion == "BAJISTA" else antes > mucho_antes
+        return self._pieza(("tendencia", direccion, velas, desplazamiento), _calcular)
+
+    def tendencia_superior(self, direccion: str, timeframe: str, velas: int) -> np.ndarray:
+        """¿Venía bajando (o subiendo) la temporalidad alta en sus últimas 'velas' barras YA CERRADAS?"""
+        def _calcular():
+            if "timestamp" not in self.datos:
+                raise ReglaDesconocida("tendencia_superior necesita la columna 'timestamp'")
+            try:
+                barras = remuestrear(self.datos, timeframe, self.timeframe)
+            except ValueError as e:
+                raise ReglaDesconocida(str(e))
+            cierres = barras["close"].to_numpy(dtype=np.float64)
+            antes = ind.desplazar(cierres, velas)
+            with np.errstate(invalid="ignore"):
+                cumple = np.where(cierres < antes if direccion == "BAJISTA" else cierres > antes, 1.0, 0.0)
+            cumple[np.isnan(antes)] = np.nan
+            alineada = alinear(self.datos["timestamp"], barras["cierre"], cumple, timeframe_a_ms(self.timeframe))
+            return alineada == 1.0  # NaN (todavía sin barras suficientes) = no.
+        return self._pieza(("tendencia_superior", direccion, timeframe, velas), _calcular)
+
+    def minimo_movil(self, velas: int, desplazamiento: int = 0) -> np.ndarray:
+        return self._pieza(("minimo_movil", velas, desplazamiento),
+                           lambda: ind.desplazar(ind.minimo_movil(self.columna("MINIMO"), velas), desplazamiento))
+
+    def maximo_movil(self, velas: int, desplazamiento: int = 0) -> np.ndarray:
+        return self._pieza(("maximo_movil", velas, desplazamiento),
+                           lambda: ind.desplazar(ind.maximo_movil(self.columna("MAXIMO"), velas), desplazamiento))
+
+    def media_volumen(self, velas: int) -> np.ndarray:
+        """Volumen medio de las 'velas' ANTERIORES (sumas acumuladas: O(n))."""
+        def _calcular():
+            volumen = self.columna("VOLUMEN")
+            acumulado = np.concatenate([[0.0], np.cumsum(volumen)])
+            media = np.full(self.n, np.nan)
+            media[velas:] = (acumulado[velas:self.n] - acumulado[:self.n - velas]) / velas
+            return media
+        return self._pieza(("media_volumen", velas), _calcular)
+
+    def pivotes(self, velas_lado: int = 3, umbral_pct: float = 1.0):
+        """El índice de pivotes de la historia (uno para todas las figuras que lo pidan)."""
+        return self._pieza(("pivotes", velas_lado, umbral_pct),
+                           lambda: extraer_pivotes(self.columna("MAXIMO"), self.columna("MINIMO"), velas_lado, umbral_pct))
+
+    def figura(self, nombre: str, tolerancia: float = figuras.TOLERANCIA,
+               separacion: int = figuras.SEPARACION_MINIMA) -> np.ndarray:
+        """¿Rompe en esta vela (hacia arriba) alguna figura 'nombre'?"""
+        def _calcular():
+            eventos = figuras.rupturas_figuras(self.columna("CIERRE"), self.pivotes(), [nombre], tolerancia, separacion)
+            return figuras.senal_figuras(eventos, self.n, figura=nombre, alcista=True).astype(bool)
+        return self._pieza(("figura", nombre, tolerancia, separacion), _calcular)
+
+
+# --- TRADUCCIÓN DE CADA REGLA A UN TÉRMINO (función contexto -> array de sí/no) ---
+
+def _numero(texto: str) -> float:
+    """Saca el número de '10_VELAS_MINIMO', 'MENOR_AL_2%' o 'DOS_VECES_EL_CUERPO'."""
+    texto = str(texto).upper()
+    encontrado = re.search(r"\d+(?:\.\d+)?", texto)
+    if encontrado:
+        return float(encontrado.group())
+    for palabra, valor in NUMEROS.items():
+        if texto.startswith(palabra + "_"):
+            return float(valor)
+    raise ReglaDesconocida(f"No encuentro ningún número en '{texto}'")
+
+
+def _velas_del_patron(reglas: dict) -> int:
+    """Cuántas velas tiene el patrón (el mayor N que aparece en 'vela_N' o 'PIEZA_N')."""
+    numeros = [1]
+    for clave, valor in reglas.items():
+        if re.fullmatch(r"vela_\d+", clave):
+            numeros.append(int(clave.split("_")[1]))
+        if clave.startswith("condicion"):
+            numeros += [int(n) for n in re.findall(r"_(\d+)", str(valor))]
+    return max(numeros)
+
+
+def _termino_condicion(texto: str, total: int):
+    partes = _CONDICION.match(str(texto).upper())
+    if not partes or partes["a"] not in CARACTERISTICAS or partes["b"] not in CARACTERISTICAS:
+        raise ReglaDesconocida(f"Condición que no entiendo: '{texto}'")
+    a, b = partes["a"], partes["b"]
+    # La vela N del patrón está (total - N) velas atrás de la actual.
+    da, db = total - int(partes["na"]), total - int(partes["nb"])
+    fa, fb = float(partes["f1"] or 1), float(partes["f2"] or 1)
+    operador = _OPERADORES[partes["op"]]
+
+    def _termino(ctx):
+        izquierda, derecha = ctx.caracteristica(a, da), ctx.caracteristica(b, db)
+        if fa != 1:
+            izquierda = izquierda * fa
+        if fb != 1:
+            derecha = derecha * fb
+        with np.errstate(invalid="ignore"):
+            return operador(izquierda, derecha)
+    return _termino
+
+
+def _termino_sombra(clave: str, valor: str):
+    pieza = "SOMBRA_INF" if clave == "sombra_inferior" else "SOMBRA_SUP"
+    valor = str(valor).upper()
+    if "VECES_EL_CUERPO" in valor:
+        factor = _numero(valor)
+        return lambda ctx: ctx.caracteristica(pieza) >= ctx.caracteristica("CUERPO") * factor
+    if valor == "CASI_NULA":
+        return lambda ctx: ctx.caracteristica(pieza) <= ctx.caracteristica("RANGO") * SOMBRA_CASI_NULA
+    raise ReglaDesconocida(f"{clave} = '{valor}'")
+
+
+def _termino_forma(valor: str):
+    valor = str(valor).upper()
+    if valor == "MARTILLO":
+        return lambda ctx: ctx.caracteristica("SOMBRA_INF") > ctx.caracteristica("CUERPO") * 2
+    if valor == "ESTRELLA_FUGAZ":
+        return lambda ctx: ctx.caracteristica("SOMBRA_SUP") > ctx.caracteristica("CUERPO") * 2
+    if valor == "DOJI":
+        return lambda ctx: ctx.mascara("DOJI")
+    raise ReglaDesconocida(f"forma = '{valor}'")
+
+
+def _termino_volumen(valor: str, ventana: int):
+    valor = str(valor).upper()
+    if valor == "CRECIENTE":
+        return lambda ctx: ctx.caracteristica("VOLUMEN") > ctx.caracteristica("VOLUMEN", 1)
+    if valor == "CRECIENTE_EN_SUBIDA":
+        # La vela actual sube y con más volumen del habitual.
+        return lambda ctx: ctx.mascara("VERDE") & (ctx.caracteristica("VOLUMEN") > ctx.media_volumen(ventana))
+    raise ReglaDesconocida(f"volumen = '{valor}'")
+
+
+def _termino_suelo_multiple(puntos: int, distancia: int, diferencia: float):
+    """
+    Suelo doble/triple de verdad: 'puntos' suelos del índice de pivotes a menos de 'diferencia'
+    entre sí, separados al menos 'distancia' velas, y la vela actual rompiendo el cuello.
+    """
+    nombre = {2: "DOBLE_SUELO", 3: "TRIPLE_SUELO"}.get(puntos)
+    if nombre is None:
+        raise ReglaDesconocida(f"puntos_minimos = {puntos} (sé hacer 2 o 3)")
+    return lambda ctx: ctx.figura(nombre, diferencia, distancia)
+
+
+def _termino_figura(valor: str):
+    nombre = str(valor).upper()
+    if nombre not in figuras.FIGURAS:
+        raise ReglaDesconocida(f"figura = '{valor}'")
+    return lambda ctx: ctx.figura(nombre)
+
+
+def compilar_reglas(reglas: dict):
+    """
+    Traduce una receta a una función predicado(contexto) -> array bool (una por vela).
+    Lanza ReglaDesconocida si la receta usa vocabulario que no conocemos.
+    """
+    reglas = {k: v for k, v in reglas.items() if k not in CLAVES_IGNORADAS}
+    total = _velas_del_patron(reglas)
+    terminos = []
+
+    distancia = int(_numero(reglas["distancia_tiempo"])) if "distancia_tiempo" in reglas else VELAS_TENDENCIA
+    for clave, valor in reglas.items():
+        if re.fullmatch(r"vela_\d+", clave):
+            forma, desplazamiento = str(valor).upper(), total - int(clave.split("_")[1])
+            terminos.append(lambda ctx, f=forma, d=desplazamiento: ctx.mascara(f, d))
+        elif clave.startswith("condicion"):
+            terminos.append(_termino_condicion(valor, total))
+        elif clave == "tendencia_previa":
+            direccion, _, velas = str(valor).upper().partition("_")
+            if direccion not in ("BAJISTA", "ALCISTA"):
+                raise ReglaDesconocida(f"tendencia_previa = '{valor}'")
+            velas = int(velas) if velas else VELAS_TENDENCIA
+            terminos.append(lambda ctx, d=direccion, v=velas: ctx.tendencia(d, v, total))
+        elif clave == "tendencia_superior":
+            partes = str(valor).upper().split("_")
+            if len(partes) not in (2, 3) or partes[0] not in ("BAJISTA", "ALCISTA") \
+                    or not re.fullmatch(r"\d+[MHDW]", partes[1]) or (len(partes) == 3 and not partes[2].isdigit()):
+                raise ReglaDesconocida(f"tendencia_superior = '{valor}'")
+            direccion, temporalidad = partes[0], partes[1].lower()
+            velas = int(partes[2]) if len(partes) == 3 else VELAS_TENDENCIA_SUPERIOR
+            terminos.append(lambda ctx, d=direccion, t=temporalidad, v=velas: ctx.tendencia_superior(d, t, v))
+        elif clave in ("sombra_inferior", "sombra_superior"):
+            terminos.append(_termino_sombra(clave, valor))
+        elif clave == "forma":
+            terminos.append(_termino_forma(valor))
+        elif clave == "volumen":
+            terminos.append(_termino_volumen(valor, distancia))
+        elif clave == "puntos_minimos":
+            diferencia = _numero(reglas.get("diferencia_precio", "2%")) / 100
+            terminos.append(_termino_suelo_multiple(int(valor), distancia, diferencia))
+        elif clave == "figura":
+            terminos.append(_termino_figura(valor))
+        elif clave in ("distancia_tiempo", "diferencia_precio"):
+            continue  # Parámetros de 'puntos_minimos'.
+        else:
+            raise ReglaDesconocida(f"Clave desconocida: '{clave}'")
+
+    if not terminos:
+        raise ReglaDesconocida("La receta no tiene ninguna regla operable.")
+
+    def predicado(ctx: ContextoVelas) -> np.ndarray:
+        # Todas las condiciones se van combinando sobre UN mismo array (sin temporales por término).
+        senal = np.array(terminos[0](ctx), dtype=bool, copy=True)
+        for termino in terminos[1:]:
+            if not senal.any():
+                break  # Ya no queda ninguna vela candidata: no hace falta mirar más.
+            np.logical_and(senal, termino(ctx), out=senal)
+        return senal
+
+    predicado.velas_patron = total
+    return predicado
+
+
+class CompiladorReglas:
+    """Compila cada receta una sola vez (caché por contenido de la receta)."""
+
+    def __init__(self):
+        self._compiladas = {}
+
+    def compilar(self, reglas: dict):
+        clave = json.dumps(reglas, sort_keys=True, ensure_ascii=False)
+        if clave not in self._compiladas:
+            self._compiladas[clave] = compilar_reglas(reglas)
+        return self._compiladas[clave]
+
+    def senal(self, contexto: ContextoVelas, reglas: dict) -> np.ndarray:
+        """Array de 0/1 (una por vela) para la receta sobre las velas del contexto."""
+        return self.compilar(reglas)(contexto).astype(np.int8)
+
+
+# Banco de pruebas: las recetas del Bibliotecario sobre un millón de velas.
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    rng = np.random.default_rng(8)
+    n = 1_000_000
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = np.concatenate([[cierres[0]], cierres[:-1]]) * (1 + rng.normal(0, 0.0005, n))
+    datos = pd.DataFrame({
+        "open": aperturas, "close": cierres, "volume": rng.uniform(1, 100, n),
+        "high": np.maximum(aperturas, cierres) * (1 + rng.uniform(0, 0.002, n)),
+        "low": np.minimum(aperturas, cierres) * (1 - rng.uniform(0, 0.002, n)),
+    })
+
+    try:
+        with open("estrategias_candidatas.json", "r", encoding="utf-8") as f:
+            candidatas = json.load(f)
+    except OSError:
+        from nucleo.bibliotecario import BibliotecarioRAG
+        candidatas = BibliotecarioRAG().analizar_patrones_tecnicos()
+
+    compilador = CompiladorReglas()
+    contexto = ContextoVelas(datos)
+    for estrategia in candidatas:
+        inicio = time.perf_counter()
+        senal = compilador.senal(contexto, estrategia["reglas"])
+        duracion = time.perf_counter() - inicio
+        print(f"🧩 {estrategia['nombre']:34s} {senal.sum():8,} señales en {duracion * 1000:7.1f} ms "
+              f"({n / duracion:,.0f} velas/s)")
+    print(f"   Caché de piezas: {contexto.aciertos_cache} aciertos / {contexto.fallos_cache} cálculos")
@@ -0,0 +1,196 @@
+# nucleo/escaner_multimercado.py
+# 🛰️ EL RADAR MULTIMERCADO (ESCÁNER CONCURRENTE)
+# Antes el Scout miraba un solo mercado (config.SYMBOL) en una sola temporalidad por vuelta.
+# Ahora el radar barre muchos símbolos y temporalidades a la vez, sin pasarse del límite
+# de peticiones del exchange, y devuelve UNA lista ordenada de oportunidades.
+
+import time  # Para medir la velocidad del barrido.
+import asyncio  # Para mirar muchos mercados a la vez.
+
+import pandas as pd  # La tabla mágica.
+
+from nucleo.sesion_exchange import REGISTRO_EXCHANGES  # La línea compartida con el exchange.
+from nucleo.almacen_velas import ALMACEN_VELAS  # La historia guardada en disco.
+import config  # Las instrucciones secretas.
+
+
+class PresupuestoPeticiones:
+    """
+    Cubo de fichas (token bucket) compartido por todas las tareas del radar.
+    Cada petición al exchange gasta una ficha; las fichas se rellenan a ritmo fijo.
+    Así cientos de tareas concurrentes no superan el límite del exchange.
+    """
+
+    def __init__(self, peticiones_por_segundo: float, rafaga: int = None):
+        self.ritmo = float(peticiones_por_segundo)
+        self.capacidad = float(rafaga or max(1, int(peticiones_por_segundo)))
+        self.fichas = self.capacidad
+        self._ultima_recarga = time.monotonic()
+        self._candado = None
+        self._bucle = None  # Bucle asíncrono al que pertenece el candado.
+
+    async def consumir(self, peso: float = 1.0):
+        """Espera hasta que haya fichas suficientes y las gasta."""
+        # El radar vive todo el proceso; si nos llaman desde otro bucle (p. ej. un asyncio.run nuevo),
+        # el candado viejo ya no sirve: creamos uno para este bucle. Las fichas se conservan.
+        bucle = asyncio.get_running_loop()
+        if self._bucle is not bucle:
+            self._bucle, self._candado = bucle, asyncio.Lock()
+        async with self._candado:
+            while True:
+                ahora = time.monotonic()
+                self.fichas = min(self.capacidad, self.fichas + (ahora - self._ultima_recarga) * self.ritmo)
+                self._ultima_recarga = ahora
+                if self.fichas >= peso:
+                    self.fichas -= peso
+                    return
+                # Dormimos justo lo que falta para tener la ficha.
+                await asyncio.sleep((peso - self.fichas) / self.ritmo)
+
+
+def evaluar_volman(simbolo: str, timeframe: str, velas: pd.DataFrame):
+    """
+    Evaluador por defecto: aplica Volman a la última vela CERRADA del mercado.
+    'velas' es una tabla con timestamp/open/high/low/close/volume.
+    Devuelve una oportunidad (dict) o None si no hay señal.
+    La puntuación es la fuerza de la ruptura medida en ATRs.
+    """
+    # Importamos aquí: el radar no necesita la estrategia hasta que hay velas que mirar.
+    from nucleo.estrategia_volman import AnalistaVolmanVectorizado
+
+    if len(velas) < 30:
+        return None
+    # Copia superficial: Volman añade columnas, pero no debe tocar la tabla del almacén.
+    df = AnalistaVolmanVectorizado().populate_signals(velas.copy(deep=False))
+
+    # La última fila es la vela que se está formando: miramos la anterior.
+    cerrada = df.iloc[-2]
+    if not cerrada['enter_long'] or not cerrada['ATR'] > 0:
+        return None
+
+    ruptura = cerrada['close'] - cerrada['donchian_high']
+    return {
+        "simbolo": simbolo,
+        "timeframe": timeframe,
+        "precio": float(df['close'].iloc[-1]),
+        "puntuacion": float(ruptura / cerrada['ATR']),
+        "estrategia": "VOLMAN",
+        "timestamp": int(cerrada['timestamp']),
+    }
+
+
+class EscanerMultimercado:
+    """
+    Programador del radar: lanza una tarea por (símbolo, temporalidad),
+    limitadas por un semáforo (cuántas a la vez) y por el presupuesto de peticiones.
+    """
+
+    def __init__(self, simbolos=None, timeframes=None, max_concurrencia: int = None,
+                 presupuesto: PresupuestoPeticiones = None, evaluador=None, descargar=None,
+                 velas_por_mercado: int = None):
+        self.simbolos = list(simbolos or config.UNIVERSO_SIMBOLOS)
+        self.timeframes = list(timeframes or config.UNIVERSO_TIMEFRAMES)
+        self.max_concurrencia = max_concurrencia or config.MAX_CONCURRENCIA_ESCANER
+        self.presupuesto = presupuesto or PresupuestoPeticiones(config.PETICIONES_POR_SEGUNDO)
+        self.evaluador = evaluador or evaluar_volman
+        self.descargar = descargar or self._descargar_exchange
+        self.velas_por_mercado = velas_por_mercado or config.VELAS_ESCANER
+
+        self.ultimo_barrido = {}  # Métricas del último barrido.
+        self._tiempos_evaluacion = []  # Segundos de cálculo de cada mercado del barrido en curso.
+
+    async def _descargar_exchange(self, simbolo: str, timeframe: str, limite: int) -> pd.DataFrame:
+        """
+        Pone al día el almacén de velas (solo viajan las velas nuevas) y lee las últimas 'limite'.
+        Cada petición al exchange gasta una ficha del presupuesto compartido.
+        """
+        async def _pedir(simbolo, timeframe, desde, limite_peticion):
+            await self.presupuesto.consumir()
+            return await REGISTRO_EXCHANGES.llamar("fetch_ohlcv", simbolo, timeframe, since=desde, limit=limite_peticion)
+
+        await ALMACEN_VELAS.sincronizar(simbolo, timeframe, minimo=limite, descargar=_pedir)
+        return ALMACEN_VELAS.leer_df(simbolo, timeframe, ultimas=limite)
+
+    async def _escanear_mercado(self, semaforo, simbolo: str, timeframe: str):
+        """Mira un solo mercado: pide permiso, descarga y evalúa."""
+        async with semaforo:
+            velas = await self.descargar(simbolo, timeframe, self.velas_por_mercado)
+        # La evaluación es cálculo puro: la sacamos del bucle para no congelar al resto.
+        return await asyncio.to_thread(self._evaluar_cronometrado, simbolo, timeframe, velas)
+
+    def _evaluar_cronometrado(self, simbolo: str, timeframe: str, velas):
+        """Llama al evaluador y apunta cuánto ha tardado (solo el cálculo, sin la descarga)."""
+        inicio = time.perf_counter()
+        try:
+            return self.evaluador(simbolo, timeframe, velas)
+        finally:
+            self._tiempos_evaluacion.append(time.perf_counter() - inicio)
+
+    async def escanear(self) -> list:
+        """
+        Barre todo el universo a la vez y devuelve las oportunidades ordenadas
+        de mejor a peor puntuación.
+        """
+        semaforo = asyncio.Semaphore(self.max_concurrencia)
+        mercados = [(s, tf) for s in self.simbolos for tf in self.timeframes]
+
+        self._tiempos_evaluacion = []
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(
+            *(self._escanear_mercado(semaforo, s, tf) for s, tf in mercados),
+            return_exceptions=True,
+        )
+        duracion = time.perf_counter() - inicio
+
+        oportunidades, errores = [], 0
+        for resultado in resultados:
+            if isinstance(resultado, Exception):
+                errores += 1
+            elif resultado:
+                oportunidades.append(resultado)
+        oportunidades.sort(key=lambda o: o["puntuacion"], reverse=True)
+
+        velocidad = len(mercados) / duracion if duracion > 0 else 0.0
+        tiempos = self._tiempos_evaluacion
+        self.ultimo_barrido = {
+            "mercados": len(mercados),
+            "oportunidades": len(oportunidades),
+            "errores": errores,
+            "segundos": duracion,
+            "simbolos_por_segundo": velocidad,
+            "segundos_evaluacion": sum(tiempos),
+            "evaluacion_media_ms": 1000 * sum(tiempos) / len(tiempos) if tiempos else 0.0,
+            "evaluacion_max_ms": 1000 * max(tiempos) if tiempos else 0.0,
+        }
+        print(f"🛰️ Radar: {len(mercados)} mercados en {duracion:.2f}s ({velocidad:.1f} símbolos/s). "
+              f"Oportunidades: {len(oportunidades)}. Errores: {errores}. "
+              f"Evaluación: {sum(tiempos) * 1000:.1f} ms ({self.ultimo_barrido['evaluacion_media_ms']:.2f} ms/mercado).")
+        return oportunidades
+
+
+# Prueba rápida: 300 mercados falsos con 50 ms de latencia cada uno (sin internet).
+if __name__ == "__main__":
+    import numpy as np
+
+    async def _descarga_falsa(simbolo, timeframe, limite):
+        await asyncio.sleep(0.05)  # Simulamos la ida y vuelta al exchange.
+        semilla = abs(hash((simbolo, timeframe))) % (2 ** 32)
+        cierres = 100 + np.cumsum(np.random.default_rng(semilla).normal(0, 0.5, limite))
+        return pd.DataFrame({"timestamp": np.arange(limite) * 900000, "open": cierres, "high": cierres + 0.3,
+                             "low": cierres - 0.3, "close": cierres, "volume": 1.0})
+
+    def _evaluador_falso(simbolo, timeframe, velas):
+        # Puntuación sencilla (subida de las últimas 10 velas) para no depender de Volman.
+        cierres = velas["close"].to_numpy()
+        cambio = cierres[-2] / cierres[-12] - 1
+        if cambio <= 0:
+            return None
+        return {"simbolo": simbolo, "timeframe": timeframe, "precio": float(cierres[-1]), "puntuacion": float(cambio)}
+
+    radar = EscanerMultimercado(
+        simbolos=[f"MONEDA{i}/USDT" for i in range(150)], timeframes=["15m", "1h"],
+        max_concurrencia=64, presupuesto=PresupuestoPeticiones(500, rafaga=100),
+        evaluador=_evaluador_falso, descargar=_descarga_falsa,
+    )
+    mejores = asyncio.run(radar.escanear())
+    print(f"🏆 Top 3: {[(o['simbolo'], o['timeframe'], round(o['puntuacion'], 4)) for o in mejores[:3]]}")
@@ -0,0 +1,270 @@
+# nucleo/estadisticas_estrategia.py
+# 📊 LAS ESTADÍSTICAS EN VIVO DE CADA ESTRATEGIA (LO QUE ALIMENTA A KELLY)
+# Antes Kelly siempre recibía lo mismo: 60% de acierto y ratio 2, daba igual cómo le fuera a la estrategia.
+# Ahora cada operación cerrada actualiza, en O(1) y sin releer el historial:
+# - el acierto (operaciones ganadoras / total),
+# - la ganancia media y la pérdida media, con su varianza (Welford con pesos),
+# - y sus cotas de confianza (Wilson para el acierto, error estándar para las medias).
+# Con decaimiento exponencial opcional: lo antiguo pesa menos (los mercados cambian).
+# Lo que midió el laboratorio entra como "previo" (vale ESTADISTICAS_PESO_PREVIO operaciones):
+# al principio manda el laboratorio; según se acumulan operaciones reales, mandan ellas.
+# El estado de cada estrategia se guarda con la memoria a prueba de apagones (foto + diario),
+# así que sobrevive a los reinicios.
+# Ojo: hoy el bucle en vivo no llama a 'registrar' (nadie sigue aún la posición hasta su cierre), así que
+# en la práctica Kelly recibe el previo del laboratorio; lo que hay aquí es la tubería para cuando exista.
+
+import os
+import math
+
+import numpy as np
+
+from nucleo.memoria_estado import GestorEstado  # Foto + diario.
+from nucleo.gestor_riesgo import PROB_WIN_DEFECTO  # Lo que se usa cuando no sabemos nada.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+PREFIJO = "estrategia:"  # Cada estrategia es una clave de la memoria: una operación = una línea del diario.
+
+
+class MediaPonderada:
+    """
+    Media y varianza con pesos (Welford). Decaer multiplica los pesos de todo lo anterior:
+    la media no cambia, solo lo que pesa frente a lo que venga.
+    """
+    __slots__ = ("peso", "peso2", "media", "m2")
+
+    def __init__(self, peso=0.0, peso2=0.0, media=0.0, m2=0.0):
+        self.peso = peso    # Suma de pesos.
+        self.peso2 = peso2  # Suma de pesos al cuadrado (para el tamaño efectivo).
+        self.media = media
+        self.m2 = m2        # Suma ponderada de cuadrados de desviaciones.
+
+    def decaer(self, factor: float):
+        self.peso *= factor
+        self.peso2 *= factor * factor
+        self.m2 *= factor
+
+    def anadir(self, valor: float):
+        self.peso += 1.0
+        self.peso2 += 1.0
+        delta = valor - self.media
+        self.media += delta / self.peso
+        self.m2 += delta * (valor - self.media)
+
+    def efectivas(self) -> float:
+        """Número efectivo de observaciones (Kish): con decaimiento, menos que las reales."""
+        return self.peso * self.peso / self.peso2 if self.peso2 > 0 else 0.0
+
+    def error_estandar(self) -> float:
+        n = self.efectivas()
+        if n <= 1:
+            return math.inf
+        varianza = self.m2 / self.peso * n / (n - 1)
+        return math.sqrt(max(varianza, 0.0) / n)
+
+    def a_lista(self) -> list:
+        return [self.peso, self.peso2, self.media, self.m2]
+
+
+def wilson(p: float, n: float, z: float):
+    """Intervalo de Wilson para una proporción 'p' medida en 'n' casos (funciona bien con pocas operaciones)."""
+    if n <= 0:
+        return 0.0, 1.0
+    z2 = z * z
+    centro = (p + z2 / (2 * n)) / (1 + z2 / n)
+    margen = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return max(0.0, centro - margen), min(1.0, centro + margen)
+
+
+class EstimadorEstrategia:
+    """
+    Acierto, ganancia media y pérdida media de UNA estrategia, actualizados operación a operación.
+    Los resultados son relativos (p. ej. fracción del nocional): el ratio no depende del tamaño.
+    """
+
+    def __init__(self, decaimiento: float = 1.0, estado: dict = None):
+        self.decaimiento = decaimiento
+        estado = estado or {}
+        self.operaciones = int(estado.get("operaciones", 0))
+        self.ganancias = MediaPonderada(*estado.get("ganancias", ()))
+        self.perdidas = MediaPonderada(*estado.get("perdidas", ()))  # En positivo (lo que se pierde).
+
+    def registrar(self, resultado: float):
+        """Una operación cerrada: O(1)."""
+        if self.decaimiento < 1.0:
+            self.ganancias.decaer(self.decaimiento)
+            self.perdidas.decaer(self.decaimiento)
+        if resultado > 0:
+            self.ganancias.anadir(resultado)
+        else:
+            self.perdidas.anadir(-resultado)  # Las de resultado 0 cuentan como perdidas (pagan comisiones).
+        self.operaciones += 1
+
+    def resumen(self, z: float = None) -> dict:
+        """Valores centrales y cotas de confianza."""
+        z = config.ESTADISTICAS_Z if z is None else z
+        ganadas, perdidas = self.ganancias, self.perdidas
+        peso = ganadas.peso + perdidas.peso
+        efectivas = peso * peso / (ganadas.peso2 + perdidas.peso2) if peso > 0 else 0.0
+        acierto = ganadas.peso / peso if peso > 0 else None
+        cotas = wilson(acierto or 0.0, efectivas, z)
+        ratio = ganadas.media / perdidas.media if ganadas.peso > 0 and perdidas.peso > 0 and perdidas.media > 0 else None
+        return {
+            "operaciones": self.operaciones,
+            "efectivas": efectivas,
+            "acierto": acierto,
+            "acierto_cotas": cotas,
+            "ganancia_media": ganadas.media if ganadas.peso > 0 else None,
+            "ganancia_cotas": (ganadas.media - z * ganadas.error_estandar(), ganadas.media + z * ganadas.error_estandar()),
+            "perdida_media": perdidas.media if perdidas.peso > 0 else None,
+            "perdida_cotas": (perdidas.media - z * perdidas.error_estandar(), perdidas.media + z * perdidas.error_estandar()),
+            "ratio": ratio,
+        }
+
+    def parametros_kelly(self, prob_previa: float, ratio_previo: float, peso_previo: float,
+                         z: float, conservador: bool):
+        """
+        (acierto, ratio) para Kelly. Lo del laboratorio vale 'peso_previo' operaciones;
+        en modo conservador se usan las cotas malas (acierto bajo, ganancia baja, pérdida alta).
+        """
+        ganadas, perdidas = self.ganancias, self.perdidas
+        peso = ganadas.peso + perdidas.peso
+        efectivas = peso * peso / (ganadas.peso2 + perdidas.peso2) if peso > 0 else 0.0
+
+        # Acierto: el previo como 'peso_previo' operaciones más, con ese mismo acierto.
+        n = efectivas + peso_previo
+        acierto = (ganadas.peso / peso * efectivas + prob_previa * peso_previo) / n if n > 0 else prob_previa
+        if conservador and efectivas > 0:
+            acierto = wilson(acierto, n, z)[0]
+
+        # Ratio: hace falta haber visto ganar y perder; si no, el previo.
+        if ganadas.peso <= 0 or perdidas.peso <= 0:
+            return acierto, ratio_previo
+        ganancia, perdida = ganadas.media, perdidas.media
+        if conservador:
+            ganancia = max(ganancia - z * ganadas.error_estandar(), 0.0)
+            perdida = perdida + z * perdidas.error_estandar()
+        if not (perdida > 0) or math.isinf(perdida):
+            return acierto, ratio_previo
+        vistas = min(ganadas.efectivas(), perdidas.efectivas())
+        ratio = (ganancia / perdida * vistas + ratio_previo * peso_previo) / (vistas + peso_previo)
+        return acierto, ratio
+
+    def a_dict(self) -> dict:
+        return {"operaciones": self.operaciones, "ganancias": self.ganancias.a_lista(),
+                "perdidas": self.perdidas.a_lista()}
+
+
+class EstadisticasEstrategias:
+    """
+    Todas las estrategias del robot. registrar() actualiza y guarda solo la que ha cerrado;
+    parametros() / parametros_lote() dan a Kelly (acierto, ratio) sin recorrer nada.
+    """
+
+    def __init__(self, ruta: str = None, decaimiento: float = None, peso_previo: float = None,
+                 z: float = None, conservador: bool = None, memoria: GestorEstado = None):
+        self.decaimiento = config.ESTADISTICAS_DECAIMIENTO if decaimiento is None else decaimiento
+        self.peso_previo = config.ESTADISTICAS_PESO_PREVIO if peso_previo is None else peso_previo
+        self.z = config.ESTADISTICAS_Z if z is None else z
+        self.conservador = config.ESTADISTICAS_CONSERVADOR if conservador is None else conservador
+        if memoria is None:
+            ruta = ruta or config.ESTADISTICAS_RUTA
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            memoria = GestorEstado(ruta, estado_inicial={})
+        self.memoria = memoria
+        self.estimadores = {
+            clave[len(PREFIJO):]: EstimadorEstrategia(self.decaimiento, self.memoria.obtener(clave))
+            for clave in self.memoria.claves() if clave.startswith(PREFIJO)
+        }
+        self._parametros = {}  # Caché de (acierto, ratio) por (estrategia, previo): se borra al registrar.
+        if self.estimadores:
+            total = sum(e.operaciones for e in self.estimadores.values())
+            print(f"📊 Estadísticas: {len(self.estimadores)} estrategias recuperadas ({total} operaciones).")
+
+    def registrar(self, estrategia: str, resultado: float) -> EstimadorEstrategia:
+        """Apunta una operación cerrada de 'estrategia' (resultado relativo, + gana / - pierde)."""
+        estimador = self.estimadores.get(estrategia)
+        if estimador is None:
+            estimador = self.estimadores[estrategia] = EstimadorEstrategia(self.decaimiento)
+        estimador.registrar(float(resultado))
+        self._parametros = {clave: valor for clave, valor in self._parametros.items() if clave[0] != estrategia}
+        self.memoria.actualizar(**{PREFIJO + estrategia: estimador.a_dict()})
+        return estimador
+
+    def parametros(self, estrategia: str = None, prob_previa: float = None, ratio_previo: float = None):
+        """(acierto, ratio) para Kelly. Sin operaciones en vivo: el previo (o los valores por defecto)."""
+        prob_previa = PROB_WIN_DEFECTO if prob_previa is None else float(prob_previa)
+        ratio_previo = config.RATIO_OBJETIVO if ratio_previo is None else float(ratio_previo)
+        estimador = self.estimadores.get(estrategia)
+        if estimador is None:
+            return prob_previa, ratio_previo
+        clave = (estrategia, prob_previa, ratio_previo)
+        valor = self._parametros.get(clave)
+        if valor is None:
+            valor = self._parametros[clave] = estimador.parametros_kelly(
+                prob_previa, ratio_previo, self.peso_previo, self.z, self.conservador)
+        return valor
+
+    def parametros_lote(self, estrategias, prob_previa=None, ratio_previo=None):
+        """Arrays de (acierto, ratio) para calcular_kelly_lote: uno por candidata."""
+        n = len(estrategias)
+        previas = np.broadcast_to(np.asarray(PROB_WIN_DEFECTO if prob_previa is None else prob_previa, dtype=np.float64), (n,))
+        ratios = np.broadcast_to(np.asarray(config.RATIO_OBJETIVO if ratio_previo is None else ratio_previo, dtype=np.float64), (n,))
+        salida = np.array([self.parametros(e, p, r) for e, p, r in zip(estrategias, previas, ratios)],
+                          dtype=np.float64).reshape(n, 2)
+        return salida[:, 0], salida[:, 1]
+
+    def resumen(self) -> dict:
+        return {nombre: estimador.resumen(self.z) for nombre, estimador in self.estimadores.items()}
+
+    def cerrar(self):
+        """Apagado ordenado: foto limpia."""
+        self.memoria.cerrar()
+
+
+# Prueba rápida: una estrategia buena y otra que se estropea, reinicio y coste por operación.
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    rng = np.random.default_rng(24)
+    carpeta = tempfile.mkdtemp()
+    ruta = os.path.join(carpeta, "estadisticas.json")
+
+    estadisticas = EstadisticasEstrategias(ruta)
+    for i in range(2000):
+        # BUENA: 55% de acierto, gana 2 por cada 1 que pierde.
+        estadisticas.registrar("BUENA", rng.normal(0.02, 0.004) if rng.random() < 0.55 else -rng.normal(0.01, 0.002))
+        # ESTROPEADA: era buena; en las últimas 500 solo acierta el 30%.
+        acierto = 0.55 if i < 1500 else 0.30
+        estadisticas.registrar("ESTROPEADA", rng.normal(0.02, 0.004) if rng.random() < acierto else -rng.normal(0.01, 0.002))
+
+    for nombre, r in estadisticas.resumen().items():
+        p, b = estadisticas.parametros(nombre, prob_previa=0.6)
+        print(f"📊 {nombre:10s}: {r['operaciones']} ops ({r['efectivas']:.0f} efectivas) | acierto {r['acierto']:.1%} "
+              f"[{r['acierto_cotas'][0]:.1%}, {r['acierto_cotas'][1]:.1%}] | ratio {r['ratio']:.2f} -> Kelly recibe p={p:.3f}, b={b:.2f}")
+
+    # Coste de apuntar una operación (actualizar + diario) y de pedir los parámetros.
+    inicio = time.perf_counter()
+    for _ in range(5000):
+        estadisticas.registrar("BUENA", 0.01)
+    coste_registro = (time.perf_counter() - inicio) / 5000 * 1e6
+    inicio = time.perf_counter()
+    for _ in range(100_000):
+        estadisticas.parametros("BUENA", prob_previa=0.6)
+    coste_parametros = (time.perf_counter() - inicio) / 100_000 * 1e6
+    print(f"⏱️ Registrar una operación: {coste_registro:.1f} µs | Parámetros para Kelly: {coste_parametros:.2f} µs")
+
+    # Reinicio: lo recuperado tiene que ser idéntico (sin releer el historial de operaciones).
+    antes = estadisticas.resumen()
+    estadisticas.memoria._journal.close()  # Apagón: sin cerrar ordenadamente.
+    recuperadas = EstadisticasEstrategias(ruta)
+    assert recuperadas.resumen() == antes
+    recuperadas.cerrar()
+    print("🧠 Reinicio: estadísticas recuperadas idénticas ✅")
@@ -4,37 +4,41 @@
 # Usamos "Magia de Tablas" (Vectorización) en lugar de mirar vela por vela.
 
 import pandas as pd  # La tabla mágica.
-import pandas_ta as ta  # Las herramientas de dibujo (indicadores).
 import numpy as np  # Matemáticas rápidas.
 
+from nucleo import indicadores as ind  # EMA, ATR y extremos móviles en NumPy puro (sin pandas_ta).
+
 class AnalistaVolmanVectorizado:
     """
     El cerebro ultra-rápido de Bob Volman.
     Calcula todo de golpe para que el Laboratorio pueda hacer miles de pruebas.
     """
 
-    def __init__(self):
-        # Configuración básica (Parámetros que podemos cambiar).
-        self.periodo_ema = 20  # La media móvil de 20 velas.
-        self.periodo_atr = 14  # Para medir volatilidad.
-        self.bloque_velas = 7  # Cuántas velas miramos para la "Caja Explosiva".
+    def __init__(self, periodo_ema: int = 20, periodo_atr: int = 14, bloque_velas: int = 7,
+                 factor_compresion: float = 1.5, factor_cercania: float = 0.5):
+        # Configuración básica (Parámetros que podemos cambiar; el barrido prueba miles de combinaciones).
+        self.periodo_ema = periodo_ema  # La media móvil de 20 velas.
+        self.periodo_atr = periodo_atr  # Para medir volatilidad.
+        self.bloque_velas = bloque_velas  # Cuántas velas miramos para la "Caja Explosiva".
+        self.factor_compresion = factor_compresion  # Caja comprimida: altura < 1.5 ATR.
+        self.factor_cercania = factor_cercania  # Pegada a la EMA: distancia < 0.5 ATR.
 
     def populate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calcula las líneas y números importantes de TODA la historia a la vez.
         """
         # 1. EMA 20 (La línea sagrada).
-        # Usamos pandas_ta para calcular la columna entera.
-        df['EMA_20'] = ta.ema(df['close'], length=self.periodo_ema)
+        # Calculamos la columna entera con los núcleos NumPy (mismos números que pandas_ta/TA-Lib).
+        df['EMA_20'] = ind.ema(df['close'], self.periodo_ema)
 
         # 2. ATR (El medidor de nerviosismo).
-        df['ATR'] = ta.atr(df['high'], df['low'], df['close'], length=self.periodo_atr)
+        df['ATR'] = ind.atr(df['high'], df['low'], df['close'], self.periodo_atr)
 
         # 3. Canales de Donchian (Para ver máximos y mínimos del bloque).
         # Esto nos dice cuál fue el precio más alto y más bajo de las últimas 7 velas.
         # Shift(1) es importante: queremos el máximo de las 7 ANTERIORES, sin contar la actual.
-        df['donchian_high'] = df['high'].rolling(window=self.bloque_velas).max().shift(1)
-        df['donchian_low'] = df['low'].rolling(window=self.bloque_velas).min().shift(1)
+        df['donchian_high'] = ind.desplazar(ind.maximo_movil(df['high'], self.bloque_velas))
+        df['donchian_low'] = ind.desplazar(ind.minimo_movil(df['low'], self.bloque_velas))
 
         # 4. Altura del Bloque (Tamaño de la caja).
         df['block_height'] = df['donchian_high'] - df['donchian_low']
@@ -68,10 +72,10 @@ class AnalistaVolmanVectorizado:
         # Regla 1: Caja pequeña (Comprimida). Altura < 1.5 veces el ATR promedio.
         # Shift(1) porque miramos el ATR de ayer.
         atr_ayer = df['ATR'].shift(1)
-        es_comprimido = df['block_height'] < (atr_ayer * 1.5)
+        es_comprimido = df['block_height'] < (atr_ayer * self.factor_compresion)
 
         # Regla 2: Pegado a la EMA. Distancia < 0.5 veces el ATR.
-        es_cercano_ema = df['dist_ema'] < (atr_ayer * 0.5)
+        es_cercano_ema = df['dist_ema'] < (atr_ayer * self.factor_cercania)
 
         # Regla 3: Ruptura (El precio actual rompe el techo de la caja).
         es_ruptura = df['close'] > df['donchian_high']
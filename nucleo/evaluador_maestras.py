@@ -0,0 +1,176 @@
+# nucleo/evaluador_maestras.py
+# 🎯 EL EVALUADOR DE ESTRATEGIAS MAESTRAS (LO QUE VALIDÓ EL LABORATORIO, EN VIVO)
+# Antes el Scout leía 'estrategias_maestras.json' del disco en cada vuelta y se quedaba con
+# la primera de la lista sin comprobar nada. Ahora:
+# - El catálogo solo vuelve a leer y compilar el archivo cuando cambia (fecha de modificación).
+# - Cada mercado se evalúa UNA vez: todas las maestras comparten el mismo ContextoVelas,
+#   así que el cuerpo, las sombras, las tendencias o los pivotes se calculan una sola vez.
+# - El resultado dice qué maestras se han cumplido de verdad en la última vela cerrada
+#   y con qué puntuación (el Sharpe fuera de muestra que les dio el laboratorio).
+# - Cada oportunidad lleva lo que el Quant necesita para dimensionarla: el acierto y el ratio
+#   ganancia/pérdida de las operaciones que simuló el laboratorio (mismo stop y objetivo)
+#   y el ATR de la última vela cerrada (para la distancia del stop).
+
+import os  # Para mirar la fecha de modificación del archivo.
+import json  # Para leer las maestras.
+
+import numpy as np  # Matemáticas rápidas.
+
+from nucleo.compilador_reglas import CompiladorReglas, ContextoVelas, ReglaDesconocida  # Recetas -> señales.
+from nucleo import indicadores as ind  # ATR en NumPy puro.
+
+ARCHIVO_MAESTRAS = "estrategias_maestras.json"
+
+
+class CatalogoMaestras:
+    """
+    Las estrategias maestras ya leídas y compiladas.
+    cargar() es barato si el archivo no ha cambiado (solo un os.stat).
+    """
+
+    def __init__(self, ruta: str = ARCHIVO_MAESTRAS, compilador: CompiladorReglas = None):
+        self.ruta = ruta
+        self.compilador = compilador or CompiladorReglas()
+        self.estrategias = []  # [{"nombre", "predicado", "puntuacion", "acierto", "ratio", "original"}]
+        self.recargas = 0
+        self._firma = None
+
+    def cargar(self) -> list:
+        """Devuelve las maestras evaluables (las relee y compila solo si el archivo ha cambiado)."""
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            self.estrategias, self._firma = [], None
+            return self.estrategias
+
+        firma = (estado.st_mtime_ns, estado.st_size)
+        if firma == self._firma:
+            return self.estrategias
+
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                maestras = json.load(f)
+        except (OSError, ValueError) as e:
+            # El laboratorio puede estar escribiéndolo justo ahora: seguimos con la lista anterior
+            # y lo volvemos a intentar en la próxima vuelta (no guardamos la firma).
+            print(f"⚠️ Catálogo: no puedo leer {self.ruta} ({e}). Sigo con la lista anterior.")
+            return self.estrategias
+
+        estrategias = []
+        for estrategia in maestras or []:
+            nombre = estrategia.get("nombre", "SIN_NOMBRE")
+            if not estrategia.get("reglas"):
+                print(f"⚠️ Catálogo: {nombre} no tiene reglas, no se puede evaluar en vivo.")
+                continue
+            try:
+                predicado = self.compilador.compilar(estrategia["reglas"])
+            except ReglaDesconocida as e:
+                print(f"⚠️ Catálogo: {nombre} no se puede compilar ({e}).")
+                continue
+            metricas = estrategia.get("metricas") or {}
+            # Acierto y ratio solo valen para Kelly si salen de operaciones simuladas con el mismo
+            # stop (2 ATR) y objetivo (RATIO_OBJETIVO) que usa el Quant. Las maestras antiguas
+            # (acierto = "la vela siguiente sube") no traen ratio: sin previo, el Quant usa sus valores por defecto.
+            de_operaciones = "ratio_ganancia_perdida" in metricas
+            estrategias.append({
+                "nombre": nombre,
+                "predicado": predicado,
+                "puntuacion": float(metricas.get("sharpe", 0.0)),
+                "acierto": float(metricas.get("acierto") or 0.0) if de_operaciones else None,
+                "ratio": float(metricas.get("ratio_ganancia_perdida") or 0.0) if de_operaciones else None,
+                "original": estrategia,
+            })
+
+        self.estrategias, self._firma = estrategias, firma
+        self.recargas += 1
+        print(f"📚 Catálogo: {len(estrategias)} maestras compiladas desde {self.ruta}.")
+        return self.estrategias
+
+
+class EvaluadorMaestras:
+    """
+    Evaluador para el radar: (símbolo, temporalidad, velas) -> oportunidad o None.
+    Todas las maestras del catálogo se miran sobre un único contexto compartido de velas.
+    """
+
+    def __init__(self, catalogo: CatalogoMaestras):
+        self.catalogo = catalogo
+
+    def disparadas(self, velas, timeframe: str = "15m") -> list:
+        """
+        Maestras que se cumplen en la última vela CERRADA (la penúltima fila),
+        ordenadas de mayor a menor puntuación. 'timeframe' es el de las velas
+        (de él salen las temporalidades altas de 'tendencia_superior').
+        """
+        estrategias = self.catalogo.estrategias
+        if len(velas) < 2 or not estrategias:
+            return []
+        contexto = ContextoVelas(velas, timeframe)
+        cumplidas = []
+        for estrategia in estrategias:
+            senal = estrategia["predicado"](contexto)
+            if bool(senal[-2]):
+                cumplidas.append({"nombre": estrategia["nombre"], "puntuacion": estrategia["puntuacion"],
+                                  "acierto": estrategia["acierto"], "ratio": estrategia["ratio"]})
+        cumplidas.sort(key=lambda e: e["puntuacion"], reverse=True)
+        return cumplidas
+
+    def __call__(self, simbolo: str, timeframe: str, velas):
+        cumplidas = self.disparadas(velas, timeframe)
+        if not cumplidas:
+            return None
+        return {
+            "simbolo": simbolo,
+            "timeframe": timeframe,
+            "precio": float(velas["close"].iloc[-1]),
+            "puntuacion": cumplidas[0]["puntuacion"],
+            "estrategia": cumplidas[0]["nombre"],
+            "estrategias": cumplidas,  # Todas las que se han cumplido, la mejor primero.
+            "acierto": cumplidas[0]["acierto"],  # Operaciones ganadoras fuera de muestra (None si no se sabe).
+            "ratio": cumplidas[0]["ratio"],  # Ganancia media / pérdida media de esas operaciones.
+            "atr": float(ind.atr(velas["high"], velas["low"], velas["close"])[-2]),  # De la vela cerrada.
+            "timestamp": int(velas["timestamp"].iloc[-2]) if "timestamp" in velas else None,
+        }
+
+
+# Banco de pruebas: las candidatas del Bibliotecario como maestras, sobre 300 mercados de 100 velas.
+if __name__ == "__main__":
+    import time
+    import tempfile
+    import pandas as pd
+
+    with open("estrategias_candidatas.json", "r", encoding="utf-8") as f:
+        candidatas = json.load(f)
+    for i, estrategia in enumerate(candidatas):
+        estrategia["metricas"] = {"sharpe": 1.0 + i, "estado": "MAESTRA"}
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, ARCHIVO_MAESTRAS)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(candidatas, f)
+
+        catalogo = CatalogoMaestras(ruta)
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            catalogo.cargar()
+        print(f"📚 1000 cargas en {(time.perf_counter() - inicio) * 1000:.1f} ms ({catalogo.recargas} lectura(s) de disco)")
+
+        evaluador = EvaluadorMaestras(catalogo)
+        rng = np.random.default_rng(17)
+        mercados = []
+        for _ in range(300):
+            cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 100)))
+            aperturas = np.concatenate([[cierres[0]], cierres[:-1]])
+            mercados.append(pd.DataFrame({
+                "timestamp": np.arange(100) * 900_000, "open": aperturas, "close": cierres,
+                "high": np.maximum(aperturas, cierres) * 1.002, "low": np.minimum(aperturas, cierres) * 0.998,
+                "volume": rng.uniform(1, 100, 100),
+            }))
+
+        inicio = time.perf_counter()
+        oportunidades = [o for i, v in enumerate(mercados) if (o := evaluador(f"M{i}/USDT", "15m", v))]
+        duracion = time.perf_counter() - inicio
+        print(f"🎯 {len(mercados)} mercados x {len(catalogo.estrategias)} maestras en {duracion * 1000:.1f} ms "
+              f"({duracion / len(mercados) * 1000:.2f} ms/mercado). Disparos: {len(oportunidades)}")
+        for o in oportunidades[:3]:
+            print(f"   {o['simbolo']}: {[(e['nombre'], e['puntuacion']) for e in o['estrategias']]}")
@@ -0,0 +1,274 @@
+# nucleo/figuras_chartistas.py
+# 📈 EL DETECTOR DE FIGURAS (BULKOWSKI SOBRE EL ÍNDICE DE PIVOTES)
+# Doble suelo/techo, triple suelo/techo, hombro-cabeza-hombro (normal e invertido),
+# triángulos (ascendente, descendente, simétrico) y banderas (alcista, bajista).
+# Ninguna mira velas sueltas: todas trabajan sobre secuencias de pivotes seguidos del
+# índice de 'nucleo.pivotes' (un array de miles de giros), comparando todas las
+# secuencias a la vez con NumPy.
+#
+# Cada figura candidata tiene:
+# - un nivel de ruptura (la línea del cuello, el lado del triángulo...) y su dirección,
+# - un nivel de invalidación (si el precio cierra al otro lado antes, la figura falla),
+# - la vela desde la que se podía conocer (la confirmación de su último pivote).
+# La señal se da en la PRIMERA vela que cierra más allá de la ruptura, dentro de un horizonte.
+# Así el backtest no usa nada que no se supiera en esa vela.
+
+import numpy as np  # Matemáticas rápidas.
+import pandas as pd  # Para la tabla de figuras encontradas.
+
+from nucleo import indicadores as ind  # Arrays float contiguos.
+from nucleo.pivotes import extraer_pivotes, MAXIMO, MINIMO  # El índice de giros.
+
+# Parámetros por defecto (se pueden cambiar en cada llamada).
+TOLERANCIA = 0.02        # Dos suelos "iguales" = a menos de un 2% entre ellos.
+SEPARACION_MINIMA = 10   # Velas mínimas entre los suelos/techos de una figura.
+POLO_MINIMO = 0.03       # Una bandera necesita un mástil de al menos un 3%...
+VELAS_POLO = 20          # ...hecho en como mucho 20 velas.
+RETROCESO_BANDERA = 0.5  # La bandera no puede devolver más de la mitad del mástil.
+HORIZONTE_MINIMO = 10    # Velas que esperamos la ruptura como mínimo...
+HORIZONTE_MAXIMO = 200   # ...y como máximo (si no, la figura caduca).
+MAX_CELDAS = 2 ** 22     # Tope de la matriz (figuras x velas de horizonte) por bloque.
+
+COLUMNAS = ["figura", "alcista", "inicio", "fin", "confirmado", "ruptura", "nivel", "invalidacion"]
+
+
+def _candidatas(nombre, alcista, posiciones, confirmados, nivel, invalidacion, validas):
+    """Empaqueta las secuencias que cumplen la figura (una fila por candidata)."""
+    validas = np.asarray(validas, dtype=bool)
+    return {
+        "figura": nombre,
+        "alcista": np.broadcast_to(np.asarray(alcista, dtype=bool), validas.shape)[validas],
+        "inicio": posiciones[validas, 0],
+        "fin": posiciones[validas, -1],
+        "confirmado": confirmados[validas].max(axis=1),
+        "nivel": np.broadcast_to(nivel, validas.shape)[validas],
+        "invalidacion": np.broadcast_to(invalidacion, validas.shape)[validas],
+    }
+
+
+def _parecidos(precios, tolerancia):
+    """¿Están todos los precios de cada fila a menos de 'tolerancia' entre sí?"""
+    return precios.max(axis=1) <= precios.min(axis=1) * (1 + tolerancia)
+
+
+# --- DETECTORES (índice de pivotes -> candidatas) ---
+
+def extremos_multiples(indice, puntos=2, techo=False, tolerancia=TOLERANCIA, separacion=SEPARACION_MINIMA):
+    """
+    Doble/triple suelo (W) o techo (M): 'puntos' suelos parecidos separados por rebotes.
+    Ruptura: el rebote más alto (el cuello). Invalidación: perder el suelo más bajo.
+    """
+    primero = MAXIMO if techo else MINIMO
+    _, precios, posiciones, confirmados = indice.ventanas(2 * puntos - 1, primero)
+    extremos, intermedios = precios[:, ::2], precios[:, 1::2]
+    lejos = (np.diff(posiciones[:, ::2], axis=1) >= separacion).all(axis=1)
+    if techo:
+        cuello = intermedios.min(axis=1)
+        profundo = cuello <= extremos.min(axis=1) * (1 - tolerancia)
+        invalidacion = extremos.max(axis=1)
+    else:
+        cuello = intermedios.max(axis=1)
+        profundo = cuello >= extremos.max(axis=1) * (1 + tolerancia)
+        invalidacion = extremos.min(axis=1)
+    nombre = ("DOBLE_" if puntos == 2 else "TRIPLE_" if puntos == 3 else f"{puntos}X_") + ("TECHO" if techo else "SUELO")
+    return _candidatas(nombre, not techo, posiciones, confirmados, cuello, invalidacion,
+                       _parecidos(extremos, tolerancia) & lejos & profundo)
+
+
+def hombro_cabeza_hombro(indice, invertido=False, tolerancia=TOLERANCIA, separacion=SEPARACION_MINIMA):
+    """
+    HCH (techo) o HCH invertido (suelo): tres picos con el del medio más extremo y los
+    hombros parecidos. Ruptura: el escote (tomamos el más exigente de sus dos puntos).
+    Invalidación: volver más allá de la cabeza.
+    """
+    _, precios, posiciones, confirmados = indice.ventanas(5, MINIMO if invertido else MAXIMO)
+    signo = -1.0 if invertido else 1.0  # Con el signo cambiado, el HCH invertido es un HCH normal.
+    hombro_1, valle_1, cabeza, valle_2, hombro_2 = (signo * precios[:, i] for i in range(5))
+    destaca = (cabeza > np.maximum(hombro_1, hombro_2) + np.abs(cabeza) * tolerancia)
+    hombros = _parecidos(precios[:, [0, 4]], tolerancia)
+    lejos = (np.diff(posiciones[:, ::2], axis=1) >= separacion).all(axis=1)
+    escote = signo * np.minimum(valle_1, valle_2)
+    return _candidatas("HCH_INVERTIDO" if invertido else "HCH", invertido, posiciones, confirmados,
+                       escote, precios[:, 2], destaca & hombros & lejos)
+
+
+def triangulos(indice, tolerancia=TOLERANCIA):
+    """
+    Triángulos sobre los dos últimos techos y suelos (4 pivotes, empiecen por techo o por suelo):
+    - ASCENDENTE: techos planos y suelos subiendo -> rompe hacia arriba.
+    - DESCENDENTE: suelos planos y techos bajando -> rompe hacia abajo.
+    - SIMETRICO: techos bajando y suelos subiendo -> vale la primera ruptura (una candidata por lado).
+    """
+    resultados = []
+    for primero in (MAXIMO, MINIMO):
+        _, precios, posiciones, confirmados = indice.ventanas(4, primero)
+        techos = precios[:, [0, 2]] if primero == MAXIMO else precios[:, [1, 3]]
+        suelos = precios[:, [1, 3]] if primero == MAXIMO else precios[:, [0, 2]]
+        techos_planos = _parecidos(techos, tolerancia)
+        suelos_planos = _parecidos(suelos, tolerancia)
+        techos_bajan = techos[:, 1] < techos[:, 0] * (1 - tolerancia)
+        suelos_suben = suelos[:, 1] > suelos[:, 0] * (1 + tolerancia)
+        arriba, abajo = techos.max(axis=1), suelos.min(axis=1)
+        ultimo_techo, ultimo_suelo = techos[:, 1], suelos[:, 1]
+
+        resultados.append(_candidatas("TRIANGULO_ASCENDENTE", True, posiciones, confirmados,
+                                      arriba, ultimo_suelo, techos_planos & suelos_suben))
+        resultados.append(_candidatas("TRIANGULO_DESCENDENTE", False, posiciones, confirmados,
+                                      abajo, ultimo_techo, suelos_planos & techos_bajan))
+        simetrico = techos_bajan & suelos_suben
+        resultados.append(_candidatas("TRIANGULO_SIMETRICO", True, posiciones, confirmados,
+                                      ultimo_techo, ultimo_suelo, simetrico))
+        resultados.append(_candidatas("TRIANGULO_SIMETRICO", False, posiciones, confirmados,
+                                      ultimo_suelo, ultimo_techo, simetrico))
+    return resultados
+
+
+def banderas(indice, bajista=False, polo=POLO_MINIMO, velas_polo=VELAS_POLO, retroceso=RETROCESO_BANDERA):
+    """
+    Bandera: un mástil rápido (polo) y una pausa corta que devuelve poco y no supera el mástil.
+    Alcista: suelo, techo (fin del mástil), suelo de la bandera, techo de la bandera -> rompe el último techo.
+    La bajista es la misma figura con los precios dados la vuelta.
+    """
+    _, precios, posiciones, confirmados = indice.ventanas(4, MAXIMO if bajista else MINIMO)
+    signo = -1.0 if bajista else 1.0
+    base, punta, pausa, salida = (signo * precios[:, i] for i in range(4))
+    mastil = punta - base
+    rapido = (posiciones[:, 1] - posiciones[:, 0]) <= velas_polo
+    largo = mastil >= np.abs(base) * polo
+    corta = (posiciones[:, 3] - posiciones[:, 1]) <= 2 * velas_polo
+    aguanta = (punta - pausa) <= mastil * retroceso
+    no_supera = salida <= punta
+    return _candidatas("BANDERA_BAJISTA" if bajista else "BANDERA_ALCISTA", not bajista, posiciones, confirmados,
+                       precios[:, 3], precios[:, 2], rapido & largo & corta & aguanta & no_supera)
+
+
+# Registro: nombre -> función(índice, tolerancia, separacion) que devuelve una o varias tandas de candidatas.
+DETECTORES = {
+    "DOBLE_SUELO": lambda i, t, s: extremos_multiples(i, 2, False, t, s),
+    "DOBLE_TECHO": lambda i, t, s: extremos_multiples(i, 2, True, t, s),
+    "TRIPLE_SUELO": lambda i, t, s: extremos_multiples(i, 3, False, t, s),
+    "TRIPLE_TECHO": lambda i, t, s: extremos_multiples(i, 3, True, t, s),
+    "HCH": lambda i, t, s: hombro_cabeza_hombro(i, False, t, s),
+    "HCH_INVERTIDO": lambda i, t, s: hombro_cabeza_hombro(i, True, t, s),
+    "TRIANGULOS": lambda i, t, s: triangulos(i, t),
+    "BANDERA_ALCISTA": lambda i, t, s: banderas(i, False),
+    "BANDERA_BAJISTA": lambda i, t, s: banderas(i, True),
+}
+
+# Cada figura suelta -> el detector que la busca (los tres triángulos salen del mismo).
+FIGURAS = {nombre: nombre for nombre in DETECTORES if nombre != "TRIANGULOS"}
+FIGURAS.update({f"TRIANGULO_{tipo}": "TRIANGULOS" for tipo in ("ASCENDENTE", "DESCENDENTE", "SIMETRICO")})
+
+
+# --- RUPTURAS (candidatas -> vela de la señal) ---
+
+def primeras_rupturas(cierre, desde, nivel, invalidacion, alcista, horizonte, max_celdas=MAX_CELDAS):
+    """
+    Para cada candidata, la primera vela (desde 'desde', durante 'horizonte' velas) que cierra
+    más allá del nivel. -1 si no rompe a tiempo o si antes cierra más allá de la invalidación.
+    Se mira en bloques (candidatas x velas) para no disparar la memoria.
+    """
+    cierre = ind._array(cierre)
+    n = len(cierre)
+    ruptura = np.full(len(desde), -1, dtype=np.int64)
+    if len(desde) == 0:
+        return ruptura
+    ancho = int(horizonte.max())
+    filas = max(1, max_celdas // max(ancho, 1))
+    columnas = np.arange(ancho)
+    for a in range(0, len(desde), filas):
+        b = min(a + filas, len(desde))
+        velas = desde[a:b, None] + columnas[None, :]
+        dentro = (velas < n) & (columnas[None, :] < horizonte[a:b, None])
+        precios = cierre[np.minimum(velas, n - 1)]
+        signo = np.where(alcista[a:b], 1.0, -1.0)[:, None]
+        rompe = dentro & (precios * signo > nivel[a:b, None] * signo)
+        falla = dentro & (precios * signo < invalidacion[a:b, None] * signo)
+        primera_rotura = np.where(rompe.any(axis=1), rompe.argmax(axis=1), ancho)
+        primer_fallo = np.where(falla.any(axis=1), falla.argmax(axis=1), ancho)
+        valida = primera_rotura < primer_fallo
+        ruptura[a:b] = np.where(valida, desde[a:b] + primera_rotura, -1)
+    return ruptura
+
+
+def rupturas_figuras(cierre, indice, figuras=None, tolerancia=TOLERANCIA, separacion=SEPARACION_MINIMA) -> dict:
+    """
+    El corazón de detectar_figuras sin pandas: dict de arrays (una posición por figura rota)
+    con las columnas de COLUMNAS. Es lo que usa el compilador de reglas, que lo llama por mercado.
+    """
+    pedidas = set(figuras or FIGURAS)
+    desconocidas = pedidas - set(FIGURAS) - set(DETECTORES)
+    if desconocidas:
+        raise ValueError(f"Figuras desconocidas: {', '.join(sorted(desconocidas))} (conozco: {', '.join(FIGURAS)})")
+    detectores = {FIGURAS.get(nombre, nombre) for nombre in pedidas}
+    pedidas = {f for f, d in FIGURAS.items() if f in pedidas or d in pedidas}
+
+    tandas = []
+    for nombre in DETECTORES:
+        if nombre in detectores:
+            resultado = DETECTORES[nombre](indice, tolerancia, separacion)
+            tandas += resultado if isinstance(resultado, list) else [resultado]
+    tandas = [t for t in tandas if t["figura"] in pedidas and len(t["inicio"])]
+    if not tandas:
+        return {c: np.empty(0, dtype=object if c == "figura" else np.int64) for c in COLUMNAS}
+
+    tabla = {c: np.concatenate([t[c] for t in tandas]) for c in COLUMNAS if c not in ("figura", "ruptura")}
+    tabla["figura"] = np.concatenate([np.full(len(t["inicio"]), t["figura"], dtype=object) for t in tandas])
+    # La ruptura se espera más o menos lo que tardó en formarse la figura.
+    horizonte = np.clip(tabla["fin"] - tabla["inicio"], HORIZONTE_MINIMO, HORIZONTE_MAXIMO)
+    tabla["ruptura"] = primeras_rupturas(cierre, tabla["confirmado"], tabla["nivel"],
+                                         tabla["invalidacion"], tabla["alcista"], horizonte)
+    rotas = tabla["ruptura"] >= 0
+    return {c: tabla[c][rotas] for c in COLUMNAS}
+
+
+def detectar_figuras(datos, figuras=None, indice=None, tolerancia=TOLERANCIA, separacion=SEPARACION_MINIMA,
+                     velas_lado=3, umbral_pct=1.0) -> pd.DataFrame:
+    """
+    Busca las figuras pedidas (nombres de FIGURAS o de DETECTORES; todas por defecto) y devuelve una fila por figura rota:
+    figura, alcista, inicio/fin (primer y último pivote), confirmado, ruptura (vela de la señal),
+    nivel e invalidacion. Se le puede pasar un índice de pivotes ya hecho para reutilizarlo.
+    """
+    if indice is None:
+        indice = extraer_pivotes(datos["high"], datos["low"], velas_lado, umbral_pct)
+    eventos = pd.DataFrame(rupturas_figuras(datos["close"], indice, figuras, tolerancia, separacion), columns=COLUMNAS)
+    # Secuencias solapadas pueden señalar la misma ruptura: una vez por figura y dirección.
+    eventos = eventos.drop_duplicates(subset=["figura", "alcista", "ruptura"])
+    return eventos.sort_values("ruptura", kind="stable").reset_index(drop=True)
+
+
+def senal_figuras(eventos, n_velas: int, figura=None, alcista=True) -> np.ndarray:
+    """
+    Array 0/1 (una por vela) con las rupturas de la figura (o de todas) en la dirección pedida.
+    'eventos' puede ser la tabla de detectar_figuras o el dict de rupturas_figuras.
+    """
+    senal = np.zeros(n_velas, dtype=np.int8)
+    filtro = np.asarray(eventos["alcista"]) == alcista
+    if figura is not None:
+        filtro &= np.asarray(eventos["figura"]) == figura
+    senal[np.asarray(eventos["ruptura"], dtype=np.int64)[filtro]] = 1
+    return senal
+
+
+# Banco de pruebas: tres años de velas de 15 minutos (un símbolo).
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(16)
+    n = 3 * 365 * 96
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = np.concatenate([[cierres[0]], cierres[:-1]])
+    datos = pd.DataFrame({
+        "open": aperturas, "close": cierres,
+        "high": np.maximum(aperturas, cierres) * (1 + rng.uniform(0, 0.002, n)),
+        "low": np.minimum(aperturas, cierres) * (1 - rng.uniform(0, 0.002, n)),
+    })
+
+    inicio = time.perf_counter()
+    indice = extraer_pivotes(datos["high"], datos["low"])
+    t_pivotes = time.perf_counter() - inicio
+    eventos = detectar_figuras(datos, indice=indice)
+    t_total = time.perf_counter() - inicio
+    print(f"📈 {n:,} velas -> {len(indice):,} pivotes ({t_pivotes * 1000:.1f} ms) -> "
+          f"{len(eventos):,} figuras rotas ({t_total * 1000:.1f} ms en total)")
+    print(eventos.groupby(["figura", "alcista"]).size().to_string())
@@ -0,0 +1,302 @@
+# nucleo/flujo_mercado.py
+# 📡 EL OÍDO DEL MERCADO (DESPERTADOR POR EVENTOS)
+# En vez de dormir a ciegas 10 o 900 segundos, el robot escucha el mercado en directo
+# y solo despierta al cerebro cuando cierra una vela o el precio se mueve de verdad.
+# El temporizador de siempre sigue ahí como red de seguridad.
+
+import asyncio  # Para escuchar sin bloquear al resto del robot.
+import json  # Para leer velas grabadas en disco.
+import time  # Para medir cuánto tardamos en reaccionar.
+from collections import deque  # Lista con tamaño máximo para las métricas.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+
+class FuenteMercado:
+    """
+    Molde base de cualquier fuente de velas en directo.
+    Cada fuente entrega velas con formato CCXT: [timestamp, open, high, low, close, volume].
+    """
+
+    async def velas(self):
+        """Generador asíncrono que va entregando velas (la última puede estar sin cerrar)."""
+        raise NotImplementedError
+        yield  # Truco para que Python lo trate como generador.
+
+    async def cerrar(self):
+        """Cuelga la conexión si la fuente tiene alguna abierta."""
+        return None
+
+
+class FuenteReplay(FuenteMercado):
+    """
+    Fuente de pruebas: reproduce velas grabadas (lista o archivo JSON) sin internet.
+    Sirve de doble para el WebSocket en simulaciones y pruebas locales.
+    """
+
+    def __init__(self, velas=None, archivo: str = None, pausa: float = 0.0):
+        # Si nos dan un archivo, leemos las velas de ahí.
+        if archivo:
+            with open(archivo, "r") as f:
+                velas = json.load(f)
+        self.lista_velas = list(velas or [])
+        self.pausa = pausa  # Segundos entre vela y vela (0 = lo más rápido posible).
+
+    async def velas(self):
+        for vela in self.lista_velas:
+            yield vela
+            await asyncio.sleep(self.pausa)
+
+
+class FuenteStreamExchange(FuenteMercado):
+    """
+    Fuente real: se suscribe al WebSocket del exchange con ccxt.pro (watch_ohlcv).
+    Si no hay ccxt.pro o el exchange no tiene watch_ohlcv, pregunta por REST cada
+    PAUSA_SONDEO segundos (fetch_ohlcv por la centralita) en vez de reintentar para siempre.
+    """
+
+    def __init__(self, simbolo: str = None, timeframe: str = None, exchange_id: str = None):
+        self.simbolo = simbolo or config.SYMBOL
+        self.timeframe = timeframe or config.TIMEFRAME
+        self.exchange_id = exchange_id or config.EXCHANGE_ID
+        self.exchange = None
+
+    async def velas(self):
+        # Importamos aquí para no cargar los WebSockets si nadie los usa.
+        try:
+            import ccxt.pro as ccxtpro
+            self.exchange = getattr(ccxtpro, self.exchange_id)()
+        except (ImportError, AttributeError):
+            self.exchange = None
+        if self.exchange is None or not self.exchange.has.get("watchOHLCV"):
+            await self.cerrar()
+            print(f"📡 Oído: Sin WebSocket de velas para {self.exchange_id}. "
+                  f"Pregunto cada {config.PAUSA_SONDEO} segundos.")
+            async for vela in self._sondear():
+                yield vela
+            return
+        try:
+            while True:
+                # Esperamos a que el exchange nos empuje velas nuevas o actualizadas.
+                ohlcv = await self.exchange.watch_ohlcv(self.simbolo, self.timeframe)
+                for vela in ohlcv:
+                    yield vela
+        finally:
+            await self.cerrar()
+
+    async def _sondear(self):
+        """Plan B: las dos últimas velas por REST (la cerrada y la que se forma), cada PAUSA_SONDEO segundos."""
+        from nucleo.sesion_exchange import REGISTRO_EXCHANGES
+        while True:
+            ohlcv = await REGISTRO_EXCHANGES.llamar("fetch_ohlcv", self.simbolo, self.timeframe, limit=2,
+                                                    exchange_id=self.exchange_id)
+            for vela in ohlcv:
+                yield vela
+            await asyncio.sleep(config.PAUSA_SONDEO)
+
+    async def cerrar(self):
+        if self.exchange is not None:
+            await self.exchange.close()
+            self.exchange = None
+
+
+def crear_fuente(modo: str = None):
+    """
+    Fábrica de fuentes según config.MODO_DESPERTAR.
+    Devuelve None si estamos en modo TEMPORIZADOR (el de toda la vida).
+    """
+    modo = (modo or config.MODO_DESPERTAR).upper()
+    if modo == "STREAM":
+        return FuenteStreamExchange()
+    if modo == "REPLAY":
+        return FuenteReplay(archivo=config.ARCHIVO_REPLAY or None, pausa=config.PAUSA_REPLAY)
+    return None
+
+
+class DespertadorMercado:
+    """
+    El despertador inteligente.
+    Escucha una fuente en segundo plano y suena solo cuando:
+      1. Se cierra una vela (llega una vela con timestamp nuevo).
+      2. El precio se aleja más de 'umbral_pct' % del precio de la última decisión.
+    Si no pasa nada, 'esperar()' vuelve igualmente al acabar el temporizador.
+    """
+
+    def __init__(self, fuente: FuenteMercado, umbral_pct: float = None):
+        self.fuente = fuente
+        self.umbral_pct = config.UMBRAL_DESPERTAR_PCT if umbral_pct is None else umbral_pct
+
+        self._evento = asyncio.Event()  # La campana.
+        self._tarea = None  # La tarea que escucha en segundo plano.
+        self.motivo = None  # Por qué sonó la campana.
+        self._t_despertar = None  # Cuándo sonó (reloj monotónico).
+        # Mientras el cerebro decide, un tick no puede volver a armar la campana: la decisión
+        # en curso ya lo tiene en cuenta. Solo un cierre de vela queda pendiente para después.
+        self._decidiendo = False
+        self._cierre_pendiente = False
+        self._t_inicio_decision = None
+
+        self.ts_vela_actual = None  # Timestamp de la vela que se está formando.
+        self.ultimo_precio = None  # Último precio visto en la fuente.
+        self.precio_referencia = None  # Precio de la última decisión del cerebro.
+
+        # Métricas: latencia despertar -> decisión (en milisegundos).
+        self.latencias_ms = deque(maxlen=500)
+        self.despertares = {"CIERRE_VELA": 0, "UMBRAL": 0, "TEMPORIZADOR": 0}
+
+    def iniciar(self):
+        """Arranca la escucha en segundo plano (hay que llamarlo dentro del bucle asíncrono)."""
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._escuchar())
+
+    async def detener(self):
+        """Para la escucha y cierra la fuente."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        await self.fuente.cerrar()
+
+    async def _escuchar(self):
+        """Bucle de escucha. Si la fuente se cae, esperamos y reconectamos."""
+        while True:
+            try:
+                async for vela in self.fuente.velas():
+                    self.procesar_vela(vela)
+                # La fuente se ha agotado (p. ej. fin del replay): nos quedamos con el temporizador.
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"📡 Oído: Se cortó la escucha del mercado ({e}). Reintento en 5 segundos...")
+                await asyncio.sleep(5)
+
+    def procesar_vela(self, vela):
+        """Mira una vela recién llegada y decide si hay que despertar al cerebro."""
+        ts, precio = vela[0], float(vela[4])
+
+        # 1. ¿Ha empezado una vela nueva? Entonces la anterior acaba de cerrar.
+        if self.ts_vela_actual is not None and ts > self.ts_vela_actual:
+            self._despertar("CIERRE_VELA")
+        if self.ts_vela_actual is None or ts > self.ts_vela_actual:
+            self.ts_vela_actual = ts
+
+        self.ultimo_precio = precio
+
+        # 2. ¿Se ha movido el precio más de lo permitido desde la última decisión?
+        if self.precio_referencia is None:
+            self.precio_referencia = precio
+        elif self.precio_referencia > 0:
+            movimiento_pct = abs(precio / self.precio_referencia - 1.0) * 100
+            if movimiento_pct >= self.umbral_pct:
+                self._despertar("UMBRAL")
+
+    def _despertar(self, motivo: str):
+        """Hace sonar la campana (si ya estaba sonando, respetamos el primer motivo)."""
+        if self._decidiendo:
+            if motivo == "CIERRE_VELA":
+                self._cierre_pendiente = True
+            return
+        if self._evento.is_set():
+            return
+        self.motivo = motivo
+        self._t_despertar = time.perf_counter()
+        self.despertares[motivo] += 1
+        self._evento.set()
+
+    async def esperar(self, timeout: float) -> str:
+        """
+        Duerme hasta que suene la campana o se acabe el temporizador.
+        Devuelve el motivo del despertar. Desde aquí hasta registrar_decision() el cerebro
+        está decidiendo y la campana no se vuelve a armar.
+        """
+        self._decidiendo = False  # Si la decisión anterior falló, no se quedó registrada.
+        try:
+            await asyncio.wait_for(self._evento.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._despertar("TEMPORIZADOR")
+        self._t_inicio_decision = self._t_despertar
+        self._t_despertar = None
+        self._decidiendo = True
+        self._evento.clear()
+        return self.motivo
+
+    def registrar_decision(self, precio: float = None) -> float:
+        """
+        Se llama cuando el cerebro termina de decidir.
+        Apunta la latencia despertar -> decisión y fija el nuevo precio de referencia.
+        Devuelve la latencia en milisegundos (0.0 si no hubo despertar previo).
+        """
+        latencia_ms = 0.0
+        if self._t_inicio_decision is not None:
+            latencia_ms = (time.perf_counter() - self._t_inicio_decision) * 1000
+            self.latencias_ms.append(latencia_ms)
+            self._t_inicio_decision = None
+
+        referencia = precio if precio else self.ultimo_precio
+        if referencia:
+            self.precio_referencia = referencia
+
+        # Lo que sonó antes de esta decisión ya está atendido (p. ej. el primer ciclo, sin esperar()).
+        self._decidiendo = False
+        self._evento.clear()
+        self._t_despertar = None
+        if self._cierre_pendiente:
+            self._cierre_pendiente = False
+            self._despertar("CIERRE_VELA")
+        return latencia_ms
+
+    def metricas(self) -> dict:
+        """Resumen de reflejos: cuántas veces despertamos y cuánto tardamos en decidir."""
+        ordenadas = sorted(self.latencias_ms)
+        n = len(ordenadas)
+        return {
+            "despertares": dict(self.despertares),
+            "decisiones_medidas": n,
+            "latencia_ultima_ms": self.latencias_ms[-1] if n else 0.0,
+            "latencia_media_ms": sum(ordenadas) / n if n else 0.0,
+            "latencia_p50_ms": ordenadas[n // 2] if n else 0.0,
+            "latencia_p95_ms": ordenadas[min(n - 1, int(n * 0.95))] if n else 0.0,
+        }
+
+
+# Prueba rápida: reproducimos velas falsas y vemos cuándo suena el despertador.
+if __name__ == "__main__":
+    async def _prueba():
+        velas_falsas = [
+            [0, 100, 101, 99, 100.0, 1],
+            [0, 100, 101, 99, 100.2, 1],  # Misma vela, movimiento pequeño: silencio.
+            [900000, 100, 101, 99, 100.1, 1],  # Vela nueva: cierre de la anterior.
+            [900000, 100, 102, 99, 101.5, 1],  # Subida > 0.5%: umbral.
+        ]
+        despertador = DespertadorMercado(FuenteReplay(velas_falsas, pausa=0.01), umbral_pct=0.5)
+        despertador.iniciar()
+        for _ in range(3):
+            motivo = await despertador.esperar(timeout=0.2)
+            latencia = despertador.registrar_decision()
+            print(f"⏰ Despertar: {motivo} (latencia {latencia:.3f} ms)")
+        print(f"📊 Métricas: {despertador.metricas()}")
+        await despertador.detener()
+
+        # Un tick que llega mientras el cerebro decide no deja la campana armada.
+        despertador = DespertadorMercado(FuenteReplay([]), umbral_pct=0.5)
+        despertador.procesar_vela([0, 100, 101, 99, 100.0, 1])
+        despertador.procesar_vela([900000, 100, 101, 99, 100.0, 1])
+        await despertador.esperar(timeout=0.01)
+        despertador.procesar_vela([900000, 100, 102, 99, 101.5, 1])  # Llega durante la decisión.
+        despertador.registrar_decision(101.5)
+        motivo = await despertador.esperar(timeout=0.05)
+        assert motivo == "TEMPORIZADOR", motivo
+        print("✅ Un tick durante la decisión no despierta al cerebro otra vez.")
+
+    asyncio.run(_prueba())
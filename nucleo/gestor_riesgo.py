@@ -1,37 +1,97 @@
 # nucleo/gestor_riesgo.py
 # 📉 EL MOTOR DE MATEMÁTICAS (GESTOR DE RIESGO ADAPTATIVO)
 # Este archivo decide cuánto apostar según cuánto dinero tenemos.
+# calcular_kelly_adaptativo mide UNA apuesta; calcular_kelly_lote mide miles de señales de golpe
+# (arrays NumPy) y reparte entre ellas un presupuesto compartido.
 
 import math  # Traemos las matemáticas.
 
+import numpy as np  # Matemáticas rápidas (para los lotes).
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+# Las Fases de Riqueza: (capital por debajo del cual se aplica, factor Kelly, nombre).
+FASES_RIQUEZA = (
+    (1000, 0.5, "CRECIMIENTO_AGRESIVO"),              # FASE 1: POBREZA (Salir del hoyo). Medio Kelly.
+    (100000, 0.3, "CRECIMIENTO_MODERADO"),            # FASE 2: CLASE MEDIA (Consolidar).
+    (math.inf, 0.1, "INSTITUCIONAL_PRESERVACION"),    # FASE 3: RICOS (Preservar fortuna).
+)
+LIMITE_APUESTA = 0.20  # Límite de seguridad absoluto: nunca más del 20% de la cuenta en una apuesta.
+PROB_WIN_DEFECTO = 0.6  # Probabilidad de ganar cuando no sabemos nada mejor de la estrategia.
+
+
+def fase_riqueza(capital: float, fases=FASES_RIQUEZA):
+    """(factor Kelly, nombre de la fase) que toca con este capital."""
+    for techo, factor_kelly, fase in fases:
+        if capital < techo:
+            return factor_kelly, fase
+    return fases[-1][1], fases[-1][2]
+
+
+def _escala_presupuesto(prioridad: np.ndarray, margen: np.ndarray, presupuesto: float) -> np.ndarray:
+    """
+    Qué parte de su margen recibe cada candidata si se reparte 'presupuesto' por orden de prioridad
+    (1 = entera, entre 0 y 1 = la última que cabe, 0 = fuera).
+    Solo unas pocas caben, así que no se ordena todo: se separan las mejores con argpartition
+    (O(n)) y se ordenan solo esas; si no llenan el presupuesto, se amplía el grupo.
+    """
+    escala = np.zeros_like(margen)
+    if margen.sum() <= presupuesto:
+        escala[margen > 0] = 1.0  # Caben todas: no hay nada que ordenar.
+        return escala
+    candidatas = np.flatnonzero(margen > 0)
+    grupo = 64
+    while True:
+        if grupo >= len(candidatas):
+            mejores = candidatas[np.argsort(-prioridad[candidatas], kind="stable")]
+            break
+        parte = candidatas[np.argpartition(-prioridad[candidatas], grupo)[:grupo]]
+        mejores = parte[np.argsort(-prioridad[parte], kind="stable")]
+        if margen[mejores].sum() >= presupuesto:
+            break
+        grupo *= 4
+    margen_orden = margen[mejores]
+    antes = np.cumsum(margen_orden) - margen_orden  # Margen ya repartido cuando le toca a cada una.
+    escala[mejores] = np.clip((presupuesto - antes) / margen_orden, 0.0, 1.0)
+    return escala
+
+
 class QuantEngine:
-    def __init__(self, capital_inicial: float = 15.0):
+    def __init__(self, capital_inicial: float = 15.0, fases=FASES_RIQUEZA, limite: float = LIMITE_APUESTA,
+                 estadisticas=None, limite_margen: float = None):
         # Arrancamos con nuestro dinero actual.
         self.capital = capital_inicial
+        # Las fases y los límites se pueden cambiar para probar otros (ver montecarlo_ruina).
+        self.fases = fases
+        self.limite = limite  # Tope de la APUESTA (lo que se pierde si salta el stop).
+        # Tope opcional del margen de una posición (None = sin tope propio; manda el presupuesto).
+        self.limite_margen = config.LIMITE_MARGEN_POSICION if limite_margen is None else limite_margen
+        # Estadísticas en vivo de cada estrategia (ver estadisticas_estrategia): si están,
+        # el acierto y el ratio salen de las operaciones reales en vez de los valores fijos.
+        self.estadisticas = estadisticas
 
-    def calcular_kelly_adaptativo(self, prob_win: float = 0.6, ratio_win_loss: float = 2.0) -> float:
+    def calcular_kelly_adaptativo(self, prob_win: float = None, ratio_win_loss: float = None,
+                                  estrategia: str = None) -> float:
         """
         Calcula la apuesta usando el Criterio de Kelly Adaptativo.
         Cambia la agresividad según en qué "Fase de Riqueza" estemos.
+        Con estadísticas y 'estrategia', prob_win y ratio_win_loss son solo el punto de partida
+        (lo que midió el laboratorio) y se corrigen con lo que la estrategia ha hecho en vivo.
         """
-        # 1. Definimos la Fase según el capital.
-        if self.capital < 1000:
-            # FASE 1: POBREZA (Salir del hoyo).
-            # Arriesgamos más para crecer rápido.
-            factor_kelly = 0.5 # Medio Kelly (Agresivo pero no suicida).
-            fase = "CRECIMIENTO_AGRESIVO"
-            
-        elif self.capital < 100000:
-            # FASE 2: CLASE MEDIA (Consolidar).
-            # Bajamos un poco el riesgo.
-            factor_kelly = 0.3
-            fase = "CRECIMIENTO_MODERADO"
-            
-        else:
-            # FASE 3: RICOS (Preservar fortuna).
-            # Arriesgamos muy poco porque ya tenemos mucho.
-            factor_kelly = 0.1
-            fase = "INSTITUCIONAL_PRESERVACION"
+        if self.estadisticas is not None:
+            prob_win, ratio_win_loss = self.estadisticas.parametros(estrategia, prob_win, ratio_win_loss)
+        prob_win = PROB_WIN_DEFECTO if prob_win is None else prob_win
+        ratio_win_loss = config.RATIO_OBJETIVO if ratio_win_loss is None else ratio_win_loss
+
+        # 1. Definimos la Fase según el capital (ver FASES_RIQUEZA: cuanto más capital, menos agresivos).
+        factor_kelly, fase = fase_riqueza(self.capital, self.fases)
 
         # 2. Calculamos Kelly Puro.
         # Fórmula: (Probabilidad Ganar * Ratio - Probabilidad Perder) / Ratio
@@ -46,7 +106,7 @@ class QuantEngine:
         fraccion_apuesta = kelly_puro * factor_kelly
         
         # 4. Límite de seguridad absoluto (Nunca apostar más del 20% de la cuenta).
-        fraccion_segura = min(fraccion_apuesta, 0.20)
+        fraccion_segura = min(fraccion_apuesta, self.limite)
         
         monto_apuesta = self.capital * fraccion_segura
         
@@ -63,3 +123,97 @@ class QuantEngine:
         distancia_stop = volatilidad_atr * 2.0
         precio_stop = precio_entrada - distancia_stop
         return precio_stop
+
+    def calcular_kelly_lote(self, prob_win=None, ratio_win_loss=None, distancia_stop=None, presupuesto: float = None,
+                            apalancamiento: float = None, estrategias=None) -> dict:
+        """
+        Kelly Adaptativo para MUCHAS señales a la vez (sin bucles de Python).
+        - prob_win, ratio_win_loss: uno por candidata (o un número para todas).
+        - distancia_stop: distancia al stop en fracción del precio (0.02 = 2%). Con ella, la apuesta
+          de Kelly es lo que se PIERDE si salta el stop: nocional = riesgo / distancia y
+          margen = nocional / apalancamiento (con tope propio solo si hay 'limite_margen').
+          Sin ella, igual que calcular_kelly_adaptativo: la apuesta entera es el riesgo y el margen.
+        - presupuesto: margen total a repartir (por defecto, todo el capital). Se reparte de mayor
+          a menor ventaja (Kelly puro); la última que cabe entra recortada y las demás se quedan fuera.
+        - estrategias: nombre de la estrategia de cada candidata. Con estadísticas en vivo,
+          prob_win y ratio_win_loss pasan a ser el punto de partida (como en calcular_kelly_adaptativo).
+        Devuelve arrays en el orden de entrada (kelly_puro, fraccion, riesgo, nocional, margen) y la fase.
+        """
+        factor_kelly, fase = fase_riqueza(self.capital, self.fases)
+        if self.estadisticas is not None and estrategias is not None:
+            prob_win, ratio_win_loss = self.estadisticas.parametros_lote(estrategias, prob_win, ratio_win_loss)
+        prob_win = PROB_WIN_DEFECTO if prob_win is None else prob_win
+        ratio_win_loss = config.RATIO_OBJETIVO if ratio_win_loss is None else ratio_win_loss
+        p, b = np.broadcast_arrays(np.atleast_1d(np.asarray(prob_win, dtype=np.float64)),
+                                   np.atleast_1d(np.asarray(ratio_win_loss, dtype=np.float64)))
+
+        # Kelly Puro por candidata; si la esperanza es negativa (o los datos no valen), no operamos.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kelly_puro = (p * b - (1.0 - p)) / b
+        kelly_puro = np.where(np.isfinite(kelly_puro) & (kelly_puro > 0), kelly_puro, 0.0)
+
+        # Kelly Fraccional según la fase y límite del 20% por apuesta.
+        capital = max(float(self.capital), 0.0)
+        riesgo = capital * np.minimum(kelly_puro * factor_kelly, self.limite)
+
+        if distancia_stop is None:
+            nocional = riesgo.copy()
+            margen = riesgo.copy()
+        else:
+            apalancamiento = config.LEVERAGE if apalancamiento is None else apalancamiento
+            distancia = np.broadcast_to(np.asarray(distancia_stop, dtype=np.float64), riesgo.shape)
+            valida = np.isfinite(distancia) & (distancia > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                nocional = np.where(valida, riesgo / distancia, 0.0)
+            # El 20% es de la apuesta, no del margen: si el margen también lo tuviera, con apalancamiento
+            # el riesgo quedaría en 20% x apalancamiento x stop en todas las fases y Kelly no pintaría nada.
+            if self.limite_margen:
+                nocional = np.minimum(nocional, self.limite_margen * capital * apalancamiento)
+            riesgo = np.where(valida, nocional * distancia, 0.0)  # Si el tope recortó, arriesgamos menos.
+            margen = nocional / apalancamiento
+
+        # Reparto del presupuesto compartido: las de más ventaja primero.
+        presupuesto = capital if presupuesto is None else max(float(presupuesto), 0.0)
+        escala = _escala_presupuesto(kelly_puro, margen, presupuesto)
+
+        riesgo = riesgo * escala
+        return {
+            "kelly_puro": kelly_puro,
+            "fraccion": riesgo / capital if capital > 0 else riesgo,
+            "riesgo": riesgo,
+            "nocional": nocional * escala,
+            "margen": margen * escala,
+            "factor_kelly": factor_kelly,
+            "fase": fase,
+        }
+
+
+# Banco de pruebas: el lote contra la versión de una en una, y miles de candidatas por ciclo.
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(22)
+    for capital in (15.0, 5_000.0, 250_000.0):
+        motor = QuantEngine(capital)
+        probs, ratios = rng.uniform(0.2, 0.8, 500), rng.uniform(0.5, 3.0, 500)
+        lote = motor.calcular_kelly_lote(probs, ratios, presupuesto=float("inf"))
+        uno_a_uno = np.array([motor.calcular_kelly_adaptativo(p, r) for p, r in zip(probs, ratios)])
+        print(f"🧮 Capital {capital:>9,.0f} ({lote['fase']}): lote == uno a uno -> {np.allclose(lote['riesgo'], uno_a_uno)}")
+
+    # Con un stop típico (2 ATR ~ 1%) y una ventaja normal, cada fase tiene que dar un tamaño distinto.
+    riesgos = [float(QuantEngine(c).calcular_kelly_lote(0.4, 2.0, 0.01)["riesgo"][0]) / c for c in (500.0, 5_000.0, 500_000.0)]
+    assert riesgos[0] > riesgos[1] > riesgos[2] > 0, riesgos
+    print(f"🪜 Riesgo por fase con stop del 1%: {[round(r, 4) for r in riesgos]}")
+
+    motor = QuantEngine(5_000.0)
+    for n in (100, 1_000, 5_000, 20_000):
+        probs, ratios = rng.uniform(0.3, 0.7, n), rng.uniform(1.0, 3.0, n)
+        stops = rng.uniform(0.005, 0.05, n)
+        mejor = float("inf")
+        for _ in range(50):
+            inicio = time.perf_counter()
+            lote = motor.calcular_kelly_lote(probs, ratios, stops)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        entran = int((lote["margen"] > 0).sum())
+        print(f"📐 {n:>6,} candidatas en {mejor * 1000:.3f} ms: {entran} con tamaño, "
+              f"margen {lote['margen'].sum():,.0f} de {motor.capital:,.0f}, riesgo total {lote['riesgo'].sum():,.0f}")
@@ -0,0 +1,205 @@
+# nucleo/indicadores.py
+# 📐 LOS NÚCLEOS DE INDICADORES (NUMPY PURO)
+# Antes cada estrategia cargaba pandas_ta entero (una importación lentísima) solo para
+# pedirle una EMA y un ATR. Aquí están esos cálculos escritos con NumPy a pelo:
+# EMA, RMA (la media de Wilder), ATR y máximos/mínimos móviles, sobre arrays float contiguos.
+# Siguen la convención de TA-Lib (la que usa pandas_ta en el Docker): la EMA y el ATR
+# arrancan con una media simple, así que los números coinciden con los de antes.
+# pandas_ta ya solo se usa (si está instalado) para comprobar que seguimos coincidiendo.
+
+import numpy as np  # Matemáticas rápidas.
+
+# Tamaño de bloque para las recurrencias: cada bloque se resuelve con una multiplicación de matrices.
+_BLOQUE = 64
+
+
+def _array(x) -> np.ndarray:
+    """Convierte Series/listas a un array float64 contiguo (sin copiar si ya lo es)."""
+    if hasattr(x, "to_numpy"):
+        x = x.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _recurrencia(u: np.ndarray, a: float, y0: float) -> np.ndarray:
+    """
+    Resuelve y[t] = a * y[t-1] + u[t] (con y[-1] = y0) sin recorrer las velas en Python.
+    Se parte la serie en bloques de 64: dentro de cada bloque la recurrencia es una
+    multiplicación por una matriz triangular fija; lo que pasa de un bloque al siguiente
+    es otra recurrencia (64 veces más corta) que se resuelve igual, de forma recursiva.
+    """
+    n = len(u)
+    if n <= _BLOQUE:
+        y = np.empty(n)
+        previo = y0
+        for t in range(n):
+            previo = a * previo + u[t]
+            y[t] = previo
+        return y
+
+    bloques = -(-n // _BLOQUE)
+    relleno = np.zeros(bloques * _BLOQUE)
+    relleno[:n] = u
+    potencias = a ** np.arange(_BLOQUE + 1)
+    # pesos[j, i] = a^(j - i) si i <= j (cuánto pesa la entrada i en la salida j del bloque).
+    distancia = np.arange(_BLOQUE)[:, None] - np.arange(_BLOQUE)[None, :]
+    pesos = np.where(distancia >= 0, potencias[np.clip(distancia, 0, _BLOQUE)], 0.0)
+
+    parcial = relleno.reshape(bloques, _BLOQUE) @ pesos.T  # Cada bloque empezando desde cero.
+    finales = _recurrencia(parcial[:, -1], potencias[_BLOQUE], y0)  # El valor real al final de cada bloque.
+    arrastre = np.concatenate([[y0], finales[:-1]])  # Lo que entra en cada bloque desde el anterior.
+    y = parcial + arrastre[:, None] * potencias[1:][None, :]
+    return y.ravel()[:n]
+
+
+def _suavizado(x, periodo: int, alfa: float) -> np.ndarray:
+    """
+    Media exponencial con arranque TA-Lib: NaN hasta tener 'periodo' valores,
+    la primera es la media simple y luego y = y_anterior + alfa * (x - y_anterior).
+    Los NaN iniciales (p. ej. de otro indicador) se saltan.
+    """
+    x = _array(x)
+    salida = np.full(len(x), np.nan)
+    validos = np.flatnonzero(~np.isnan(x))
+    inicio = validos[0] if len(validos) else len(x)
+    semilla = inicio + periodo - 1
+    if semilla >= len(x):
+        return salida
+    salida[semilla] = x[inicio:semilla + 1].mean()
+    salida[semilla + 1:] = _recurrencia(alfa * x[semilla + 1:], 1.0 - alfa, salida[semilla])
+    return salida
+
+
+def ema(cierre, periodo: int = 20) -> np.ndarray:
+    """EMA clásica (alfa = 2 / (periodo + 1)), igual que ta.ema / TA-Lib."""
+    return _suavizado(cierre, periodo, 2.0 / (periodo + 1))
+
+
+def rma(x, periodo: int = 14) -> np.ndarray:
+    """Media de Wilder (alfa = 1 / periodo), la que suaviza el ATR y el RSI."""
+    return _suavizado(x, periodo, 1.0 / periodo)
+
+
+def rango_verdadero(maximo, minimo, cierre) -> np.ndarray:
+    """True Range. La primera vela no tiene cierre anterior: vale máximo - mínimo."""
+    maximo, minimo, cierre = _array(maximo), _array(minimo), _array(cierre)
+    rango = maximo - minimo
+    if len(cierre) > 1:
+        anterior = cierre[:-1]
+        rango[1:] = np.maximum(rango[1:], np.maximum(np.abs(maximo[1:] - anterior), np.abs(minimo[1:] - anterior)))
+    return rango
+
+
+def atr(maximo, minimo, cierre, periodo: int = 14) -> np.ndarray:
+    """ATR de Wilder, igual que ta.atr / TA-Lib (ignora la primera vela, que no tiene cierre anterior)."""
+    rango = rango_verdadero(maximo, minimo, cierre)
+    salida = np.full(len(rango), np.nan)
+    if len(rango) > 1:
+        salida[1:] = rma(rango[1:], periodo)
+    return salida
+
+
+def _extremo_movil(x, ventana: int, ufunc) -> np.ndarray:
+    """
+    Máximo/mínimo de las últimas 'ventana' velas (incluida la actual), como pandas .rolling().
+    Algoritmo de van Herk/Gil-Werman: acumulados por bloques hacia delante y hacia atrás,
+    así cuesta lo mismo una ventana de 7 que una de 700.
+    """
+    x = _array(x)
+    n = len(x)
+    salida = np.full(n, np.nan)
+    if ventana <= 0 or n < ventana:
+        return salida
+    bloques = -(-n // ventana)
+    relleno = np.full(bloques * ventana, np.nan)
+    relleno[:n] = x
+    matriz = relleno.reshape(bloques, ventana)
+    adelante = ufunc.accumulate(matriz, axis=1).ravel()
+    atras = ufunc.accumulate(matriz[:, ::-1], axis=1)[:, ::-1].ravel()
+    # La ventana [i, i + ventana - 1] = lo de atrás desde i + lo de delante hasta el final.
+    i = np.arange(n - ventana + 1)
+    salida[ventana - 1:] = ufunc(atras[i], adelante[i + ventana - 1])
+    return salida
+
+
+def maximo_movil(x, ventana: int) -> np.ndarray:
+    """Máximo móvil (igual que Series.rolling(ventana).max())."""
+    return _extremo_movil(x, ventana, np.maximum)
+
+
+def minimo_movil(x, ventana: int) -> np.ndarray:
+    """Mínimo móvil (igual que Series.rolling(ventana).min())."""
+    return _extremo_movil(x, ventana, np.minimum)
+
+
+def desplazar(x: np.ndarray, velas: int = 1) -> np.ndarray:
+    """Como Series.shift(velas) para arrays: mira 'velas' atrás y rellena con NaN."""
+    salida = np.full(len(x), np.nan)
+    if velas < len(x):
+        salida[velas:] = x[:len(x) - velas]
+    return salida
+
+
+def comparar_con_pandas_ta(maximo, minimo, cierre, periodo_ema: int = 20, periodo_atr: int = 14) -> dict:
+    """
+    Comprobación cruzada opcional: diferencia máxima entre nuestros núcleos y pandas_ta.
+    pandas_ta solo se importa aquí, y solo si está instalado.
+    """
+    import pandas as pd
+    import pandas_ta as ta  # Pesado: por eso no vive arriba del todo.
+
+    serie_max, serie_min, serie_cierre = pd.Series(_array(maximo)), pd.Series(_array(minimo)), pd.Series(_array(cierre))
+    referencia_ema = ta.ema(serie_cierre, length=periodo_ema).to_numpy(dtype=np.float64)
+    referencia_atr = ta.atr(serie_max, serie_min, serie_cierre, length=periodo_atr).to_numpy(dtype=np.float64)
+    return {
+        "ema": float(np.nanmax(np.abs(ema(cierre, periodo_ema) - referencia_ema))),
+        "atr": float(np.nanmax(np.abs(atr(maximo, minimo, cierre, periodo_atr) - referencia_atr))),
+    }
+
+
+# Banco de pruebas: tiempo de importación y velocidad por llamada frente a pandas_ta.
+if __name__ == "__main__":
+    import subprocess
+    import sys
+    import time
+
+    def _tiempo_importacion(modulo: str) -> float:
+        """Importa el módulo en un proceso limpio y devuelve los segundos que tarda."""
+        codigo = f"import time; t = time.perf_counter(); import {modulo}; print(time.perf_counter() - t)"
+        resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+        return float(resultado.stdout) if resultado.returncode == 0 else float("nan")
+
+    print(f"📦 Importar nucleo.indicadores: {_tiempo_importacion('nucleo.indicadores') * 1000:8.1f} ms")
+    print(f"📦 Importar pandas_ta:          {_tiempo_importacion('pandas_ta') * 1000:8.1f} ms")
+
+    rng = np.random.default_rng(5)
+    n = 1_000_000
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    maximos = cierres * (1 + rng.uniform(0, 0.002, n))
+    minimos = cierres * (1 - rng.uniform(0, 0.002, n))
+
+    def _medir(nombre, funcion, repeticiones=3):
+        mejor = min(_cronometro(funcion) for _ in range(repeticiones))
+        print(f"   {nombre:28s} {mejor * 1000:9.1f} ms  ({n / mejor:,.0f} velas/s)")
+
+    def _cronometro(funcion):
+        inicio = time.perf_counter()
+        funcion()
+        return time.perf_counter() - inicio
+
+    print(f"📐 Núcleos NumPy ({n:,} velas):")
+    _medir("ema(20)", lambda: ema(cierres, 20))
+    _medir("atr(14)", lambda: atr(maximos, minimos, cierres, 14))
+    _medir("maximo_movil(7)", lambda: maximo_movil(maximos, 7))
+    _medir("maximo_movil(200)", lambda: maximo_movil(maximos, 200))
+
+    try:
+        import pandas as pd
+        import pandas_ta as ta
+        serie_max, serie_min, serie_cierre = pd.Series(maximos), pd.Series(minimos), pd.Series(cierres)
+        print("🐢 pandas_ta:")
+        _medir("ta.ema(20)", lambda: ta.ema(serie_cierre, length=20))
+        _medir("ta.atr(14)", lambda: ta.atr(serie_max, serie_min, serie_cierre, length=14))
+        _medir("rolling(7).max()", lambda: serie_max.rolling(7).max())
+        print(f"🔍 Diferencia máxima con pandas_ta: {comparar_con_pandas_ta(maximos, minimos, cierres)}")
+    except ImportError:
+        print("⚠️ pandas_ta no está instalado: no hay comparación cruzada.")
@@ -0,0 +1,219 @@
+# nucleo/indicadores_streaming.py
+# 🌊 VOLMAN EN DIRECTO (INDICADORES INCREMENTALES)
+# El Analista Vectorizado recalcula TODA la tabla cada vez que llega una vela.
+# En directo eso es tirar trabajo: solo ha cambiado la última fila.
+# Este analista recuerda lo justo (EMA anterior, ATR anterior, las últimas 7 velas...)
+# y actualiza todo en tiempo constante por vela, dando la señal solo de la vela nueva.
+# Las fórmulas son las mismas que usa el vectorizado (convención TA-Lib: EMA y ATR
+# arrancan con una media simple), así que las señales coinciden vela a vela.
+
+import copy  # Para guardar una foto del estado (vela sin cerrar).
+from collections import deque  # Colas monotónicas para máximos y mínimos.
+
+
+class AnalistaVolmanIncremental:
+    """
+    Versión en streaming de AnalistaVolmanVectorizado.
+    Se le dan las velas de una en una con 'actualizar' y devuelve los indicadores
+    y las señales 'enter_long' / 'exit_long' de esa vela.
+    Si llega otra vez la misma vela (sin cerrar, con datos nuevos), se recalcula sin duplicarla.
+    """
+
+    def __init__(self, periodo_ema: int = 20, periodo_atr: int = 14, bloque_velas: int = 7,
+                 factor_compresion: float = 1.5, factor_cercania: float = 0.5):
+        # Los mismos parámetros que el vectorizado (también los dos factores que ajusta el barrido).
+        self.periodo_ema = periodo_ema
+        self.periodo_atr = periodo_atr
+        self.bloque_velas = bloque_velas
+        self.factor_compresion = factor_compresion
+        self.factor_cercania = factor_cercania
+        self.k_ema = 2.0 / (periodo_ema + 1)
+
+        self.indice = -1  # Número de la última vela procesada.
+        self.ultimo_timestamp = None
+
+        # EMA: suma de arranque y valor actual.
+        self._suma_ema = 0.0
+        self.ema = None
+
+        # ATR: suma de arranque de los rangos verdaderos y valor actual.
+        self._suma_tr = 0.0
+        self.atr = None
+        self._cierre_anterior = None
+
+        # Donchian: colas monotónicas (índice, valor) con las últimas 'bloque_velas' velas.
+        self._maximos = deque()
+        self._minimos = deque()
+
+        # Lo que necesitamos de las dos velas anteriores para las reglas de "ayer".
+        self._ayer = None
+        self._anteayer = None
+
+        self._foto = None  # Estado justo antes de la última vela (para rehacerla).
+
+    # --- ESTADO ---
+
+    def _guardar_foto(self):
+        # Todo es pequeño (colas de 7 elementos como mucho): copiar es O(1).
+        foto = {k: v for k, v in self.__dict__.items() if k != "_foto"}
+        foto["_maximos"] = deque(self._maximos)
+        foto["_minimos"] = deque(self._minimos)
+        self._foto = foto
+
+    def _restaurar_foto(self):
+        self.__dict__.update(copy.copy(self._foto))
+        self._maximos = deque(self._foto["_maximos"])
+        self._minimos = deque(self._foto["_minimos"])
+
+    # --- ACTUALIZACIÓN O(1) ---
+
+    def actualizar(self, vela) -> dict:
+        """
+        Procesa una vela CCXT [timestamp, open, high, low, close, volume].
+        Devuelve un dict con los indicadores y las señales de esa vela.
+        """
+        ts = vela[0]
+        apertura, maximo, minimo, cierre = float(vela[1]), float(vela[2]), float(vela[3]), float(vela[4])
+
+        if self.ultimo_timestamp is not None and ts == self.ultimo_timestamp and self._foto is not None:
+            # Misma vela otra vez (aún sin cerrar): deshacemos la versión anterior.
+            self._restaurar_foto()
+        self._guardar_foto()
+        self.indice += 1
+        self.ultimo_timestamp = ts
+        i = self.indice
+
+        # 1. EMA 20 (arranca con la media simple de las primeras 20 velas).
+        if i < self.periodo_ema:
+            self._suma_ema += cierre
+            if i == self.periodo_ema - 1:
+                self.ema = self._suma_ema / self.periodo_ema
+        else:
+            self.ema = self.ema + self.k_ema * (cierre - self.ema)
+
+        # 2. ATR (rango verdadero suavizado a lo Wilder; arranca con la media de los 14 primeros).
+        atr_ayer = self.atr
+        if self._cierre_anterior is not None:
+            rango_verdadero = max(maximo - minimo, abs(maximo - self._cierre_anterior), abs(minimo - self._cierre_anterior))
+            if i <= self.periodo_atr:
+                self._suma_tr += rango_verdadero
+                if i == self.periodo_atr:
+                    self.atr = self._suma_tr / self.periodo_atr
+            else:
+                self.atr = (self.atr * (self.periodo_atr - 1) + rango_verdadero) / self.periodo_atr
+        self._cierre_anterior = cierre
+
+        # 3. Donchian de las 7 velas ANTERIORES (sin contar la actual).
+        if i >= self.bloque_velas:
+            donchian_high = self._maximos[0][1]
+            donchian_low = self._minimos[0][1]
+        else:
+            donchian_high = donchian_low = None
+
+        # Metemos la vela actual en las colas para la próxima vez.
+        while self._maximos and self._maximos[-1][1] <= maximo:
+            self._maximos.pop()
+        self._maximos.append((i, maximo))
+        while self._minimos and self._minimos[-1][1] >= minimo:
+            self._minimos.pop()
+        self._minimos.append((i, minimo))
+        limite = i - self.bloque_velas + 1  # Índice más viejo que sigue dentro del bloque.
+        while self._maximos[0][0] < limite:
+            self._maximos.popleft()
+        while self._minimos[0][0] < limite:
+            self._minimos.popleft()
+
+        # 4-5. Geometría del bloque.
+        if donchian_high is not None:
+            altura_bloque = donchian_high - donchian_low
+            centro_bloque = (donchian_high + donchian_low) / 2
+            dist_ema = abs(centro_bloque - self.ema) if self.ema is not None else None
+        else:
+            altura_bloque = centro_bloque = dist_ema = None
+
+        # 6. Doji.
+        cuerpo = abs(apertura - cierre)
+        mecha_total = maximo - minimo
+        es_doji = bool(mecha_total > 0 and cuerpo <= mecha_total * 0.15)
+
+        # --- PATRÓN 1: BLOCK BREAK ---
+        senal_bb = False
+        if altura_bloque is not None and atr_ayer is not None and dist_ema is not None:
+            es_comprimido = altura_bloque < atr_ayer * self.factor_compresion
+            es_cercano_ema = dist_ema < atr_ayer * self.factor_cercania
+            es_ruptura = cierre > donchian_high
+            senal_bb = es_comprimido and es_cercano_ema and es_ruptura
+
+        # --- PATRÓN 2: DOUBLE DOJI ---
+        senal_dd = False
+        if self._ayer is not None and self._anteayer is not None:
+            tocan_ema = self._ayer["toca_ema"] or self._anteayer["toca_ema"]
+            max_dojis = max(self._ayer["high"], self._anteayer["high"])
+            senal_dd = self._ayer["es_doji"] and self._anteayer["es_doji"] and tocan_ema and cierre > max_dojis
+
+        enter_long = int(senal_bb or senal_dd)
+        exit_long = int(self.ema is not None and cierre < self.ema)
+
+        # Guardamos lo que necesitarán las reglas de "ayer" en la próxima vela.
+        toca_ema = self.ema is not None and minimo <= self.ema <= maximo
+        self._anteayer = self._ayer
+        self._ayer = {"high": maximo, "es_doji": es_doji, "toca_ema": toca_ema}
+
+        return {
+            "timestamp": ts,
+            "EMA_20": self.ema,
+            "ATR": self.atr,
+            "donchian_high": donchian_high,
+            "donchian_low": donchian_low,
+            "block_height": altura_bloque,
+            "block_center": centro_bloque,
+            "dist_ema": dist_ema,
+            "is_doji": es_doji,
+            "enter_long": enter_long,
+            "exit_long": exit_long,
+        }
+
+    def calentar(self, velas) -> dict:
+        """Pasa una historia entera por el analista (para arrancar en directo). Devuelve la última fila."""
+        fila = None
+        for vela in velas:
+            fila = self.actualizar(vela)
+        return fila
+
+
+# Banco de pruebas: actualizaciones por segundo frente a recalcular la tabla entera.
+if __name__ == "__main__":
+    import time
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    n = 200_000
+    cierres = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    aperturas = cierres + rng.normal(0, 0.1, n)
+    maximos = np.maximum(aperturas, cierres) + rng.uniform(0, 0.3, n)
+    minimos = np.minimum(aperturas, cierres) - rng.uniform(0, 0.3, n)
+    velas = np.column_stack([np.arange(n) * 900000, aperturas, maximos, minimos, cierres, np.ones(n)]).tolist()
+
+    analista = AnalistaVolmanIncremental()
+    inicio = time.perf_counter()
+    entradas = 0
+    for vela in velas:
+        entradas += analista.actualizar(vela)["enter_long"]
+    duracion = time.perf_counter() - inicio
+    print(f"🌊 Incremental: {n / duracion:,.0f} velas/s ({duracion / n * 1e6:.1f} µs por vela). Entradas: {entradas}")
+
+    # Referencia: el vectorizado recalculando las últimas 1000 velas por cada vela nueva.
+    try:
+        import pandas as pd
+        from nucleo.estrategia_volman import AnalistaVolmanVectorizado
+
+        df = pd.DataFrame(velas[:2000], columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        vectorizado = AnalistaVolmanVectorizado()
+        repeticiones = 50
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            vectorizado.populate_signals(df.iloc[-1000:].copy())
+        por_vela = (time.perf_counter() - inicio) / repeticiones
+        print(f"🐢 Vectorizado (1000 velas por actualización): {1 / por_vela:,.0f} velas/s ({por_vela * 1e6:.0f} µs por vela)")
+    except ImportError as e:
+        print(f"⚠️ No pude medir el vectorizado ({e}).")
@@ -2,44 +2,137 @@
 # 🧬 EL LABORATORIO CIENTÍFICO (BACKTESTING Y EVOLUCIÓN)
 # Aquí probamos las estrategias con rigor científico antes de arriesgar dinero real.
 
+import os
 import json
+import time
+import argparse
 import pandas as pd
 import numpy as np
-import ccxt.async_support as ccxt
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+from nucleo.sesion_exchange import REGISTRO_EXCHANGES  # La línea compartida con el exchange.
+from nucleo.almacen_velas import ALMACEN_VELAS  # La historia guardada en disco.
+from nucleo.almacen_velas import timeframe_a_ms  # Para saber cuántas velas tiene un año.
+from nucleo import motor_walk_forward as wf  # Las ventanas móviles y sus métricas.
+from nucleo.simulador_operaciones import SimuladorOperaciones  # Operaciones con stop, objetivo y comisiones.
+from nucleo import indicadores as ind  # El ATR para los stops (NumPy puro).
+from nucleo.compilador_reglas import CompiladorReglas, ContextoVelas, ReglaDesconocida  # Recetas -> señales.
+from nucleo.multi_temporalidad import remuestrear, paso_en_ms  # 1h/4h/1d sacadas de las velas base.
+
+# Columnas que viajan a los trabajadores por memoria compartida (una fila por columna).
+COLUMNAS_TORNEO = ['open', 'high', 'low', 'close', 'volume']
+
+# --- TRABAJADORES DEL TORNEO (cada uno en su propio proceso) ---
+# Estas variables viven dentro de cada proceso trabajador.
+_MEMORIA_TRABAJADOR = None  # La memoria compartida a la que nos enganchamos (hay que retenerla).
+_DATOS_TRABAJADOR = None    # La tabla construida ENCIMA de esa memoria (sin copiar).
+_LAB_TRABAJADOR = None      # Un laboratorio por proceso.
+
+def _vistas_compartidas(memoria, filas):
+    """Los timestamps (int64) van delante y detrás las columnas de precios (float64), una fila por columna."""
+    tiempos = np.ndarray((filas,), dtype=np.int64, buffer=memoria.buf)
+    matriz = np.ndarray((len(COLUMNAS_TORNEO), filas), dtype=np.float64, buffer=memoria.buf,
+                        offset=filas * np.dtype(np.int64).itemsize)
+    return tiempos, matriz
+
+def _iniciar_trabajador(nombre_memoria, filas, timeframe):
+    """
+    Se ejecuta una vez al nacer cada proceso: se engancha a la memoria compartida
+    y monta la tabla de velas encima, sin copiar ni recibir nada por pickle.
+    """
+    global _MEMORIA_TRABAJADOR, _DATOS_TRABAJADOR, _LAB_TRABAJADOR
+    _MEMORIA_TRABAJADOR = shared_memory.SharedMemory(name=nombre_memoria)
+    tiempos, matriz = _vistas_compartidas(_MEMORIA_TRABAJADOR, filas)
+    tiempos.flags.writeable = False  # Nadie debe tocar los datos compartidos.
+    matriz.flags.writeable = False
+    # Las mismas columnas que en serie (timestamp incluido: lo usan las reglas de otras temporalidades).
+    _DATOS_TRABAJADOR = pd.DataFrame({'timestamp': tiempos, **{col: matriz[i] for i, col in enumerate(COLUMNAS_TORNEO)}},
+                                     copy=False)
+    _LAB_TRABAJADOR = LaboratorioGenetico(timeframe)
+
+def _evaluar_en_trabajador(estrategia):
+    """Evalúa una candidata dentro de un trabajador y devuelve el resultado con su tiempo."""
+    inicio = time.perf_counter()
+    es_buena, sharpe, informe = _LAB_TRABAJADOR.walk_forward_analysis(_DATOS_TRABAJADOR, estrategia)
+    return estrategia, es_buena, sharpe, informe, time.perf_counter() - inicio
 
 class LaboratorioGenetico:
-    def __init__(self):
+    def __init__(self, timeframe=None):
         print("🧬 Laboratorio: Inicializando sistemas de simulación cuántica...")
+        # La temporalidad del torneo: la de las velas, las reglas multi-temporalidad y la anualización.
+        self.timeframe = timeframe or config.TIMEFRAME_LABORATORIO
         self.archivo_candidatas = "estrategias_candidatas.json"
         self.archivo_maestras = "estrategias_maestras.json"
+        self.compilador = CompiladorReglas()  # Cada receta se compila una sola vez.
+        self.simulador = SimuladorOperaciones()  # Stop, objetivo, comisiones y apalancamiento (los del Quant).
+        self._contexto = None  # Piezas comunes (cuerpos, sombras...) de la última historia usada.
 
-    async def obtener_datos_historicos(self, simbolo="SOL/USDT", limite=1000):
+    def _contexto_de(self, datos):
+        """El contexto de piezas comunes de esta historia (se reutiliza entre estrategias)."""
+        if self._contexto is None or self._contexto.datos is not datos:
+            self._contexto = ContextoVelas(datos, self.timeframe)
+        return self._contexto
+
+    async def obtener_datos_historicos(self, simbolo="SOL/USDT", limite=1000, timeframe=None):
         """
-        Descarga la historia del mercado para poder hacer pruebas (Backtest).
+        Consigue la historia del mercado para poder hacer pruebas (Backtest).
+        Solo se descargan las velas que el almacén todavía no tiene.
+        Solo se descarga la temporalidad base (config.TIMEFRAME_BASE); si se pide otra más alta
+        ('1h', '4h', '1d'...), se construye agrupando las velas base ya cerradas.
         """
-        print(f"🧬 Laboratorio: Descargando 1000 velas de historia de {simbolo}...")
-        exchange = ccxt.bitget()
+        base = config.TIMEFRAME_BASE
+        timeframe = timeframe or self.timeframe
+        print(f"🧬 Laboratorio: Preparando {limite} velas de {timeframe} de historia de {simbolo}...")
         try:
-            # Bajamos velas de 15 minutos.
-            ohlcv = await exchange.fetch_ohlcv(simbolo, '15m', limit=limite)
-            await exchange.close()
+            paso_base = timeframe_a_ms(base)
+            factor = paso_en_ms(timeframe, paso_base) // paso_base  # Velas base por cada vela pedida.
+
+            # Una vela alta de más: la última barra puede salir a medias y se descarta.
+            velas_base = limite if factor == 1 else (limite + 1) * factor
+
+            # Ponemos al día el almacén de velas base (solo lo nuevo viaja por internet).
+            nuevas = await ALMACEN_VELAS.sincronizar(simbolo, base, minimo=velas_base)
+            print(f"🧬 Laboratorio: {nuevas} velas nuevas descargadas, el resto ya estaba en el almacén.")
             
-            # Convertimos a tabla bonita.
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            return df
+            # Leemos la tabla directamente del disco (sin copiar).
+            df = ALMACEN_VELAS.leer_df(simbolo, base, ultimas=velas_base)
+            if factor == 1:
+                return df
+
+            # La última vela del almacén puede estar aún abierta: no entra en las barras altas.
+            cerradas = df[df['timestamp'] + paso_base <= int(time.time() * 1000)]
+            return remuestrear(cerradas, timeframe, base).tail(limite).reset_index(drop=True)
         except Exception as e:
             print(f"🧬 Error descargando datos: {e}")
-            await exchange.close()
             return pd.DataFrame()
 
-    def simular_estrategia(self, datos, estrategia):
+    def calcular_senal(self, datos, estrategia):
         """
-        SIMULADOR DE BATALLA (Backtest Simple).
-        Aplica las reglas de la estrategia a los datos del pasado.
+        Traduce las reglas de la estrategia a un array de señales (1 = comprar en esa vela).
+        Se calcula UNA vez sobre toda la historia; el simulador y el walk-forward la reutilizan.
+        Si la estrategia trae 'reglas' (las recetas del Bibliotecario), se compilan a una función
+        vectorizada; si no, usamos la lógica escrita a mano por nombre.
         """
-        # Copiamos los datos para no romper los originales.
-        df = datos.copy()
+        if estrategia.get("reglas"):
+            try:
+                return self.compilador.senal(self._contexto_de(datos), estrategia["reglas"])
+            except ReglaDesconocida as e:
+                print(f"🧬 Laboratorio: No sé traducir las reglas de {estrategia['nombre']} ({e}). Sin señales.")
+                return np.zeros(len(datos), dtype=int)
+
+        # Trabajamos con columnas sueltas: no copiamos ni modificamos la tabla original
+        # (puede ser una vista del almacén o de la memoria compartida del torneo).
+        apertura, cierre, minimo = datos['open'], datos['close'], datos['low']
         
         # Simulamos la lógica según el tipo de patrón.
         # (Aquí simplificamos la lógica compleja de reconocimiento de patrones visuales).
@@ -49,75 +142,179 @@ class LaboratorioGenetico:
             # Y Vela actual envuelve a la anterior.
             
             # Calculamos colores de velas.
-            df['es_verde'] = df['close'] > df['open']
-            df['es_roja'] = df['close'] < df['open']
+            es_verde = cierre > apertura
+            es_roja = cierre < apertura
             
             # Desplazamos para ver la vela anterior (shift 1).
-            df['prev_open'] = df['open'].shift(1)
-            df['prev_close'] = df['close'].shift(1)
-            df['prev_es_roja'] = df['es_roja'].shift(1)
+            prev_open = apertura.shift(1)
+            prev_close = cierre.shift(1)
+            prev_es_roja = es_roja.shift(1, fill_value=False)
             
             # Condición de Engulfing (Envolvente).
-            condicion_envuelve = (df['close'] > df['prev_open']) & (df['open'] < df['prev_close'])
+            condicion_envuelve = (cierre > prev_open) & (apertura < prev_close)
             
             # Señal de compra: Anterior roja + Actual verde + Envuelve.
-            df['senal'] = np.where(df['prev_es_roja'] & df['es_verde'] & condicion_envuelve, 1, 0)
+            senal = np.where(prev_es_roja & es_verde & condicion_envuelve, 1, 0)
 
         elif estrategia["nombre"] == "PATRON_NISON_MARTILLO":
              # Lógica simplificada de Martillo.
-             cuerpo = abs(df['close'] - df['open'])
-             sombra_inf = df[['open', 'close']].min(axis=1) - df['low']
+             cuerpo = abs(cierre - apertura)
+             sombra_inf = np.minimum(apertura, cierre) - minimo
              
              # Martillo: Sombra inferior es doble que el cuerpo.
-             df['senal'] = np.where(sombra_inf > (cuerpo * 2), 1, 0)
+             senal = np.where(sombra_inf > (cuerpo * 2), 1, 0)
              
         else:
-            # Si no conocemos la lógica exacta, simulamos aleatorio (SOLO POR AHORA).
-            df['senal'] = 0
+            # Si no hay reglas ni conocemos la lógica, no hay señales.
+            senal = np.zeros(len(datos), dtype=int)
+
+        return senal
+
+    def simular_estrategia(self, datos, estrategia):
+        """
+        SIMULADOR DE BATALLA (Backtest Simple).
+        Aplica las reglas de la estrategia a los datos del pasado.
+        """
+        cierre = datos['close']
+        senal = self.calcular_senal(datos, estrategia)
 
         # Calculamos el resultado de operar estas señales.
         # Si compramos (Señal 1), ganamos si el precio sube en la siguiente vela.
-        df['retorno_futuro'] = df['close'].shift(-1).ffill().pct_change(fill_method=None)
-        df['resultado_trade'] = df['senal'] * df['retorno_futuro']
+        retorno_futuro = cierre.shift(-1).ffill().pct_change(fill_method=None)
+        resultado_trade = retorno_futuro * senal
         
         # Resultados totales.
-        total_ganado = df['resultado_trade'].sum()
-        numero_operaciones = df['senal'].sum()
+        total_ganado = resultado_trade.sum()
+        numero_operaciones = senal.sum()
         
         return total_ganado, numero_operaciones
 
-    def walk_forward_analysis(self, datos, estrategia):
+    def simular_operaciones(self, datos, estrategia, simulador=None, senal=None):
+        """
+        SIMULADOR DE BATALLA REAL.
+        Cada señal se convierte en una operación que vive hasta su stop (2 ATR), su objetivo,
+        la salida de la estrategia (exit_long, si la tabla la trae) o el tiempo máximo,
+        pagando comisiones y deslizamiento con el apalancamiento de config.
+        Devuelve una tabla con una fila por operación.
+        """
+        simulador = simulador or self.simulador
+        senal = self.calcular_senal(datos, estrategia) if senal is None else senal
+        atr = datos['ATR'] if 'ATR' in datos.columns else ind.atr(datos['high'], datos['low'], datos['close'], 14)
+        salida = datos['exit_long'] if 'exit_long' in datos.columns else None
+        return simulador.simular(datos['open'], datos['high'], datos['low'], datos['close'], atr, senal, salida)
+
+    def walk_forward_analysis(self, datos, estrategia, velas_entreno=None, velas_prueba=None,
+                              paso=None, anclada=None, timeframe=None):
         """
         ANÁLISIS AVANZADO (Walk-Forward).
         No prueba todo de golpe. Prueba un trozo, avanza, prueba otro trozo...
         Evita engañarnos con suerte del pasado (Overfitting).
+        Las señales se calculan UNA vez y se convierten en operaciones de verdad (SimuladorOperaciones:
+        stop 2 ATR, objetivo RATIO_OBJETIVO, comisiones, deslizamiento y apalancamiento); luego todas
+        las ventanas (móviles o ancladas) se evalúan de golpe con el PnL neto de cada operación.
+        El acierto y el ratio ganancia/pérdida del informe son de operaciones fuera de muestra:
+        los mismos que el Quant necesita para Kelly (mismo stop y mismo objetivo).
+        Devuelve (es_robusta, sharpe_fuera_de_muestra, informe).
         """
-        # Dividimos los datos en dos mitades.
-        mitad = len(datos) // 2
-        entrenamiento = datos.iloc[:mitad] # Primera mitad para aprender.
-        prueba = datos.iloc[mitad:]        # Segunda mitad para examinar.
-        
-        # 1. Fase de Entrenamiento (In-Sample).
-        ganancia_entreno, ops_entreno = self.simular_estrategia(entrenamiento, estrategia)
-        
-        # 2. Fase de Prueba (Out-of-Sample).
-        ganancia_prueba, ops_prueba = self.simular_estrategia(prueba, estrategia)
-        
-        # Validamos: Debe ganar dinero en AMBAS fases.
-        es_robusta = (ganancia_entreno > 0) and (ganancia_prueba > 0) and (ops_prueba > 5)
-        
-        sharpe_simulado = 0.0
-        if es_robusta:
-            sharpe_simulado = 2.5 # (Valor simulado para el ejemplo).
-            
-        return es_robusta, sharpe_simulado
+        velas_entreno = velas_entreno or config.WF_VELAS_ENTRENO
+        velas_prueba = velas_prueba or config.WF_VELAS_PRUEBA
+        paso = paso if paso is not None else config.WF_PASO
+        anclada = config.WF_ANCLADA if anclada is None else anclada
+        timeframe = timeframe or self.timeframe  # La de las velas: de ella sale cuántas caben en un año.
+
+        n = len(datos)
+        ventanas = wf.generar_ventanas(n, velas_entreno, velas_prueba, paso, anclada)
+        if len(ventanas) == 0:
+            # Historia demasiado corta para las ventanas configuradas: volvemos a las dos mitades.
+            ventanas = wf.generar_ventanas(n, n // 2, n - n // 2)
+        if len(ventanas) == 0:
+            return False, 0.0, {}
+
+        senal = self.calcular_senal(datos, estrategia)
+        operaciones = self.simular_operaciones(datos, estrategia, senal=senal)
+        velas_entrada = operaciones["vela_entrada"].to_numpy()
+        periodos_por_ano = 365 * 24 * 3600 * 1000 / timeframe_a_ms(timeframe)
+        folds = wf.evaluar_walk_forward_operaciones(velas_entrada, operaciones["pnl_neto"].to_numpy(), n,
+                                                    ventanas, periodos_por_ano)
+        entreno, prueba = folds["entreno"], folds["prueba"]
+
+        # Las operaciones que entran en alguna ventana de prueba, todas juntas (para acierto y ratio).
+        en_prueba = np.zeros(n, dtype=bool)
+        for inicio_prueba, fin_prueba in ventanas[:, 2:]:
+            en_prueba[inicio_prueba:fin_prueba] = True
+        fuera_de_muestra = SimuladorOperaciones.resumen(operaciones[en_prueba[velas_entrada]])
 
-    async def ejecutar_seleccion_natural(self):
+        # Validamos: debe ganar dentro de muestra, ganar en la mayoría de ventanas de prueba
+        # y operar lo suficiente como para que no sea casualidad.
+        ventanas_ganadoras = float(np.mean(prueba["rentabilidad"] > 0))
+        operaciones_prueba = int(prueba["operaciones"].sum())
+        es_robusta = bool(
+            np.mean(entreno["rentabilidad"] > 0) >= config.WF_MIN_VENTANAS_GANADORAS
+            and ventanas_ganadoras >= config.WF_MIN_VENTANAS_GANADORAS
+            and operaciones_prueba > 5
+        )
+
+        sharpe = float(np.mean(prueba["sharpe"]))
+        informe = {
+            "ventanas": len(ventanas),
+            "anclada": bool(anclada),
+            "ventanas_ganadoras": round(ventanas_ganadoras, 4),
+            "sharpe": round(sharpe, 4),
+            "sortino": round(float(np.mean(prueba["sortino"])), 4),
+            "max_drawdown": round(float(np.max(prueba["max_drawdown"])), 4),
+            "acierto": round(fuera_de_muestra["acierto"], 4),  # Operaciones ganadoras / operaciones.
+            "ratio_ganancia_perdida": round(fuera_de_muestra["ratio_ganancia_perdida"], 4),
+            "pnl_medio": round(fuera_de_muestra["pnl_medio"], 6),  # Por operación, en fracción del margen.
+            "operaciones": operaciones_prueba,
+            "sharpe_entreno": round(float(np.mean(entreno["sharpe"])), 4),
+            "por_ventana": [
+                {k: round(float(v[i]), 4) if k != "operaciones" else int(v[i]) for k, v in prueba.items()}
+                for i in range(len(ventanas))
+            ],
+        }
+        return es_robusta, sharpe, informe
+
+    def _torneo_en_paralelo(self, datos, candidatas, workers):
+        """
+        Reparte las candidatas entre varios procesos.
+        Las velas se colocan UNA vez en memoria compartida; los trabajadores se enganchan a ella
+        al nacer, así que por la tubería solo viajan las reglas de cada estrategia.
+        """
+        filas = len(datos)
+        tamano = filas * (np.dtype(np.int64).itemsize + len(COLUMNAS_TORNEO) * np.dtype(np.float64).itemsize)
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, tamano))
+        tiempos = matriz = None  # Si algo falla antes de crearlas, el 'finally' no tropieza.
+        try:
+            tiempos, matriz = _vistas_compartidas(memoria, filas)
+            tiempos[:] = datos['timestamp'].to_numpy(dtype=np.int64)
+            for i, col in enumerate(COLUMNAS_TORNEO):
+                matriz[i] = datos[col].to_numpy(dtype=np.float64)
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_trabajador,
+                                     initargs=(memoria.name, filas, self.timeframe)) as piscina:
+                # 'map' conserva el orden de las candidatas (el archivo de maestras sale igual que en serie).
+                return list(piscina.map(_evaluar_en_trabajador, candidatas))
+        finally:
+            del tiempos, matriz  # Sin vistas vivas, la memoria se puede cerrar.
+            memoria.close()
+            memoria.unlink()
+
+    def _torneo_en_serie(self, datos, candidatas):
+        """Evalúa las candidatas una detrás de otra en este proceso."""
+        resultados = []
+        for estrategia in candidatas:
+            t0 = time.perf_counter()
+            es_buena, sharpe, informe = self.walk_forward_analysis(datos, estrategia)
+            resultados.append((estrategia, es_buena, sharpe, informe, time.perf_counter() - t0))
+        return resultados
+
+    async def ejecutar_seleccion_natural(self, workers=None):
         """
         El Gran Torneo. Carga las candidatas, las prueba y guarda las maestras.
+        Con workers > 1 las candidatas se evalúan en paralelo en varios procesos.
         """
         # 1. Cargar datos.
-        datos = await self.obtener_datos_historicos()
+        datos = await self.obtener_datos_historicos(limite=config.VELAS_LABORATORIO)
         if datos.empty: return
 
         # 2. Cargar candidatas del bibliotecario.
@@ -128,19 +325,39 @@ class LaboratorioGenetico:
             print("🧬 No hay candidatas. Ejecuta el bibliotecario primero.")
             return
 
+        # Nunca más trabajadores que candidatas (ni que núcleos, si no nos dicen nada).
+        workers = min(workers or os.cpu_count() or 1, max(1, len(candidatas)))
+
         maestras = []
-        print(f"🧬 Laboratorio: Probando {len(candidatas)} estrategias con Walk-Forward...")
+        print(f"🧬 Laboratorio: Probando {len(candidatas)} estrategias con Walk-Forward ({workers} procesos)...")
 
-        # 3. Probar cada una.
-        for estrategia in candidatas:
-            es_buena, sharpe = self.walk_forward_analysis(datos, estrategia)
-            
+        # 3. Probar cada una (en serie o repartidas entre procesos).
+        #    El torneo es CPU pura: va en un hilo aparte para no congelar el bucle asíncrono
+        #    (el despertador, el radar y las alertas siguen vivos mientras tanto).
+        inicio = time.perf_counter()
+        if workers > 1:
+            resultados = await asyncio.to_thread(self._torneo_en_paralelo, datos, candidatas, workers)
+        else:
+            resultados = await asyncio.to_thread(self._torneo_en_serie, datos, candidatas)
+        duracion_total = time.perf_counter() - inicio
+
+        for estrategia, es_buena, sharpe, informe, segundos in resultados:
+            resumen = (f"Sharpe: {sharpe:.2f} | Sortino: {informe.get('sortino', 0):.2f} | "
+                       f"Caída máx: {informe.get('max_drawdown', 0):.1%} | Acierto: {informe.get('acierto', 0):.1%} | "
+                       f"Ops: {informe.get('operaciones', 0)} | Ventanas ganadoras: {informe.get('ventanas_ganadoras', 0):.0%}")
             if es_buena and sharpe > 2.0:
-                print(f"   ✅ APROBADA: {estrategia['nombre']} (Sharpe: {sharpe})")
-                estrategia['metricas'] = {'sharpe': sharpe, 'estado': 'MAESTRA'}
+                print(f"   ✅ APROBADA: {estrategia['nombre']} ({resumen})")
+                estrategia['metricas'] = {**informe, 'estado': 'MAESTRA'}
                 maestras.append(estrategia)
             else:
-                print(f"   ❌ RECHAZADA: {estrategia['nombre']} (No es robusta)")
+                print(f"   ❌ RECHAZADA: {estrategia['nombre']} ({resumen})")
+
+        # Informe de tiempos por estrategia (la más lenta primero).
+        print("⏱️ Laboratorio: Tiempo por estrategia:")
+        for estrategia, _, _, _, segundos in sorted(resultados, key=lambda r: r[4], reverse=True):
+            print(f"   {segundos * 1000:9.1f} ms  {estrategia['nombre']}")
+        suma = sum(r[4] for r in resultados)
+        print(f"⏱️ Total: {duracion_total:.2f}s de reloj para {suma:.2f}s de cálculo (x{suma / duracion_total if duracion_total else 0:.1f}).")
 
         # 4. Guardar las ganadoras.
         with open(self.archivo_maestras, 'w') as f:
@@ -149,5 +366,18 @@ class LaboratorioGenetico:
 
 # Prueba rápida.
 if __name__ == "__main__":
-    lab = LaboratorioGenetico()
-    asyncio.run(lab.ejecutar_seleccion_natural())
+    parser = argparse.ArgumentParser(description="Torneo de estrategias del Laboratorio Genético.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para evaluar candidatas en paralelo (por defecto: todos los núcleos; 1 = en serie).")
+    parser.add_argument("--timeframe", default=None,
+                        help="Temporalidad del torneo (por defecto config.TIMEFRAME_LABORATORIO; p. ej. 1h, 4h).")
+    argumentos = parser.parse_args()
+
+    async def _torneo():
+        lab = LaboratorioGenetico(argumentos.timeframe)
+        try:
+            await lab.ejecutar_seleccion_natural(workers=argumentos.workers)
+        finally:
+            await REGISTRO_EXCHANGES.cerrar_todos()
+
+    asyncio.run(_torneo())
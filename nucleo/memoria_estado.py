@@ -0,0 +1,248 @@
+# nucleo/memoria_estado.py
+# 🧠 LA MEMORIA A PRUEBA DE APAGONES (ESTADO EN RAM + DIARIO)
+# Antes el robot releía y reescribía 'estado_bot.json' en cada vuelta.
+# Si se apagaba justo mientras escribía, perdíamos el registro de las posiciones abiertas.
+# Ahora la memoria vive en RAM, cada cambio se apunta en un diario (journal) que solo crece,
+# y de vez en cuando se hace una foto limpia (snapshot) con renombrado atómico.
+# Al arrancar: leemos la última foto y repetimos el diario encima.
+
+import os  # Para fsync y renombrados atómicos.
+import json  # Formato del diario y de la foto.
+import time  # Para agrupar los fsync por tiempo.
+import copy  # Para no compartir listas con quien nos pide datos.
+
+# Estado por defecto si no hay ningún recuerdo (15 euros y sin posiciones).
+ESTADO_INICIAL = {"capital": 15.0, "posiciones": []}
+
+
+class GestorEstado:
+    """
+    Guarda 'capital', 'posiciones' (y lo que haga falta) en memoria.
+    - Leer cuesta microsegundos (es un diccionario).
+    - Cada cambio añade una línea compacta al diario.
+    - El fsync se hace por lotes (cada 'lote_fsync' cambios o cada 'intervalo_fsync' segundos).
+    - Cuando el diario crece mucho, se compacta en una foto nueva y se vacía.
+    """
+
+    def __init__(self, ruta_snapshot: str = "estado_bot.json", ruta_journal: str = None,
+                 lote_fsync: int = 16, intervalo_fsync: float = 1.0, max_registros: int = 1000,
+                 estado_inicial: dict = None, ruta_heredada: str = None):
+        self.ruta_snapshot = ruta_snapshot
+        self.ruta_journal = ruta_journal or os.path.splitext(ruta_snapshot)[0] + ".journal"
+        self.lote_fsync = lote_fsync  # Cuántos cambios agrupamos antes de forzar el disco.
+        self.intervalo_fsync = intervalo_fsync  # Segundos máximos sin forzar el disco.
+        self.max_registros = max_registros  # Tamaño del diario que dispara la compactación.
+        self.estado_inicial = ESTADO_INICIAL if estado_inicial is None else estado_inicial  # Si no hay recuerdos.
+        # Foto de cuando la memoria vivía en otro sitio: se lee solo si aquí todavía no hay nada.
+        self.ruta_heredada = ruta_heredada
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_snapshot)), exist_ok=True)
+
+        self.estado = {}
+        self.secuencia = 0  # Número del último cambio aplicado.
+        self.registros_journal = 0  # Cuántas líneas tiene el diario ahora mismo.
+        self._pendientes_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+        heredada = self._recuperar()
+        # Abrimos el diario en modo "añadir" para no borrar nunca nada.
+        self._journal = open(self.ruta_journal, "a", encoding="utf-8")
+        if heredada:
+            self.compactar()  # Lo traído de la ruta antigua queda ya en la foto nueva.
+
+    # --- ARRANQUE ---
+
+    def _recuperar(self) -> bool:
+        """
+        Lee la última foto y repite encima los cambios del diario.
+        Devuelve True si lo recuperado venía de la ruta heredada (hay que guardarlo aquí).
+        """
+        self.estado = copy.deepcopy(self.estado_inicial)
+        ruta_foto, ruta_diario = self.ruta_snapshot, self.ruta_journal
+        diario_heredado = os.path.splitext(self.ruta_heredada)[0] + ".journal" if self.ruta_heredada else None
+        heredada = bool(self.ruta_heredada and not os.path.exists(ruta_foto) and not os.path.exists(ruta_diario)
+                        and (os.path.exists(self.ruta_heredada) or os.path.exists(diario_heredado)))
+        if heredada:
+            print(f"🧠 Memoria: Trayendo la memoria antigua '{self.ruta_heredada}' a '{self.ruta_snapshot}'.")
+            ruta_foto, ruta_diario = self.ruta_heredada, diario_heredado
+        try:
+            with open(ruta_foto, "r", encoding="utf-8") as f:
+                foto = json.load(f)
+            self.secuencia = int(foto.pop("_secuencia", 0))
+            self.estado.update(foto)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError) as e:
+            # Foto rota (de la época de las escrituras no atómicas): nos queda el diario.
+            print(f"⚠️ Memoria: La foto '{ruta_foto}' está dañada ({e}). Reconstruyendo desde el diario...")
+
+        repetidos = self._repetir_diario(ruta_diario, cortar=not heredada)
+        if repetidos:
+            print(f"🧠 Memoria: Recuperados {repetidos} cambios del diario (secuencia {self.secuencia}).")
+        return heredada
+
+    def _repetir_diario(self, ruta: str, cortar: bool = True) -> int:
+        """
+        Aplica las líneas completas del diario y, con 'cortar', le quita la cola a medio escribir.
+        Sin cortarla, el próximo cambio se pegaría a ella y en el siguiente arranque
+        perderíamos todo lo escrito después.
+        """
+        repetidos = 0
+        valido = 0  # Byte donde acaba la última línea completa.
+        try:
+            with open(ruta, "rb") as f:
+                for linea in f:
+                    try:
+                        if not linea.endswith(b"\n"):
+                            raise ValueError("línea sin terminar")
+                        registro = json.loads(linea)
+                    except ValueError:
+                        # Línea a medio escribir por un apagón: ni ella ni lo de detrás vale.
+                        break
+                    valido += len(linea)
+                    self.registros_journal += 1
+                    if registro["n"] <= self.secuencia:
+                        continue  # Ya estaba dentro de la foto.
+                    self.estado[registro["k"]] = registro["v"]
+                    self.secuencia = registro["n"]
+                    repetidos += 1
+            if cortar and os.path.getsize(ruta) > valido:
+                print(f"⚠️ Memoria: Diario cortado en el byte {valido} (última línea a medio escribir).")
+                with open(ruta, "r+b") as f:
+                    f.truncate(valido)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass
+        return repetidos
+
+    # --- LECTURA Y ESCRITURA ---
+
+    def obtener(self, clave: str, por_defecto=None):
+        """Devuelve una copia del valor guardado (para que nadie lo modifique a escondidas)."""
+        if clave not in self.estado:
+            return por_defecto
+        return copy.deepcopy(self.estado[clave])
+
+    def claves(self) -> list:
+        """Nombres de todo lo que hay guardado."""
+        return list(self.estado)
+
+    def actualizar(self, **cambios) -> int:
+        """
+        Aplica los cambios en memoria y los apunta en el diario.
+        Los valores que no cambian no se escriben. Devuelve cuántos cambios hubo.
+        """
+        escritos = 0
+        for clave, valor in cambios.items():
+            if self.estado.get(clave) == valor and clave in self.estado:
+                continue
+            self.secuencia += 1
+            self.estado[clave] = copy.deepcopy(valor)
+            registro = {"n": self.secuencia, "k": clave, "v": valor}
+            self._journal.write(json.dumps(registro, separators=(",", ":")) + "\n")
+            escritos += 1
+
+        if escritos:
+            # flush: el cambio sale del proceso (sobrevive a un crash de Python).
+            self._journal.flush()
+            self.registros_journal += escritos
+            self._pendientes_fsync += escritos
+            # fsync por lotes: el cambio llega al disco físico (sobrevive a un apagón).
+            if (self._pendientes_fsync >= self.lote_fsync
+                    or time.monotonic() - self._ultimo_fsync >= self.intervalo_fsync):
+                self.sincronizar()
+            if self.registros_journal >= self.max_registros:
+                self.compactar()
+        return escritos
+
+    def sincronizar(self):
+        """Fuerza que todo lo apuntado en el diario llegue al disco."""
+        if self._pendientes_fsync:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pendientes_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def compactar(self):
+        """
+        Hace una foto limpia del estado y vacía el diario.
+        La foto se escribe en un archivo temporal y se renombra de golpe (atómico).
+        """
+        foto = dict(self.estado)
+        foto["_secuencia"] = self.secuencia
+        temporal = self.ruta_snapshot + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(foto, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # Renombrado atómico: o la foto vieja o la nueva, nunca media (por eso vive en una carpeta montada).
+        os.replace(temporal, self.ruta_snapshot)
+
+        # La foto ya contiene todo: empezamos un diario nuevo.
+        self._journal.close()
+        self._journal = open(self.ruta_journal, "w", encoding="utf-8")
+        os.fsync(self._journal.fileno())
+        self.registros_journal = 0
+        self._pendientes_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def cerrar(self):
+        """Apagado ordenado: lo dejamos todo en una foto limpia."""
+        if self._journal.closed:
+            return
+        self.sincronizar()
+        self.compactar()
+        self._journal.close()
+
+
+# Prueba rápida y banco de pruebas: memoria nueva contra el método antiguo.
+if __name__ == "__main__":
+    import tempfile
+
+    carpeta = tempfile.mkdtemp()
+    ruta = os.path.join(carpeta, "estado_bot.json")
+    vueltas = 2000
+    posiciones = [{"simbolo": "SOL/USDT", "entrada": 150.0, "cantidad": 0.1}]
+
+    # 1. Método antiguo: leer y reescribir el JSON entero en cada vuelta.
+    with open(ruta, "w") as f:
+        json.dump(dict(ESTADO_INICIAL), f, indent=4)
+    inicio = time.perf_counter()
+    for i in range(vueltas):
+        with open(ruta, "r") as f:
+            memoria = json.load(f)
+        memoria["capital"] = 15.0 + (i % 2)
+        memoria["posiciones"] = posiciones
+        with open(ruta, "w") as f:
+            json.dump(memoria, f, indent=4)
+    coste_antiguo = (time.perf_counter() - inicio) / vueltas * 1e6
+    os.remove(ruta)
+
+    # 2. Método nuevo: leer de RAM y apuntar solo los cambios.
+    gestor = GestorEstado(ruta)
+    inicio = time.perf_counter()
+    for i in range(vueltas):
+        tengo_posiciones = len(gestor.obtener("posiciones", [])) > 0
+        gestor.actualizar(capital=15.0 + (i % 2), posiciones=posiciones)
+    coste_nuevo = (time.perf_counter() - inicio) / vueltas * 1e6
+
+    # Vuelta típica sin cambios (lo normal cuando estamos esperando): solo lectura.
+    inicio = time.perf_counter()
+    for i in range(vueltas):
+        tengo_posiciones = len(gestor.obtener("posiciones", [])) > 0
+        gestor.actualizar(posiciones=posiciones)
+    coste_sin_cambios = (time.perf_counter() - inicio) / vueltas * 1e6
+    capital_final = gestor.obtener("capital")
+    gestor._journal.flush()
+    gestor._journal.close()  # Simulamos un apagón: sin cerrar ordenadamente.
+
+    # 3. Recuperación: la memoria tiene que volver igual que estaba.
+    recuperado = GestorEstado(ruta)
+    assert recuperado.obtener("capital") == capital_final
+    assert recuperado.obtener("posiciones") == posiciones
+    recuperado.cerrar()
+
+    print(f"🐢 Método antiguo (leer + reescribir JSON): {coste_antiguo:.1f} µs por vuelta")
+    print(f"🚀 Memoria en RAM + diario:               {coste_nuevo:.1f} µs por vuelta")
+    print(f"💤 Vuelta sin cambios (solo RAM):         {coste_sin_cambios:.1f} µs por vuelta")
+    print(f"📈 Mejora: x{coste_antiguo / coste_nuevo:.0f}. Recuperación tras apagón: ✅")
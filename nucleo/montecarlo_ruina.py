@@ -0,0 +1,261 @@
+# nucleo/montecarlo_ruina.py
+# 🎲 EL SIMULADOR DE RUINA (MONTE CARLO DE LAS FASES DE KELLY)
+# Las fases de riqueza del Gestor de Riesgo (1.000 / 100.000) y sus factores Kelly (0.5 / 0.3 / 0.1)
+# se eligieron a ojo. Aquí se ponen a prueba: millones de caminos de capital, operación a operación,
+# dimensionados EXACTAMENTE como lo hace el QuantEngine (fase según el capital de cada camino,
+# límite del 20% de la apuesta, margen total hasta el capital, apalancamiento de config.LEVERAGE),
+# con comisiones y algún stop saltado con hueco.
+#
+# Ojo: si el margen (capital x apalancamiento) es lo que limita, todas las fases abren lo mismo y sus
+# factores Kelly no se notan. Por eso, si no se pide un stop concreto, se compara también con un stop
+# ancho (config.MC_DISTANCIA_STOP_ANCHA), y se avisa cuando dos fases seguidas salen con el mismo riesgo.
+#
+# Por qué es rápido:
+# - Con el stop, el ratio y el acierto fijos, el tamaño de la posición es proporcional al capital
+#   dentro de cada fase. Así que el QuantEngine se consulta UNA vez por fase y sale una tabla
+#   (fase x resultado) de multiplicadores de capital.
+# - Cada operación de todos los caminos es entonces: un sorteo, una búsqueda de fase
+#   (searchsorted) y una multiplicación. Vectorizado en NumPy, por bloques de caminos.
+# - Los bloques se reparten entre procesos (un generador aleatorio independiente por bloque).
+#
+# Resultado por configuración: probabilidad de ruina, distribución de la caída máxima y del
+# crecimiento por operación, capital final, tiempo en cada fase y cambios de fase.
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np  # Matemáticas rápidas.
+
+from nucleo.gestor_riesgo import QuantEngine, FASES_RIQUEZA, LIMITE_APUESTA, PROB_WIN_DEFECTO
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+CAMINOS_POR_BLOQUE = 100_000  # Caminos que se simulan juntos (caben en la caché y se reparten bien).
+GANA, PIERDE, HUECO = 0, 1, 2  # Resultados posibles de una operación.
+
+# La configuración de hoy: la referencia contra la que comparar.
+ACTUAL = {"nombre": "ACTUAL", "fases": FASES_RIQUEZA, "limite": LIMITE_APUESTA, "apalancamiento": None}
+
+
+def modelo_por_defecto(**cambios) -> dict:
+    """El mercado simulado: acierto, ratio, stop, huecos y costes (de config, salvo lo que se cambie)."""
+    modelo = {
+        "prob_win": PROB_WIN_DEFECTO,
+        "ratio": config.RATIO_OBJETIVO,
+        "distancia_stop": config.MC_DISTANCIA_STOP,
+        "prob_hueco": config.MC_PROB_HUECO,
+        "hueco": config.MC_HUECO,
+        "coste": 2 * (config.COMISION_TAKER + config.DESLIZAMIENTO),  # Entrar y salir, sobre el nocional.
+    }
+    modelo.update(cambios)
+    return modelo
+
+
+def tabla_crecimiento(configuracion: dict, modelo: dict) -> np.ndarray:
+    """
+    Multiplicador del capital por (fase, resultado). Una fila más al final, toda a 1,
+    para los caminos arruinados (ya no operan).
+    El tamaño sale del propio QuantEngine.calcular_kelly_lote con un capital dentro de cada fase y el
+    presupuesto de siempre (todo el capital para esta posición), igual que en real.
+    """
+    apalancamiento = configuracion.get("apalancamiento") or config.LEVERAGE
+    fases = configuracion["fases"]
+    distancia = modelo["distancia_stop"]
+    # Movimiento del precio en cada resultado; las pérdidas no pasan de la liquidación (1 / apalancamiento).
+    movimientos = np.array([
+        distancia * modelo["ratio"],
+        -min(distancia, 1.0 / apalancamiento),
+        -min(distancia * modelo["hueco"], 1.0 / apalancamiento),
+    ])
+
+    tabla = np.ones((len(fases) + 1, 3))
+    suelo = 0.0
+    for i, (techo, _, _) in enumerate(fases):
+        capital = suelo if suelo > 0 else min(1.0, techo / 2)  # Cualquier capital de la fase vale (es proporcional).
+        motor = QuantEngine(capital, fases=fases, limite=configuracion["limite"],
+                            limite_margen=configuracion.get("limite_margen"))
+        tamano = motor.calcular_kelly_lote(modelo["prob_win"], modelo["ratio"], distancia, apalancamiento=apalancamiento)
+        nocional_relativo = float(tamano["nocional"][0]) / capital
+        tabla[i] = 1.0 + nocional_relativo * (movimientos - modelo["coste"])
+        suelo = techo
+    return tabla
+
+
+def _simular_bloque(tabla, techos, probabilidades, capital_inicial, capital_minimo, operaciones, caminos, semilla):
+    """
+    Simula un bloque de caminos (se ejecuta dentro de un trabajador).
+    Devuelve por camino: crecimiento log por operación, caída máxima y si se arruinó;
+    y para el bloque: operaciones en cada fase y cambios de fase.
+    """
+    rng = np.random.default_rng(semilla)
+    umbrales = np.cumsum(probabilidades)[:-1]  # u < p -> GANA; después PIERDE; al final HUECO.
+    arruinada = len(tabla) - 1  # Última fila de la tabla: sin cambios.
+
+    capital = np.full(caminos, float(capital_inicial))
+    pico = capital.copy()
+    caida = np.zeros(caminos)
+    ruina = np.zeros(caminos, dtype=bool)
+    fase_anterior = np.searchsorted(techos, capital, side="right")
+    ocupacion = np.zeros(len(tabla), dtype=np.int64)
+    cambios = np.zeros(caminos, dtype=np.int32)
+    relativa = np.empty(caminos)
+
+    for _ in range(operaciones):
+        fase = np.searchsorted(techos, capital, side="right")
+        cambios += fase != fase_anterior
+        fase_anterior = fase
+        fase[ruina] = arruinada
+        ocupacion += np.bincount(fase, minlength=len(tabla))
+
+        resultado = np.searchsorted(umbrales, rng.random(caminos), side="right")
+        capital *= tabla[fase, resultado]
+
+        np.maximum(pico, capital, out=pico)
+        np.divide(capital, pico, out=relativa)
+        np.maximum(caida, 1.0 - relativa, out=caida)
+        ruina |= capital < capital_minimo
+
+    crecimiento = np.log(np.maximum(capital, 1e-300) / capital_inicial) / operaciones
+    return crecimiento.astype(np.float32), caida.astype(np.float32), ruina, ocupacion, int(cambios.sum())
+
+
+def _simular_tarea(tarea):
+    """Adaptador para el pool de procesos: (índice de configuración, argumentos del bloque)."""
+    indice, argumentos = tarea
+    return indice, _simular_bloque(*argumentos)
+
+
+def _resumen(configuracion, tabla, crecimiento, caida, ruina, ocupacion, cambios, capital_inicial, operaciones) -> dict:
+    percentiles = lambda x, ps: {f"p{p}": float(v) for p, v in zip(ps, np.percentile(x, ps))}
+    return {
+        "nombre": configuracion["nombre"],
+        "caminos": len(ruina),
+        "prob_ruina": float(ruina.mean()),
+        "prob_caida_50": float((caida >= 0.5).mean()),
+        "caida_maxima": percentiles(caida, (50, 95, 99)),
+        "crecimiento_por_operacion": {**percentiles(crecimiento, (5, 50, 95)), "media": float(crecimiento.mean())},
+        "capital_final_mediano": float(capital_inicial * np.exp(np.median(crecimiento) * operaciones)),
+        "ocupacion_fases": (ocupacion[:-1] / max(1, ocupacion.sum())).round(4).tolist(),  # Sin contar la ruina.
+        "cambios_fase_medios": cambios / max(1, len(ruina)),
+        "riesgo_por_operacion": (1.0 - tabla[:-1, PIERDE]).round(5).tolist(),  # Fracción perdida en un stop normal.
+        "fases": [nombre for _, _, nombre in configuracion["fases"]],
+    }
+
+
+def fases_repetidas(resumen: dict) -> list:
+    """Pares de fases (nombres) que arriesgan lo mismo por operación: sus factores Kelly no cambian nada."""
+    riesgos = resumen["riesgo_por_operacion"]
+    nombres = resumen["fases"]
+    return [(nombres[i], nombres[i + 1]) for i in range(len(riesgos) - 1) if np.isclose(riesgos[i], riesgos[i + 1])]
+
+
+def simular_ruina(configuraciones: list = None, modelo: dict = None, caminos: int = None, operaciones: int = None,
+                  capital_inicial: float = None, capital_minimo: float = None, workers: int = None,
+                  semilla: int = 0) -> list:
+    """
+    Simula todas las configuraciones ({"nombre", "fases", "limite", "apalancamiento"} y, si se quiere,
+    "limite_margen") sobre el mismo mercado y devuelve un resumen por configuración (en el mismo orden).
+    Con workers > 1 los bloques de caminos se reparten entre procesos.
+    """
+    configuraciones = configuraciones or [ACTUAL]
+    modelo = modelo or modelo_por_defecto()
+    caminos = caminos or config.MC_CAMINOS
+    operaciones = operaciones or config.MC_OPERACIONES
+    capital_inicial = capital_inicial or config.MONTO_APUESTA
+    capital_minimo = config.MC_CAPITAL_MINIMO if capital_minimo is None else capital_minimo
+
+    perdida = 1.0 - modelo["prob_win"]
+    probabilidades = np.array([modelo["prob_win"], perdida * (1 - modelo["prob_hueco"]), perdida * modelo["prob_hueco"]])
+    bloques = [min(CAMINOS_POR_BLOQUE, caminos - a) for a in range(0, caminos, CAMINOS_POR_BLOQUE)]
+    semillas = iter(np.random.SeedSequence(semilla).spawn(len(configuraciones) * len(bloques)))
+
+    tablas, tareas = [], []
+    for i, configuracion in enumerate(configuraciones):
+        tabla = tabla_crecimiento(configuracion, modelo)
+        techos = np.array([techo for techo, _, _ in configuracion["fases"]][:-1], dtype=np.float64)
+        tablas.append(tabla)
+        for n in bloques:
+            tareas.append((i, (tabla, techos, probabilidades, capital_inicial, capital_minimo, operaciones, n, next(semillas))))
+
+    # Nunca más trabajadores que bloques (ni que núcleos, si no nos dicen nada).
+    workers = min(workers or os.cpu_count() or 1, len(tareas))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as piscina:
+            resultados = list(piscina.map(_simular_tarea, tareas))
+    else:
+        resultados = [_simular_tarea(t) for t in tareas]
+
+    resumenes = []
+    for i, configuracion in enumerate(configuraciones):
+        partes = [r for indice, r in resultados if indice == i]
+        resumenes.append(_resumen(
+            configuracion, tablas[i],
+            np.concatenate([p[0] for p in partes]), np.concatenate([p[1] for p in partes]),
+            np.concatenate([p[2] for p in partes]), sum(p[3] for p in partes), sum(p[4] for p in partes),
+            capital_inicial, operaciones,
+        ))
+    return resumenes
+
+
+# Banco de pruebas: la configuración de hoy contra unas cuantas alternativas.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo de ruina para las fases de Kelly del QuantEngine.")
+    parser.add_argument("--caminos", type=int, default=None, help="Caminos por configuración (por defecto config.MC_CAMINOS).")
+    parser.add_argument("--operaciones", type=int, default=None, help="Operaciones por camino.")
+    parser.add_argument("--capital", type=float, default=None, help="Capital inicial (por defecto config.MONTO_APUESTA).")
+    parser.add_argument("--acierto", type=float, default=None, help="Probabilidad de ganar cada operación.")
+    parser.add_argument("--stop", type=float, default=None,
+                        help="Distancia del stop (fracción del precio). Sin él: el típico y el ancho de config.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto: todos los núcleos).")
+    argumentos = parser.parse_args()
+
+    cambios = {}
+    if argumentos.acierto is not None:
+        cambios["prob_win"] = argumentos.acierto
+    # Sin un stop concreto, dos regímenes: el stop típico y uno ancho (donde el margen no iguala las fases).
+    stops = [argumentos.stop] if argumentos.stop is not None else [config.MC_DISTANCIA_STOP, config.MC_DISTANCIA_STOP_ANCHA]
+
+    alternativas = [
+        ACTUAL,
+        {"nombre": "FASES_x10", "fases": ((10_000, 0.5, "A"), (1_000_000, 0.3, "B"), (np.inf, 0.1, "C")),
+         "limite": LIMITE_APUESTA, "apalancamiento": None},
+        {"nombre": "KELLY_COMPLETO", "fases": ((1000, 1.0, "A"), (100_000, 0.6, "B"), (np.inf, 0.2, "C")),
+         "limite": LIMITE_APUESTA, "apalancamiento": None},
+        {"nombre": "APALANCAMIENTO_x20", "fases": FASES_RIQUEZA, "limite": LIMITE_APUESTA, "apalancamiento": 20},
+        {"nombre": "x20_LIMITE_10", "fases": FASES_RIQUEZA, "limite": 0.10, "apalancamiento": 20},
+        {"nombre": "TOPE_MARGEN_20", "fases": FASES_RIQUEZA, "limite": LIMITE_APUESTA, "apalancamiento": None,
+         "limite_margen": 0.20},
+    ]
+    caminos = argumentos.caminos or config.MC_CAMINOS
+    operaciones = argumentos.operaciones or config.MC_OPERACIONES
+    capital = argumentos.capital or config.MONTO_APUESTA
+
+    for stop in stops:
+        modelo = modelo_por_defecto(**cambios, distancia_stop=stop)
+        print(f"\n🎲 Monte Carlo: {len(alternativas)} configuraciones x {caminos:,} caminos x {operaciones} operaciones "
+              f"(capital {capital}, acierto {modelo['prob_win']:.0%}, ratio {modelo['ratio']}, stop {modelo['distancia_stop']:.1%})")
+        inicio = time.perf_counter()
+        resumenes = simular_ruina(alternativas, modelo, caminos, operaciones, capital, workers=argumentos.workers)
+        duracion = time.perf_counter() - inicio
+        pasos = len(alternativas) * caminos * operaciones
+        print(f"⏱️ {duracion:.1f} s ({pasos / duracion / 1e6:,.0f} millones de operaciones simuladas por segundo)")
+
+        for r in resumenes:
+            c, g = r["caida_maxima"], r["crecimiento_por_operacion"]
+            print(f"   {r['nombre']:20s} ruina {r['prob_ruina']:7.2%} | caída máx p50 {c['p50']:6.1%} p99 {c['p99']:6.1%} | "
+                  f"crecimiento/op p5 {g['p5']:+.4f} p50 {g['p50']:+.4f} p95 {g['p95']:+.4f} | "
+                  f"capital final mediano {r['capital_final_mediano']:,.0f} | riesgo/op por fase {r['riesgo_por_operacion']} | "
+                  f"fases {r['ocupacion_fases']} ({r['cambios_fase_medios']:.2f} cambios)")
+        for r in resumenes:
+            repetidas = fases_repetidas(r)
+            if repetidas:
+                print(f"   ⚠️ {r['nombre']}: mismo riesgo por operación en {repetidas}. Con este stop manda un tope "
+                      f"(margen o límite de la apuesta), no el factor Kelly: esas fases no se están comparando.")
@@ -0,0 +1,256 @@
+# nucleo/multi_temporalidad.py
+# 🕰️ LAS TEMPORALIDADES ALTAS (1h / 4h / 1d... SACADAS DE LAS VELAS DE 15m)
+# Para mirar la tendencia de 4 horas o del día no hace falta volver a descargar nada:
+# una vela de 1h son 4 velas de 15m seguidas (apertura de la primera, máximo de todas,
+# mínimo de todas, cierre de la última, volumen sumado). Este módulo:
+# - Agrupa las velas base en cualquier múltiplo ('1h', '4h', '1d', '1w' o un entero de velas).
+# - Lo hace de golpe (historia entera, vectorizado) o poco a poco, según se cierran velas base,
+#   guardando las barras ya cerradas y la que está a medias (no se recalcula nada).
+# - Alinea cualquier dato de la temporalidad alta con las velas base SIN MIRAR EL FUTURO:
+#   en cada vela de 15m solo se ve la última barra alta que ya había CERRADO al cerrar esa vela.
+
+import numpy as np  # Matemáticas rápidas.
+import pandas as pd  # Para entregar tablas.
+
+from nucleo.almacen_velas import timeframe_a_ms  # '4h' -> milisegundos.
+
+# Las semanas de los exchanges empiezan en lunes; el 1-1-1970 fue jueves (el lunes es el día 4).
+ORIGEN_SEMANA = 4 * 86_400_000
+CAMPOS = ("open", "high", "low", "close", "volume")
+
+
+def paso_en_ms(timeframe, paso_base_ms: int) -> int:
+    """'4h' -> ms; un entero N significa N velas base. Tiene que ser múltiplo de la vela base."""
+    paso = int(timeframe) * paso_base_ms if isinstance(timeframe, (int, np.integer)) else timeframe_a_ms(timeframe)
+    if paso < paso_base_ms or paso % paso_base_ms:
+        raise ValueError(f"La temporalidad {timeframe} no es un múltiplo de la vela base ({paso_base_ms} ms).")
+    return paso
+
+
+def _origen(paso: int) -> int:
+    return ORIGEN_SEMANA if paso == 7 * 86_400_000 else 0
+
+
+def _columnas(velas) -> dict:
+    """DataFrame, dict de columnas o lista CCXT [[ts, o, h, l, c, v], ...] -> dict de arrays."""
+    if isinstance(velas, (list, tuple, np.ndarray)):
+        matriz = np.asarray(velas, dtype=np.float64).reshape(-1, 6)
+        columnas = {"timestamp": matriz[:, 0].astype(np.int64)}
+        columnas.update({campo: matriz[:, i + 1] for i, campo in enumerate(CAMPOS)})
+        return columnas
+    columnas = {"timestamp": np.asarray(velas["timestamp"], dtype=np.int64)}
+    columnas.update({campo: np.asarray(velas[campo], dtype=np.float64) for campo in CAMPOS})
+    return columnas
+
+
+def _agrupar(columnas: dict, paso: int) -> dict:
+    """Una barra por cada grupo de velas base seguidas que caen en el mismo intervalo de 'paso'."""
+    ts = columnas["timestamp"]
+    origen = _origen(paso)
+    cubo = (ts - origen) // paso
+    inicios = np.flatnonzero(np.r_[True, cubo[1:] != cubo[:-1]])
+    finales = np.r_[inicios[1:], len(ts)] - 1
+    return {
+        "timestamp": cubo[inicios] * paso + origen,
+        "open": columnas["open"][inicios],
+        "high": np.maximum.reduceat(columnas["high"], inicios),
+        "low": np.minimum.reduceat(columnas["low"], inicios),
+        "close": columnas["close"][finales],
+        "volume": np.add.reduceat(columnas["volume"], inicios),
+        "velas": np.diff(np.r_[inicios, len(ts)]),
+        "ultima_base": ts[finales],
+    }
+
+
+def remuestrear(velas, timeframe, timeframe_base: str = "15m", solo_cerradas: bool = True) -> pd.DataFrame:
+    """
+    Historia entera de una vez: velas base -> barras de 'timeframe'.
+    Columnas: timestamp (apertura), open, high, low, close, volume, velas (base usadas) y
+    cierre (ms en que se cierra la barra). Si 'solo_cerradas', se quita la última si está a medias.
+    """
+    paso_base = timeframe_a_ms(timeframe_base)
+    paso = paso_en_ms(timeframe, paso_base)
+    columnas = _columnas(velas)
+    if len(columnas["timestamp"]) == 0:
+        return pd.DataFrame(columns=["timestamp", *CAMPOS, "velas", "cierre"])
+    barras = _agrupar(columnas, paso)
+    barras["cierre"] = barras["timestamp"] + paso
+    if solo_cerradas and barras["ultima_base"][-1] + paso_base < barras["cierre"][-1]:
+        barras = {k: v[:-1] for k, v in barras.items()}
+    del barras["ultima_base"]
+    return pd.DataFrame(barras)
+
+
+def alinear(ts_base, cierre_barras, valores, paso_base_ms: int) -> np.ndarray:
+    """
+    Lleva 'valores' (uno por barra alta) a las velas base: en cada vela base, el valor de la
+    última barra que ya estaba cerrada cuando se cerró esa vela. NaN si aún no había ninguna.
+    """
+    ts_base = np.asarray(ts_base, dtype=np.int64)
+    valores = np.asarray(valores, dtype=np.float64)
+    posicion = np.searchsorted(np.asarray(cierre_barras, dtype=np.int64), ts_base + paso_base_ms, side="right") - 1
+    salida = np.full(len(ts_base), np.nan)
+    conocidas = posicion >= 0
+    salida[conocidas] = valores[posicion[conocidas]]
+    return salida
+
+
+class _SerieAlta:
+    """Las barras de UNA temporalidad: trozos ya cerrados + la barra que está a medias."""
+
+    def __init__(self, paso: int):
+        self.paso = paso
+        self.trozos = []      # Lista de dicts de arrays (barras cerradas), en orden.
+        self.parcial = None   # Dict de arrays de longitud 1, o None.
+        self._unidas = None   # Caché de los trozos concatenados.
+        self.version = 0      # Sube cada vez que se cierra alguna barra.
+
+    def anadir(self, columnas: dict, paso_base: int):
+        grupos = _agrupar(columnas, self.paso)
+        if self.parcial is not None:
+            if grupos["timestamp"][0] == self.parcial["timestamp"][0]:
+                # Las velas nuevas continúan la barra a medias: la fusionamos con el primer grupo.
+                grupos["open"][0] = self.parcial["open"][0]
+                grupos["high"][0] = max(grupos["high"][0], self.parcial["high"][0])
+                grupos["low"][0] = min(grupos["low"][0], self.parcial["low"][0])
+                grupos["volume"][0] += self.parcial["volume"][0]
+                grupos["velas"][0] += self.parcial["velas"][0]
+            else:
+                # Ya han llegado velas de la barra siguiente: la de medias (con huecos) se da por cerrada.
+                self._cerrar(self.parcial)
+        completa = grupos["ultima_base"][-1] + paso_base >= grupos["timestamp"][-1] + self.paso
+        cerradas = len(grupos["timestamp"]) if completa else len(grupos["timestamp"]) - 1
+        if cerradas:
+            self._cerrar({k: v[:cerradas] for k, v in grupos.items()})
+        self.parcial = None if completa else {k: v[-1:] for k, v in grupos.items()}
+
+    def _cerrar(self, barras: dict):
+        self.trozos.append(barras)
+        self._unidas = None
+        self.version += 1
+
+    def cerradas(self) -> dict:
+        if self._unidas is None:
+            if self.trozos:
+                self._unidas = {k: np.concatenate([t[k] for t in self.trozos]) for k in self.trozos[0]}
+                self.trozos = [self._unidas]  # Así la próxima concatenación parte de un solo trozo.
+            else:
+                self._unidas = {k: np.empty(0) for k in ("timestamp", *CAMPOS, "velas", "ultima_base")}
+        return self._unidas
+
+
+class RemuestreadorVelas:
+    """
+    Mantiene al día las temporalidades altas a partir de las velas base que se van cerrando.
+    - actualizar(velas): mete velas base CERRADAS (las ya vistas se ignoran).
+    - barras(tf): tabla de barras cerradas (y la parcial si se pide).
+    - caracteristica(tf, nombre, funcion): calcula funcion(barras cerradas) y la guarda en caché
+      hasta que se cierra otra barra. alineada(...) la devuelve pegada a las velas base.
+    """
+
+    def __init__(self, timeframes=("1h", "4h", "1d"), timeframe_base: str = "15m"):
+        self.timeframe_base = timeframe_base
+        self.paso_base = timeframe_a_ms(timeframe_base)
+        self.series = {tf: _SerieAlta(paso_en_ms(tf, self.paso_base)) for tf in timeframes}
+        self.ultimo_ts = None
+        self._caracteristicas = {}  # (tf, nombre) -> (versión, valores)
+
+    def actualizar(self, velas) -> int:
+        """Añade velas base cerradas. Devuelve cuántas eran nuevas."""
+        columnas = _columnas(velas)
+        if self.ultimo_ts is not None:
+            nuevas = columnas["timestamp"] > self.ultimo_ts
+            columnas = {k: v[nuevas] for k, v in columnas.items()}
+        if len(columnas["timestamp"]) == 0:
+            return 0
+        for serie in self.series.values():
+            serie.anadir(columnas, self.paso_base)
+        self.ultimo_ts = int(columnas["timestamp"][-1])
+        return len(columnas["timestamp"])
+
+    def _serie(self, timeframe) -> _SerieAlta:
+        if timeframe not in self.series:
+            raise KeyError(f"Temporalidad {timeframe} no registrada (tengo: {', '.join(map(str, self.series))}).")
+        return self.series[timeframe]
+
+    def barras(self, timeframe, incluir_parcial: bool = False) -> pd.DataFrame:
+        serie = self._serie(timeframe)
+        barras = dict(serie.cerradas())
+        if incluir_parcial and serie.parcial is not None:
+            barras = {k: np.concatenate([barras[k], serie.parcial[k]]) for k in barras}
+        barras["cierre"] = np.asarray(barras["timestamp"], dtype=np.int64) + serie.paso
+        del barras["ultima_base"]
+        return pd.DataFrame(barras)
+
+    def caracteristica(self, timeframe, nombre: str, funcion) -> np.ndarray:
+        """funcion(barras_cerradas: dict de arrays) -> un valor por barra. En caché hasta la próxima barra."""
+        serie = self._serie(timeframe)
+        clave = (timeframe, nombre)
+        guardada = self._caracteristicas.get(clave)
+        if guardada is None or guardada[0] != serie.version:
+            guardada = (serie.version, np.asarray(funcion(serie.cerradas()), dtype=np.float64))
+            self._caracteristicas[clave] = guardada
+        return guardada[1]
+
+    def alineada(self, timeframe, nombre: str, funcion, ts_base) -> np.ndarray:
+        """La característica de la temporalidad alta, una por vela base y sin mirar el futuro."""
+        valores = self.caracteristica(timeframe, nombre, funcion)
+        cierres = self._serie(timeframe).cerradas()["timestamp"].astype(np.int64) + self._serie(timeframe).paso
+        return alinear(ts_base, cierres, valores, self.paso_base)
+
+    def anadir_columnas(self, datos: pd.DataFrame, timeframe, campos=("close",)) -> pd.DataFrame:
+        """Copia de 'datos' con columnas 'close_4h'... alineadas (solo barras ya cerradas)."""
+        salida = datos.copy()
+        for campo in campos:
+            salida[f"{campo}_{timeframe}"] = self.alineada(timeframe, campo, lambda b, c=campo: b[c], datos["timestamp"])
+        return salida
+
+
+# Banco de pruebas: dos años de 15m -> 1h/4h/1d de golpe, vela a vela, y comprobación de que coinciden.
+if __name__ == "__main__":
+    import time
+
+    from nucleo import indicadores as ind
+
+    rng = np.random.default_rng(18)
+    n = 2 * 365 * 96
+    paso_base = timeframe_a_ms("15m")
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = np.concatenate([[cierres[0]], cierres[:-1]])
+    velas = pd.DataFrame({
+        "timestamp": 1_700_000_100_000 // paso_base * paso_base + np.arange(n, dtype=np.int64) * paso_base,
+        "open": aperturas, "close": cierres, "volume": rng.uniform(1, 100, n),
+        "high": np.maximum(aperturas, cierres) * 1.001, "low": np.minimum(aperturas, cierres) * 0.999,
+    })
+    velas = velas.drop(index=rng.choice(n, 500, replace=False)).reset_index(drop=True)  # Algún hueco.
+
+    for tf in ("1h", "4h", "1d"):
+        inicio = time.perf_counter()
+        barras = remuestrear(velas, tf)
+        print(f"🕰️ {len(velas):,} velas de 15m -> {len(barras):,} barras de {tf} en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    remuestreador = RemuestreadorVelas()
+    inicio = time.perf_counter()
+    remuestreador.actualizar(velas.iloc[:-2000])
+    filas = velas.iloc[-2000:][["timestamp", "open", "high", "low", "close", "volume"]].to_numpy()  # Orden CCXT.
+    t_lote = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for fila in filas:
+        remuestreador.actualizar([fila])
+    t_vela = (time.perf_counter() - inicio) / len(filas)
+    print(f"🔁 Carga inicial {t_lote * 1000:.1f} ms; después {t_vela * 1e6:.0f} µs por vela cerrada (3 temporalidades).")
+
+    for tf in ("1h", "4h", "1d"):
+        incremental = remuestreador.barras(tf)
+        de_golpe = remuestrear(velas, tf)
+        iguales = np.allclose(incremental[list(CAMPOS)].to_numpy(), de_golpe[list(CAMPOS)].to_numpy())
+        print(f"   {tf}: incremental = de golpe? {iguales} ({len(incremental)} barras)")
+
+    ema_4h = remuestreador.alineada("4h", "ema20", lambda b: ind.ema(b["close"], 20), velas["timestamp"])
+    cierres_4h = remuestreador.barras("4h")
+    ts = velas["timestamp"].to_numpy()
+    visible = ts + paso_base  # Cuándo se cierra cada vela base.
+    posicion = np.searchsorted(cierres_4h["cierre"].to_numpy(), visible, side="right") - 1
+    print(f"📐 EMA20 de 4h en la última vela de 15m: {ema_4h[-1]:.4f}")
+    print(f"🔒 Sin mirar el futuro: la barra de 4h usada cierra antes que la vela de 15m? "
+          f"{bool((cierres_4h['cierre'].to_numpy()[posicion[posicion >= 0]] <= visible[posicion >= 0]).all())}")
@@ -3,19 +3,18 @@
 # Coordina el Scout, el Auditor y el Gestor de Riesgo para operar de verdad.
 
 import asyncio
-import json
-import ccxt.async_support as ccxt
 from typing import TypedDict, Dict, Any, Annotated
 import operator
 
-# Importamos las herramientas del mapa (LangGraph).
-from langgraph.graph import StateGraph, END
-
 # Importamos a nuestros agentes especializados.
-from nucleo.gestor_riesgo import QuantEngine
-from nucleo.supervisor_autonomo import AuditorEVM
+# Las librerías pesadas (LangGraph, CCXT, web3, pandas) NO se cargan aquí: se cargan la primera
+# vez que hacen falta. Así arrancar (y reiniciar tras una auto-evolución) es casi instantáneo.
+from nucleo.gestor_riesgo import QuantEngine, PROB_WIN_DEFECTO
 import config 
 
+# Nombre del nodo final de LangGraph (el mismo valor que langgraph.graph.END).
+FIN = "__end__"
+
 # ESTADO DEL SISTEMA (La memoria a corto plazo)
 # Usamos Annotated con operator.add solo si queremos guardar historia (append).
 # Aquí usamos sobrescritura simple para la mayoría de campos.
@@ -27,6 +26,60 @@ class EstadoTrading(TypedDict):
     es_seguro: bool
     decision: str
     mensaje: str
+    oportunidades: list  # Lista ordenada de mercados con señal (la mejor primero).
+
+# El radar vive todo el proceso: comparte semáforo y presupuesto de peticiones entre vueltas.
+# Se crea la primera vez que el Scout lo necesita (trae consigo CCXT y pandas).
+_RADAR = None
+# El catálogo de maestras también: solo relee el archivo cuando el laboratorio lo cambia.
+_CATALOGO = None
+# Y el auditor: su caché de informes y lo aprendido de cada nodo RPC sobreviven entre vueltas.
+_AUDITOR = None
+# Y las estadísticas en vivo de cada estrategia (se recuperan del disco una vez, al crearlas).
+_ESTADISTICAS = None
+
+def obtener_estadisticas():
+    """Devuelve las estadísticas en vivo de las estrategias del proceso (las recupera la primera vez)."""
+    global _ESTADISTICAS
+    if _ESTADISTICAS is None:
+        from nucleo.estadisticas_estrategia import EstadisticasEstrategias
+        _ESTADISTICAS = EstadisticasEstrategias()
+    return _ESTADISTICAS
+
+def cerrar_estadisticas():
+    """Deja las estadísticas en una foto limpia (si llegaron a cargarse)."""
+    if _ESTADISTICAS is not None:
+        _ESTADISTICAS.cerrar()
+
+async def cerrar_auditor():
+    """Cierra la sesión HTTP del grupo de nodos RPC del auditor (si llegó a crearse)."""
+    if _AUDITOR is not None:
+        await _AUDITOR.grupo.cerrar()
+
+def obtener_auditor():
+    """Devuelve el auditor EVM concurrente del proceso (lo crea la primera vez; aquí es donde se carga web3)."""
+    global _AUDITOR
+    if _AUDITOR is None:
+        from nucleo.auditor_concurrente import AuditorConcurrente
+        _AUDITOR = AuditorConcurrente()
+    return _AUDITOR
+
+def obtener_catalogo():
+    """Devuelve el catálogo de estrategias maestras del proceso (lo crea la primera vez)."""
+    global _CATALOGO
+    if _CATALOGO is None:
+        from nucleo.evaluador_maestras import CatalogoMaestras  # Maestras leídas y compiladas.
+        _CATALOGO = CatalogoMaestras()
+    return _CATALOGO
+
+def obtener_radar():
+    """Devuelve el radar del proceso (lo crea la primera vez), evaluando las maestras en cada mercado."""
+    global _RADAR
+    if _RADAR is None:
+        from nucleo.escaner_multimercado import EscanerMultimercado  # El radar de muchos mercados.
+        from nucleo.evaluador_maestras import EvaluadorMaestras  # Todas las maestras en una pasada.
+        _RADAR = EscanerMultimercado(evaluador=EvaluadorMaestras(obtener_catalogo()))
+    return _RADAR
 
 async def nodo_scout_francotirador(estado: EstadoTrading) -> Dict[str, Any]:
     """
@@ -34,37 +87,34 @@ async def nodo_scout_francotirador(estado: EstadoTrading) -> Dict[str, Any]:
     """
     print("🔭 Scout: Escaneando mercado en busca de Estrategias Maestras...")
     
-    # 1. Cargar las estrategias ganadoras del laboratorio.
-    try:
-        with open("estrategias_maestras.json", 'r') as f:
-            estrategias_maestras = json.load(f)
-    except:
-        return {"decision": "DORMIR", "mensaje": "No hay estrategias maestras aún."}
-
+    # 1. Las estrategias ganadoras del laboratorio (ya compiladas; solo se releen si el archivo cambia).
+    estrategias_maestras = obtener_catalogo().cargar()
     if not estrategias_maestras:
-        return {"decision": "DORMIR", "mensaje": "Lista de estrategias vacía."}
-
-    # 2. Mirar el mercado real.
-    exchange = ccxt.bitget()
-    try:
-        ticker = await exchange.fetch_ticker(config.SYMBOL)
-        precio = ticker['last']
-        await exchange.close()
-    except:
-        await exchange.close()
+        return {"decision": "DORMIR", "mensaje": "No hay estrategias maestras evaluables aún."}
+
+    # 2. Barrer todo el universo de mercados a la vez: en cada mercado se evalúan TODAS las maestras.
+    radar = obtener_radar()
+    oportunidades = await radar.escanear()
+    barrido = radar.ultimo_barrido
+    if barrido["errores"] and barrido["errores"] == barrido["mercados"]:
         return {"decision": "ERROR", "mensaje": "Error de conexión con Exchange."}
+    if not oportunidades:
+        return {"decision": "DORMIR", "oportunidades": [],
+                "mensaje": f"Ninguna de las {len(estrategias_maestras)} maestras se cumple en "
+                           f"{barrido['mercados']} mercados ({barrido['segundos_evaluacion'] * 1000:.0f} ms de evaluación)."}
 
-    # 3. Aplicar lógica de reconocimiento (Simplificada).
-    # Aquí el Scout revisaría si se cumple alguna estrategia maestra AHORA MISMO.
-    # Por ahora, asumimos que detecta la primera de la lista para probar el flujo.
-    estrategia_detectada = estrategias_maestras[0]
-    
-    print(f"🎯 Scout: ¡Patrón detectado! Coincide con {estrategia_detectada['nombre']}")
+    # 3. La mejor oportunidad: el mercado donde se ha cumplido la maestra con mejor puntuación.
+    mejor = oportunidades[0]
+    cumplidas = ", ".join(f"{e['nombre']} ({e['puntuacion']:.2f})" for e in mejor["estrategias"])
+    print(f"🎯 Scout: ¡Patrón detectado en {mejor['simbolo']} ({mejor['timeframe']})! Se cumplen: {cumplidas}")
+    print(f"⏱️ Scout: {len(estrategias_maestras)} maestras x {barrido['mercados']} mercados evaluadas en "
+          f"{barrido['segundos_evaluacion'] * 1000:.1f} ms ({barrido['evaluacion_media_ms']:.2f} ms/mercado).")
 
     return {
-        "simbolo": config.SYMBOL,
-        "precio_actual": precio,
-        "estrategia_activa": estrategia_detectada['nombre'],
+        "simbolo": mejor["simbolo"],
+        "precio_actual": mejor["precio"],
+        "estrategia_activa": mejor["estrategia"],
+        "oportunidades": oportunidades, # El Auditor y el Quant ven la lista entera.
         "decision": "AUDITAR" # Siguiente paso: Llamar al policía.
     }
 
@@ -78,15 +128,20 @@ async def nodo_auditor_blindado(estado: EstadoTrading) -> Dict[str, Any]:
 
     print(f"🛡️ Auditor: Verificando seguridad del token en {estado['simbolo']}...")
     
-    # Instanciamos al policía EVM (Blockchain).
-    auditor = AuditorEVM()
+    # El policía EVM (Blockchain) del proceso, con su caché. web3 solo se carga si llegamos hasta aquí.
+    auditor = obtener_auditor()
     
     # IMPORTANTE: En un entorno real, necesitamos la dirección del contrato del token.
     # Usamos una dirección dummy de ejemplo.
     token_dummy = "0x4200000000000000000000000000000000000006" 
     
-    # Ejecutamos la simulación de venta (Honeypot Check).
-    reporte = auditor.auditar_token(token_dummy)
+    # Ejecutamos la simulación de venta (Honeypot Check) sin bloquear el bucle de eventos.
+    reporte = await auditor.auditar(token_dummy)
+    ciclo = auditor.nuevo_ciclo()
+    mejor_nodo = ciclo["nodos"][0]["url"] if ciclo["nodos"] else "?"
+    print(f"🛡️ Auditor: {ciclo['latencia_media_ms']:.1f} ms, {ciclo['llamadas_rpc']} llamadas RPC en "
+          f"{ciclo['peticiones_http']} peticiones HTTP ({'caché' if reporte.get('desde_cache') else 'nodo'}). "
+          f"Mejor nodo: {mejor_nodo}, coberturas acumuladas: {ciclo['red']['coberturas']}.")
     
     if reporte["es_seguro"]:
         print("🛡️ Auditor: ✅ Token limpio. Simulación exitosa.")
@@ -102,17 +157,40 @@ async def nodo_quant_ejecutor(estado: EstadoTrading) -> Dict[str, Any]:
     if estado.get("decision") != "CALCULAR_RIESGO":
         return {}
 
-    # 1. Obtenemos capital real (Simulado en 15.0).
-    saldo = 15.0 
-    
-    # 2. Usamos el Gestor de Riesgo Adaptativo.
-    motor = QuantEngine(capital_inicial=saldo)
-    apuesta = motor.calcular_kelly_adaptativo()
-    
-    print(f"📐 Quant: Ejecutando orden. Capital: {saldo}€. Apuesta Kelly: {apuesta:.2f}€")
-    
+    # 1. Capital: el que traiga el estado o, si no, el que dice la configuración.
+    saldo = estado.get("capital_real") or config.MONTO_APUESTA
+    motor = QuantEngine(capital_inicial=saldo, estadisticas=obtener_estadisticas())
+
+    # 2. Todas las oportunidades del Scout se dimensionan de una vez (Kelly Adaptativo en lote):
+    #    acierto y ratio del laboratorio (corregidos con lo que cada estrategia lleva hecho
+    #    en vivo) y stop técnico de cada mercado.
+    oportunidades = estado.get("oportunidades") or [{"simbolo": estado["simbolo"], "precio": estado["precio_actual"]}]
+    #    El acierto y el ratio del laboratorio salen de operaciones simuladas con este mismo stop
+    #    (2 ATR) y objetivo (RATIO_OBJETIVO): describen la misma apuesta que vamos a dimensionar.
+    probabilidades = [o.get("acierto") or PROB_WIN_DEFECTO for o in oportunidades]
+    ratios = [o.get("ratio") or config.RATIO_OBJETIVO for o in oportunidades]
+    distancias = [
+        # Sin ATR no sabemos dónde va el stop: distancia 0 = esa no se opera.
+        (o["precio"] - motor.calcular_stop_loss_tecnico(o["precio"], o["atr"])) / o["precio"]
+        if (o.get("precio") or 0) > 0 and (o.get("atr") or 0) > 0 else 0.0
+        for o in oportunidades
+    ]
+    # Si ninguna trae ATR, como antes: la apuesta entera es el riesgo (sin apalancamiento).
+    tamanos = motor.calcular_kelly_lote(probabilidades, ratios, distancias if any(distancias) else None,
+                                        estrategias=[o.get("estrategia") for o in oportunidades])
+
+    # 3. Ejecutamos la que ha auditado el Auditor (la primera de la lista).
+    indice = next((i for i, o in enumerate(oportunidades) if o.get("simbolo") == estado.get("simbolo")), 0)
+    apuesta = float(tamanos["riesgo"][indice])
+    nocional = float(tamanos["nocional"][indice])
+    con_tamano = int((tamanos["margen"] > 0).sum())
+    print(f"📐 Quant: {len(oportunidades)} oportunidades dimensionadas ({con_tamano} con tamaño, fase {tamanos['fase']}).")
+    print(f"📐 Quant: Ejecutando orden. Capital: {saldo}€. Apuesta Kelly: {apuesta:.2f}€ (posición {nocional:.2f}€).")
+
     # Aquí iría la llamada final: await exchange.create_order(...)
-    
+    # Nadie sigue todavía la posición hasta su stop u objetivo, así que no hay operaciones cerradas que
+    # apuntar: las estadísticas solo tienen lo que ya guardaron y Kelly usa el previo del laboratorio.
+
     return {
         "capital_real": saldo,
         "mensaje": f"Orden ENVIADA. Tamaño: {apuesta:.2f}€"
@@ -126,55 +204,84 @@ def decidir_si_auditar(estado: EstadoTrading) -> str:
     """Decide si vamos al Auditor o nos vamos a dormir."""
     if estado["decision"] == "AUDITAR":
         return "auditor"
-    return END
+    return FIN
 
 def decidir_si_operar(estado: EstadoTrading) -> str:
     """Decide si vamos al Quant o abortamos misión."""
     if estado["decision"] == "CALCULAR_RIESGO":
         return "quant"
-    return END
-
-# 2. Creamos el tablero de juego.
-workflow = StateGraph(EstadoTrading)
-
-# 3. Añadimos a los jugadores (Nodos).
-workflow.add_node("scout", nodo_scout_francotirador)
-workflow.add_node("auditor", nodo_auditor_blindado)
-workflow.add_node("quant", nodo_quant_ejecutor)
-
-# 4. Dibujamos las flechas (Flujo).
-workflow.set_entry_point("scout") # Empezamos siempre con el Scout.
-
-# Del Scout podemos ir al Auditor o Terminar.
-workflow.add_conditional_edges(
-    "scout",
-    decidir_si_auditar,
-    {
-        "auditor": "auditor",
-        END: END
-    }
-)
-
-# Del Auditor podemos ir al Quant o Terminar.
-workflow.add_conditional_edges(
-    "auditor",
-    decidir_si_operar,
-    {
-        "quant": "quant",
-        END: END
-    }
-)
+    return FIN
+
+# 2. El tablero se monta y se compila la PRIMERA vez que alguien pide el cerebro.
+_CEREBRO = None
+
+def construir_cerebro():
+    """Monta el grafo de agentes y lo compila (aquí es donde se carga LangGraph)."""
+    from langgraph.graph import StateGraph, END  # Las herramientas del mapa (pesadas).
 
-# Del Quant siempre terminamos (por ahora).
-workflow.add_edge("quant", END)
+    # Creamos el tablero de juego.
+    workflow = StateGraph(EstadoTrading)
 
-# 5. ¡COMPILAMOS EL CEREBRO! (CRÍTICO PARA QUE FUNCIONE)
-app = workflow.compile()
-CEREBRO_ZEROX = app # ALIAS CRÍTICO: Esto es lo que busca SISTEMA_AUTONOMO.py
+    # 3. Añadimos a los jugadores (Nodos).
+    workflow.add_node("scout", nodo_scout_francotirador)
+    workflow.add_node("auditor", nodo_auditor_blindado)
+    workflow.add_node("quant", nodo_quant_ejecutor)
+
+    # 4. Dibujamos las flechas (Flujo).
+    workflow.set_entry_point("scout") # Empezamos siempre con el Scout.
+
+    # Del Scout podemos ir al Auditor o Terminar.
+    workflow.add_conditional_edges(
+        "scout",
+        decidir_si_auditar,
+        {
+            "auditor": "auditor",
+            FIN: END
+        }
+    )
+
+    # Del Auditor podemos ir al Quant o Terminar.
+    workflow.add_conditional_edges(
+        "auditor",
+        decidir_si_operar,
+        {
+            "quant": "quant",
+            FIN: END
+        }
+    )
+
+    # Del Quant siempre terminamos (por ahora).
+    workflow.add_edge("quant", END)
+
+    # 5. ¡COMPILAMOS EL CEREBRO! (CRÍTICO PARA QUE FUNCIONE)
+    return workflow.compile()
+
+def obtener_cerebro():
+    """Devuelve el cerebro compilado del proceso (lo compila la primera vez)."""
+    global _CEREBRO
+    if _CEREBRO is None:
+        _CEREBRO = construir_cerebro()
+    return _CEREBRO
+
+def __getattr__(nombre):
+    # ALIAS CRÍTICO: 'CEREBRO_ZEROX' (y 'app'/'RADAR') siguen existiendo para quien los importe,
+    # pero solo se construyen cuando alguien los pide de verdad.
+    if nombre in ("CEREBRO_ZEROX", "app"):
+        return obtener_cerebro()
+    if nombre == "RADAR":
+        return obtener_radar()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # Si ejecutamos este archivo directamente, probamos el cerebro.
 if __name__ == "__main__":
     print("🏁 Iniciando prueba manual del CEREBRO_ZEROX...")
     # Ejecutamos el grafo con un estado inicial vacío.
-    resultado = asyncio.run(CEREBRO_ZEROX.ainvoke({"capital_real": 0, "decision": "INICIO"}))
+    async def _prueba():
+        from nucleo.sesion_exchange import REGISTRO_EXCHANGES  # La línea compartida con el exchange.
+        try:
+            return await obtener_cerebro().ainvoke({"capital_real": 0, "decision": "INICIO"})
+        finally:
+            await REGISTRO_EXCHANGES.cerrar_todos()
+
+    resultado = asyncio.run(_prueba())
     print("🏁 Resultado final:", resultado)
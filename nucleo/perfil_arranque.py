@@ -0,0 +1,131 @@
+# nucleo/perfil_arranque.py
+# ⏱️ EL CRONÓMETRO DE ARRANQUE (PERFIL DE IMPORTACIONES)
+# Cada reinicio (incluido el de la Auto-Evolución con os.execv) paga lo que tarda en cargar
+# todas las librerías. Este cronómetro apunta cuánto cuesta cargar cada módulo
+# (como 'python -X importtime', pero desde dentro) y cuánto tardamos en tomar la primera decisión.
+# Solo se activa con: python SISTEMA_AUTONOMO.py --profile-startup
+
+import sys  # Para engancharnos a la maquinaria de importación.
+import time  # Para cronometrar.
+
+
+class _CargadorCronometrado:
+    """Envuelve el cargador real de un módulo y cronometra su ejecución."""
+
+    def __init__(self, original, perfil):
+        self._original = original
+        self._perfil = perfil
+
+    def create_module(self, spec):
+        return self._original.create_module(spec)
+
+    def exec_module(self, modulo):
+        self._perfil._entrar()
+        inicio = time.perf_counter()
+        try:
+            self._original.exec_module(modulo)
+        finally:
+            self._perfil._salir(modulo.__name__, time.perf_counter() - inicio)
+
+    def __getattr__(self, nombre):
+        # Todo lo demás (get_data, is_package...) lo resuelve el cargador de verdad.
+        return getattr(self._original, nombre)
+
+
+class _BuscadorCronometrado:
+    """Buscador de módulos que no busca nada: pregunta a los demás y cronometra lo que encuentran."""
+
+    def __init__(self, perfil):
+        self._perfil = perfil
+
+    def find_spec(self, nombre, ruta=None, objetivo=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, "find_spec"):
+                continue
+            spec = buscador.find_spec(nombre, ruta, objetivo)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _CargadorCronometrado(spec.loader, self._perfil)
+                return spec
+        return None
+
+
+class PerfilArranque:
+    """
+    Apunta el tiempo de importación de cada módulo (total y propio, sin contar sus hijos)
+    y los hitos del arranque (cerebro listo, primera decisión...).
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.modulos = {}  # nombre -> {"total": s, "propio": s}
+        self.hitos = []    # [(nombre, segundos desde el inicio)]
+        self._pila = []    # Tiempo de los hijos de cada importación en curso.
+        self._buscador = None
+
+    def iniciar(self):
+        """Empieza a cronometrar las importaciones a partir de ahora."""
+        if self._buscador is None:
+            self.inicio = time.perf_counter()
+            self._buscador = _BuscadorCronometrado(self)
+            sys.meta_path.insert(0, self._buscador)
+
+    def detener(self):
+        if self._buscador is not None:
+            sys.meta_path.remove(self._buscador)
+            self._buscador = None
+
+    def _entrar(self):
+        self._pila.append(0.0)
+
+    def _salir(self, nombre, total):
+        hijos = self._pila.pop()
+        self.modulos[nombre] = {"total": total, "propio": total - hijos}
+        if self._pila:
+            self._pila[-1] += total
+
+    def marcar(self, hito: str) -> float:
+        """Apunta un hito y devuelve los segundos desde el inicio."""
+        segundos = time.perf_counter() - self.inicio
+        self.hitos.append((hito, segundos))
+        return segundos
+
+    def por_paquete(self) -> dict:
+        """Tiempo propio sumado por paquete raíz (langgraph, ccxt, web3...)."""
+        paquetes = {}
+        for nombre, t in self.modulos.items():
+            raiz = nombre.split(".")[0]
+            paquetes[raiz] = paquetes.get(raiz, 0.0) + t["propio"]
+        return dict(sorted(paquetes.items(), key=lambda p: p[1], reverse=True))
+
+    def informe(self, top: int = 15) -> str:
+        """Texto con los paquetes y módulos más caros y los hitos del arranque."""
+        lineas = [f"⏱️ PERFIL DE ARRANQUE ({len(self.modulos)} módulos importados)"]
+        lineas.append("   Por paquete (tiempo propio):")
+        for paquete, segundos in list(self.por_paquete().items())[:top]:
+            lineas.append(f"   {segundos * 1000:9.1f} ms  {paquete}")
+        lineas.append("   Módulos más lentos (tiempo total, con sus importaciones):")
+        mas_lentos = sorted(self.modulos.items(), key=lambda m: m[1]["total"], reverse=True)[:top]
+        for nombre, t in mas_lentos:
+            lineas.append(f"   {t['total'] * 1000:9.1f} ms  {nombre} (propio {t['propio'] * 1000:.1f} ms)")
+        lineas.append("   Hitos:")
+        for hito, segundos in self.hitos:
+            lineas.append(f"   {segundos * 1000:9.1f} ms  {hito}")
+        return "\n".join(lineas)
+
+
+# El cronómetro único del proceso.
+PERFIL = PerfilArranque()
+
+
+# Prueba rápida: cuánto cuestan las librerías pesadas del robot.
+if __name__ == "__main__":
+    PERFIL.iniciar()
+    for modulo in ("langgraph.graph", "ccxt.async_support", "web3", "pandas"):
+        try:
+            __import__(modulo)
+        except ImportError as e:
+            print(f"⚠️ {modulo} no está instalado ({e}).")
+        PERFIL.marcar(f"import {modulo}")
+    PERFIL.detener()
+    print(PERFIL.informe(top=10))
@@ -0,0 +1,146 @@
+# nucleo/pivotes.py
+# 〰️ EL ÍNDICE DE PIVOTES (ZIG-ZAG)
+# Las figuras de Bulkowski (doble suelo, hombro-cabeza-hombro, triángulos, banderas...) no se ven
+# vela a vela: se ven en los giros del precio. Este módulo saca esos giros (máximos y mínimos
+# de oscilación) UNA vez por historia y los guarda en un índice compacto de arrays.
+# Los detectores de figuras trabajan sobre ese índice (miles de puntos) en vez de sobre
+# las velas (cientos de miles), y cualquier otro detector puede reutilizarlo.
+#
+# Cómo se construye (todo O(n)):
+# 1. Fractales: una vela es máximo de oscilación si su máximo es el mayor de las 'velas_lado'
+#    velas a cada lado (igual con los mínimos). Se hace con máximos móviles, sin bucles.
+# 2. Alternancia: si salen dos máximos seguidos, nos quedamos con el más alto (y al revés).
+# 3. Filtro zig-zag: se descartan los giros de menos de 'umbral_pct' (sobre el índice ya compacto).
+#
+# OJO (no mirar el futuro): un fractal solo se CONFIRMA 'velas_lado' velas después.
+# Cada pivote guarda en 'confirmado' la vela en la que ya se podía saber; los detectores
+# solo dan señal a partir de ahí.
+
+import numpy as np  # Matemáticas rápidas.
+
+from nucleo import indicadores as ind  # Máximos y mínimos móviles en NumPy puro.
+
+MAXIMO = 1   # Pivote de techo.
+MINIMO = -1  # Pivote de suelo.
+
+
+class IndicePivotes:
+    """
+    Índice compacto de giros del precio. Arrays alineados (uno por pivote, en orden temporal):
+    - posicion: vela donde está el giro.
+    - precio: el máximo (techo) o el mínimo (suelo) de esa vela.
+    - tipo: MAXIMO (1) o MINIMO (-1). Siempre alternan.
+    - confirmado: primera vela en la que el giro ya era conocido.
+    """
+
+    def __init__(self, posicion, precio, tipo, confirmado, n_velas: int):
+        self.posicion = np.asarray(posicion, dtype=np.int64)
+        self.precio = np.asarray(precio, dtype=np.float64)
+        self.tipo = np.asarray(tipo, dtype=np.int8)
+        self.confirmado = np.asarray(confirmado, dtype=np.int64)
+        self.n_velas = n_velas
+
+    def __len__(self):
+        return len(self.posicion)
+
+    def conocidos_en(self, vela: int) -> int:
+        """Cuántos pivotes estaban ya confirmados en esa vela (los primeros N del índice)."""
+        return int(np.searchsorted(np.maximum.accumulate(self.confirmado), vela, side="right"))
+
+    def ventanas(self, largo: int, primero: int):
+        """
+        Todas las secuencias de 'largo' pivotes seguidos que empiezan por un pivote de tipo 'primero'.
+        Devuelve (inicios, precios, posiciones, confirmados) con forma (secuencias, largo).
+        """
+        if len(self) < largo:
+            vacio = np.empty((0, largo))
+            return np.empty(0, dtype=np.int64), vacio, vacio.astype(np.int64), vacio.astype(np.int64)
+        inicios = np.flatnonzero(self.tipo[:len(self) - largo + 1] == primero)
+        desplazamientos = inicios[:, None] + np.arange(largo)[None, :]
+        return inicios, self.precio[desplazamientos], self.posicion[desplazamientos], self.confirmado[desplazamientos]
+
+
+def _fractales(serie: np.ndarray, velas_lado: int, maximos: bool) -> np.ndarray:
+    """Posiciones de las velas que son el extremo de su vecindario (velas_lado a cada lado)."""
+    ventana = 2 * velas_lado + 1
+    extremo = ind.maximo_movil(serie, ventana) if maximos else ind.minimo_movil(serie, ventana)
+    # extremo[i + velas_lado] es el extremo de la ventana centrada en i.
+    centrado = np.full(len(serie), np.nan)
+    centrado[:len(serie) - velas_lado] = extremo[velas_lado:]
+    return np.flatnonzero(serie == centrado)
+
+
+def _compactar_rachas(posicion, precio, tipo, confirmado):
+    """Si salen varios pivotes del mismo tipo seguidos, deja solo el más extremo de cada racha."""
+    if len(tipo) == 0:
+        return posicion, precio, tipo, confirmado
+    inicios = np.flatnonzero(np.r_[True, tipo[1:] != tipo[:-1]])
+    valor = precio * tipo  # Techos: cuanto más alto mejor. Suelos: cuanto más bajo mejor.
+    mejor = np.maximum.reduceat(valor, inicios)
+    largos = np.diff(np.r_[inicios, len(tipo)])
+    candidatos = np.flatnonzero(valor == np.repeat(mejor, largos))
+    racha = np.searchsorted(inicios, candidatos, side="right") - 1
+    _, primero = np.unique(racha, return_index=True)
+    elegidos = candidatos[primero]
+    # La racha se da por cerrada cuando se confirma su último miembro.
+    confirmado_racha = np.maximum.reduceat(confirmado, inicios)
+    return posicion[elegidos], precio[elegidos], tipo[elegidos], confirmado_racha
+
+
+def _filtrar_zigzag(posicion, precio, tipo, confirmado, umbral: float):
+    """Quita los giros de menos de 'umbral' (fracción). Recorre pivotes, no velas."""
+    if umbral <= 0 or len(tipo) < 2:
+        return posicion, precio, tipo, confirmado
+    guardados = [0]
+    confirmacion = [int(confirmado[0])]
+    for i in range(1, len(tipo)):
+        ultimo = guardados[-1]
+        if tipo[i] == tipo[ultimo]:
+            # Mismo tipo (porque quitamos el giro de en medio): nos quedamos con el más extremo.
+            if precio[i] * tipo[i] > precio[ultimo] * tipo[ultimo]:
+                guardados[-1] = i
+            confirmacion[-1] = max(confirmacion[-1], int(confirmado[i]))
+        elif abs(precio[i] / precio[ultimo] - 1) >= umbral:
+            guardados.append(i)
+            confirmacion.append(int(confirmado[i]))
+    guardados = np.asarray(guardados, dtype=np.int64)
+    return posicion[guardados], precio[guardados], tipo[guardados], np.asarray(confirmacion, dtype=np.int64)
+
+
+def extraer_pivotes(maximo, minimo, velas_lado: int = 3, umbral_pct: float = 1.0) -> IndicePivotes:
+    """
+    Construye el índice de pivotes de una historia.
+    velas_lado: velas a cada lado para que un giro cuente (3 = ventana de 7 velas).
+    umbral_pct: movimiento mínimo (en %) entre un giro y el siguiente.
+    """
+    maximo, minimo = ind._array(maximo), ind._array(minimo)
+    techos = _fractales(maximo, velas_lado, maximos=True)
+    suelos = _fractales(minimo, velas_lado, maximos=False)
+
+    posicion = np.concatenate([techos, suelos])
+    tipo = np.concatenate([np.full(len(techos), MAXIMO, np.int8), np.full(len(suelos), MINIMO, np.int8)])
+    orden = np.lexsort((tipo, posicion))
+    posicion, tipo = posicion[orden], tipo[orden]
+    precio = np.where(tipo == MAXIMO, maximo[posicion], minimo[posicion])
+    confirmado = posicion + velas_lado
+
+    posicion, precio, tipo, confirmado = _compactar_rachas(posicion, precio, tipo, confirmado)
+    posicion, precio, tipo, confirmado = _filtrar_zigzag(posicion, precio, tipo, confirmado, umbral_pct / 100)
+    return IndicePivotes(posicion, precio, tipo, confirmado, len(maximo))
+
+
+# Banco de pruebas: tres años de velas de 15 minutos.
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(4)
+    n = 3 * 365 * 96
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    maximos = cierres * (1 + rng.uniform(0, 0.002, n))
+    minimos = cierres * (1 - rng.uniform(0, 0.002, n))
+
+    inicio = time.perf_counter()
+    indice = extraer_pivotes(maximos, minimos)
+    duracion = time.perf_counter() - inicio
+    print(f"〰️ {n:,} velas -> {len(indice):,} pivotes en {duracion * 1000:.1f} ms")
+    print(f"   Primeros: {list(zip(indice.posicion[:4].tolist(), indice.tipo[:4].tolist(), indice.precio[:4].round(2).tolist()))}")
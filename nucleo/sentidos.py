@@ -4,12 +4,195 @@
 # Usamos Discord porque es gratis y rápido.
 
 import os  # Herramientas para mirar dentro del ordenador.
-import requests  # El cartero que lleva las cartas por internet.
+import time  # Para las ventanas de agrupado y duplicados.
+import asyncio  # Para que el cartero trabaje en segundo plano.
+from collections import deque  # La bandeja de salida (con tamaño máximo).
 from dotenv import load_dotenv  # La herramienta para leer las claves secretas.
 
 # Cargamos el archivo .env para poder leer la dirección de Discord.
 load_dotenv()
 
+# Discord no acepta mensajes de más de 2000 caracteres.
+LIMITE_DISCORD = 2000
+
+
+class DespachadorAlertas:
+    """
+    El cartero asíncrono.
+    - 'encolar' deja la carta en la bandeja y vuelve al instante (nunca bloquea el bucle).
+    - Una tarea en segundo plano vacía la bandeja con una sesión HTTP reutilizable.
+    - Las ráfagas se agrupan en un solo resumen (digest).
+    - Las cartas repetidas dentro de la ventana de duplicados se tiran.
+    - Si Discord dice 429 (demasiadas cartas), esperamos lo que pide 'retry_after'.
+    - La bandeja tiene tamaño máximo. Al llenarse aplicamos la política de desborde:
+      DESCARTAR_ANTIGUA (tiramos la carta más vieja) o DESCARTAR_NUEVA (rechazamos la nueva).
+    """
+
+    def __init__(self, webhook_url: str, capacidad: int = 100, politica_desborde: str = "DESCARTAR_ANTIGUA",
+                 ventana_agrupado: float = 2.0, ventana_duplicados: float = 60.0,
+                 timeout: float = 10.0, max_reintentos: int = 5):
+        self.webhook_url = webhook_url
+        self.capacidad = capacidad
+        self.politica_desborde = politica_desborde
+        self.ventana_agrupado = ventana_agrupado  # Segundos que esperamos para juntar una ráfaga.
+        self.ventana_duplicados = ventana_duplicados  # Segundos en los que una carta repetida se ignora.
+        self.timeout = timeout  # Segundos máximos por envío.
+        self.max_reintentos = max_reintentos
+
+        self._bandeja = deque()
+        self._hay_cartas = asyncio.Event()
+        self._vistos = {}  # mensaje -> momento en que lo encolamos por última vez.
+        self._tarea = None
+        self._sesion = None
+        self._ocupado = False  # True mientras el cartero está entregando un lote.
+
+        self.metricas = {
+            "encolados": 0, "enviados": 0, "resumenes": 0, "duplicados": 0,
+            "desbordes": 0, "reintentos_429": 0, "errores": 0,
+        }
+
+    # --- ENTRADA (SÍNCRONA E INSTANTÁNEA) ---
+
+    def encolar(self, mensaje: str) -> bool:
+        """Deja una carta en la bandeja. Devuelve False si se descartó."""
+        ahora = time.monotonic()
+
+        # 1. ¿La hemos mandado hace poco? Entonces es un duplicado.
+        visto = self._vistos.get(mensaje)
+        if visto is not None and ahora - visto < self.ventana_duplicados:
+            self.metricas["duplicados"] += 1
+            return False
+
+        # 2. ¿Bandeja llena? Política de desborde explícita.
+        if len(self._bandeja) >= self.capacidad:
+            self.metricas["desbordes"] += 1
+            if self.politica_desborde == "DESCARTAR_NUEVA":
+                return False  # No la apuntamos como vista: si vuelve a llegar, tiene otra oportunidad.
+            # La tirada nunca se llegó a mandar: la olvidamos para que pueda volver a entrar.
+            self._vistos.pop(self._bandeja.popleft(), None)
+
+        # 3. Solo lo que entra de verdad en la bandeja cuenta como visto.
+        self._vistos[mensaje] = ahora
+        if len(self._vistos) > self.capacidad * 10:
+            # Limpiamos recuerdos viejos para que no crezca sin fin.
+            self._vistos = {m: t for m, t in self._vistos.items() if ahora - t < self.ventana_duplicados}
+        self._bandeja.append(mensaje)
+        self.metricas["encolados"] += 1
+        self._hay_cartas.set()
+        return True
+
+    # --- CICLO DE VIDA ---
+
+    def iniciar(self):
+        """Arranca al cartero en segundo plano (hay que llamarlo dentro del bucle asíncrono)."""
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._drenar())
+
+    async def detener(self, espera_maxima: float = 10.0):
+        """Intenta entregar lo que queda en la bandeja y cierra la sesión."""
+        if self._tarea is not None:
+            # Sin ventana de agrupado: queremos salir cuanto antes.
+            self.ventana_agrupado = 0
+            inicio = time.monotonic()
+            while (self._bandeja or self._ocupado) and time.monotonic() - inicio < espera_maxima:
+                await asyncio.sleep(0.05)
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        if self._sesion is not None:
+            await self._sesion.close()
+            self._sesion = None
+
+    # --- SALIDA (SEGUNDO PLANO) ---
+
+    async def _drenar(self):
+        """Bucle del cartero: espera cartas, junta la ráfaga y la manda como resumen."""
+        while True:
+            await self._hay_cartas.wait()
+            # Esperamos un poco para que la ráfaga termine de llegar.
+            if self.ventana_agrupado:
+                await asyncio.sleep(self.ventana_agrupado)
+
+            lote = []
+            while self._bandeja:
+                lote.append(self._bandeja.popleft())
+            self._hay_cartas.clear()
+            if not lote:
+                continue
+
+            self._ocupado = True
+            try:
+                if len(lote) > 1:
+                    self.metricas["resumenes"] += 1
+                for trozo in self._componer_resumen(lote):
+                    await self._entregar(trozo)
+            finally:
+                self._ocupado = False
+
+    def _componer_resumen(self, lote: list) -> list:
+        """Junta varias cartas en uno o más mensajes de menos de 2000 caracteres."""
+        if len(lote) == 1:
+            return [lote[0][:LIMITE_DISCORD]]
+        trozos, actual = [], f"🗞️ **RESUMEN ({len(lote)} avisos)**"
+        for mensaje in lote:
+            linea = f"\n• {mensaje}"[:LIMITE_DISCORD]
+            if len(actual) + len(linea) > LIMITE_DISCORD:
+                trozos.append(actual)
+                actual = linea.lstrip("\n")
+            else:
+                actual += linea
+        trozos.append(actual)
+        return trozos
+
+    async def _entregar(self, contenido: str):
+        """Manda un mensaje por la sesión compartida, respetando los 429 de Discord."""
+        # Importamos aquí para que los scripts síncronos no necesiten aiohttp.
+        import aiohttp
+        if self._sesion is None or self._sesion.closed:
+            self._sesion = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+        for intento in range(self.max_reintentos):
+            try:
+                async with self._sesion.post(self.webhook_url, json={"content": contenido}) as respuesta:
+                    if 200 <= respuesta.status < 300:
+                        self.metricas["enviados"] += 1
+                        return
+                    if respuesta.status == 429:
+                        # Discord nos dice cuántos segundos esperar.
+                        self.metricas["reintentos_429"] += 1
+                        espera = await self._leer_retry_after(respuesta)
+                        await asyncio.sleep(espera)
+                        continue
+                    if respuesta.status < 500:
+                        # Error nuestro (4xx): reintentar no arregla nada.
+                        print(f"⚠️ Discord recibió el mensaje pero se quejó: {respuesta.status}")
+                        self.metricas["errores"] += 1
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"❌ Error enviando mensaje (pero sigo trabajando): {e}")
+            # Error de red o 5xx: esperamos cada vez más.
+            await asyncio.sleep(min(30, 2 ** intento))
+
+        self.metricas["errores"] += 1
+        print("❌ Discord no contesta. Mensaje descartado tras varios intentos.")
+
+    @staticmethod
+    async def _leer_retry_after(respuesta) -> float:
+        """Lee el tiempo de espera del 429 (cuerpo JSON o cabecera Retry-After)."""
+        try:
+            datos = await respuesta.json(content_type=None)
+            return max(0.0, float(datos["retry_after"]))
+        except Exception:
+            pass
+        try:
+            return max(0.0, float(respuesta.headers.get("Retry-After", 1)))
+        except ValueError:
+            return 1.0
+
+
 class Comunicador:
     def __init__(self):
         """
@@ -17,6 +200,23 @@ class Comunicador:
         """
         # Buscamos la variable DISCORD_WEBHOOK_URL en el archivo secreto.
         self.webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+        self.despachador = None  # El cartero asíncrono (solo dentro del bucle principal).
+
+    def iniciar_despachador(self, **opciones):
+        """
+        Activa el cartero en segundo plano. A partir de aquí 'enviar_alerta' no bloquea nunca.
+        Hay que llamarlo desde dentro del bucle asíncrono.
+        """
+        if self.webhook_url and self.despachador is None:
+            self.despachador = DespachadorAlertas(self.webhook_url, **opciones)
+            self.despachador.iniciar()
+
+    async def detener_despachador(self):
+        """Entrega lo pendiente y apaga el cartero."""
+        if self.despachador is not None:
+            await self.despachador.detener()
+            print(f"📊 Cartero: {self.despachador.metricas}")
+            self.despachador = None
 
     def enviar_alerta(self, mensaje: str):
         """
@@ -28,6 +228,11 @@ class Comunicador:
             print("⚠️ AVISO: No puedo hablar. Falta DISCORD_WEBHOOK_URL en el archivo .env")
             return  # ...no hacemos nada más.
 
+        # Si el cartero asíncrono está activo, dejamos la carta en la bandeja y seguimos.
+        if self.despachador is not None:
+            self.despachador.encolar(mensaje)
+            return
+
         # Preparamos el paquete de datos (JSON) que Discord entiende.
         datos = {
             "content": mensaje  # Aquí va el texto que queremos enviar.
@@ -35,7 +240,9 @@ class Comunicador:
 
         try:
             # Le damos la carta al cartero (POST) para que la lleve a Discord.
-            respuesta = requests.post(self.webhook_url, json=datos)
+            # (Lo importamos aquí: con el cartero asíncrono activo nunca hace falta cargarlo.)
+            import requests
+            respuesta = requests.post(self.webhook_url, json=datos, timeout=10)
             
             # Si Discord responde con un código 2xx, todo fue bien.
             if respuesta.status_code >= 200 and respuesta.status_code < 300:
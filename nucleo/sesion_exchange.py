@@ -0,0 +1,234 @@
+# nucleo/sesion_exchange.py
+# 🔌 LA CENTRALITA DEL EXCHANGE (CONEXIÓN COMPARTIDA)
+# Antes cada nodo abría un teléfono nuevo con Bitget, preguntaba una cosa y colgaba.
+# Así perdíamos la conexión TLS y la lista de mercados en cada vuelta.
+# Ahora hay UNA centralita por proceso: todos los agentes (y el laboratorio) llaman por la misma línea,
+# la conexión se mantiene viva y la lista de mercados se guarda en disco con fecha de caducidad.
+
+import os  # Para la carpeta de caché.
+import json  # Para guardar los mercados en disco.
+import ssl  # Para el candado de seguridad (TLS) de la conexión.
+import time  # Para medir latencias y caducidades.
+import asyncio  # Para saber en qué bucle vivimos.
+
+import aiohttp  # El cable de internet asíncrono que usa CCXT por debajo.
+import certifi  # Certificados de confianza (los mismos que usa CCXT).
+import ccxt.async_support as ccxt  # El libro de idiomas de los exchanges (versión asíncrona).
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+
+class RegistroExchanges:
+    """
+    Centralita de exchanges asíncronos compartida por todo el proceso.
+    - Un cliente CCXT por exchange, creado una sola vez.
+    - Sesión HTTP propia con keep-alive largo para reutilizar conexiones TLS.
+    - 'load_markets' cacheado en disco con TTL.
+    - Contadores de reutilización y latencia por método.
+    """
+
+    def __init__(self, carpeta_cache: str = None, ttl_mercados: float = None, keepalive: float = None):
+        self.carpeta_cache = carpeta_cache or config.CARPETA_CACHE
+        self.ttl_mercados = config.TTL_MERCADOS if ttl_mercados is None else ttl_mercados
+        self.keepalive = config.KEEPALIVE_EXCHANGE if keepalive is None else keepalive
+
+        self._exchanges = {}  # exchange_id -> cliente CCXT.
+        self._sesion = None  # Sesión HTTP compartida.
+        self._bucle = None  # Bucle asíncrono al que pertenece la sesión.
+        self._candado = None  # Para que dos nodos no creen el mismo cliente a la vez.
+
+        self.contadores = {
+            "clientes_creados": 0,
+            "clientes_reutilizados": 0,
+            "conexiones_nuevas": 0,
+            "conexiones_reutilizadas": 0,
+            "mercados_desde_cache": 0,
+            "mercados_descargados": 0,
+        }
+        self.latencias = {}  # metodo -> {"llamadas", "total_ms", "max_ms", "errores"}
+
+    # --- CONEXIÓN ---
+
+    def _crear_sesion(self) -> aiohttp.ClientSession:
+        """Crea la sesión HTTP compartida con keep-alive y espías de reutilización."""
+        espia = aiohttp.TraceConfig()
+
+        async def _conexion_nueva(sesion, contexto, parametros):
+            self.contadores["conexiones_nuevas"] += 1
+
+        async def _conexion_reutilizada(sesion, contexto, parametros):
+            self.contadores["conexiones_reutilizadas"] += 1
+
+        espia.on_connection_create_end.append(_conexion_nueva)
+        espia.on_connection_reuseconn.append(_conexion_reutilizada)
+
+        conector = aiohttp.TCPConnector(
+            ssl=ssl.create_default_context(cafile=certifi.where()),
+            keepalive_timeout=self.keepalive,  # Mantenemos la línea abierta entre vueltas.
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(connector=conector, trace_configs=[espia])
+
+    async def _soltar_bucle_viejo(self):
+        """Cierra los clientes y la sesión que se abrieron en un bucle anterior."""
+        exchanges, sesion = self._exchanges, self._sesion
+        self._exchanges = {}
+        self._sesion = None
+        sueltas = 0
+        for exchange in exchanges.values():
+            try:
+                await exchange.close()
+            except Exception:
+                sueltas += 1
+        if sesion is not None and not sesion.closed:
+            try:
+                await sesion.close()
+            except Exception:
+                # Sus conexiones eran del bucle viejo (ya cerrado): no se pueden colgar desde aquí.
+                sesion.detach()
+                sueltas += 1
+        if exchanges or sesion is not None:
+            print(f"🔌 Centralita: Bucle nuevo. Cerradas {len(exchanges)} líneas del bucle anterior"
+                  f"{f' ({sueltas} soltadas sin cerrar)' if sueltas else ''}.")
+
+    async def obtener(self, exchange_id: str = None):
+        """Devuelve el cliente compartido del exchange (lo crea y carga mercados la primera vez)."""
+        exchange_id = exchange_id or config.EXCHANGE_ID
+        bucle = asyncio.get_running_loop()
+
+        # Si nos llaman desde otro bucle (p. ej. un asyncio.run nuevo), lo viejo ya no sirve:
+        # lo cerramos (o, si ya no se puede, lo soltamos avisando) antes de abrir líneas nuevas.
+        if self._bucle is not bucle:
+            if self._bucle is not None:
+                await self._soltar_bucle_viejo()
+            self._bucle = bucle
+            self._candado = asyncio.Lock()
+
+        exchange = self._exchanges.get(exchange_id)
+        if exchange is not None:
+            self.contadores["clientes_reutilizados"] += 1
+            return exchange
+
+        async with self._candado:
+            if exchange_id in self._exchanges:
+                self.contadores["clientes_reutilizados"] += 1
+                return self._exchanges[exchange_id]
+
+            if self._sesion is None or self._sesion.closed:
+                self._sesion = self._crear_sesion()
+
+            # Al pasarle nuestra sesión, CCXT no la cierra: la controla la centralita.
+            exchange = getattr(ccxt, exchange_id)({"enableRateLimit": True, "session": self._sesion})
+            try:
+                await self._cargar_mercados(exchange)
+            except Exception:
+                await exchange.close()  # No dejamos clientes a medio crear colgados.
+                raise
+            self._exchanges[exchange_id] = exchange
+            self.contadores["clientes_creados"] += 1
+            print(f"🔌 Centralita: Línea abierta con {exchange_id} (se reutilizará en cada vuelta).")
+            return exchange
+
+    # --- MERCADOS EN CACHÉ ---
+
+    def _ruta_mercados(self, exchange_id: str) -> str:
+        return os.path.join(self.carpeta_cache, f"mercados_{exchange_id}.json")
+
+    async def _cargar_mercados(self, exchange):
+        """Carga los mercados desde disco si están frescos; si no, los descarga y los guarda."""
+        ruta = self._ruta_mercados(exchange.id)
+        try:
+            if time.time() - os.path.getmtime(ruta) < self.ttl_mercados:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    guardado = json.load(f)
+                exchange.set_markets(guardado["markets"], guardado.get("currencies"))
+                self.contadores["mercados_desde_cache"] += 1
+                return
+        except (OSError, ValueError, KeyError):
+            pass  # No hay caché (o está rota): descargamos.
+
+        await self._medir("load_markets", exchange.load_markets)
+        self.contadores["mercados_descargados"] += 1
+        try:
+            os.makedirs(self.carpeta_cache, exist_ok=True)
+            temporal = ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"markets": exchange.markets, "currencies": exchange.currencies}, f, default=str)
+            os.replace(temporal, ruta)
+        except (OSError, TypeError) as e:
+            print(f"🔌 Centralita: No pude guardar la caché de mercados ({e}).")
+
+    # --- LLAMADAS MEDIDAS ---
+
+    async def _medir(self, nombre: str, funcion, *args, **kwargs):
+        """Ejecuta una llamada al exchange y apunta cuánto ha tardado."""
+        estadistica = self.latencias.setdefault(nombre, {"llamadas": 0, "total_ms": 0.0, "max_ms": 0.0, "errores": 0})
+        inicio = time.perf_counter()
+        try:
+            return await funcion(*args, **kwargs)
+        except Exception:
+            estadistica["errores"] += 1
+            raise
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            estadistica["llamadas"] += 1
+            estadistica["total_ms"] += duracion_ms
+            estadistica["max_ms"] = max(estadistica["max_ms"], duracion_ms)
+
+    async def llamar(self, metodo: str, *args, exchange_id: str = None, **kwargs):
+        """
+        Llama a un método CCXT por la línea compartida, midiendo la latencia.
+        Ejemplo: await REGISTRO_EXCHANGES.llamar("fetch_ticker", "SOL/USDT")
+        """
+        exchange = await self.obtener(exchange_id)
+        return await self._medir(metodo, getattr(exchange, metodo), *args, **kwargs)
+
+    # --- APAGADO Y MÉTRICAS ---
+
+    async def cerrar_todos(self):
+        """Cuelga todas las líneas de forma ordenada (llamar al apagar el proceso)."""
+        for exchange in self._exchanges.values():
+            try:
+                await exchange.close()
+            except Exception:
+                pass
+        self._exchanges = {}
+        if self._sesion is not None and not self._sesion.closed:
+            await self._sesion.close()
+        self._sesion = None
+
+    def metricas(self) -> dict:
+        """Resumen de reutilización de conexiones y latencia media por método."""
+        latencias = {}
+        for metodo, e in self.latencias.items():
+            latencias[metodo] = {
+                "llamadas": e["llamadas"],
+                "errores": e["errores"],
+                "media_ms": e["total_ms"] / e["llamadas"] if e["llamadas"] else 0.0,
+                "max_ms": e["max_ms"],
+            }
+        return {**self.contadores, "latencias": latencias}
+
+
+# La centralita única del proceso: todos los agentes la comparten.
+REGISTRO_EXCHANGES = RegistroExchanges()
+
+
+# Prueba rápida: varias llamadas seguidas deben reutilizar la misma conexión.
+if __name__ == "__main__":
+    async def _prueba():
+        try:
+            for _ in range(3):
+                ticker = await REGISTRO_EXCHANGES.llamar("fetch_ticker", config.SYMBOL)
+                print(f"💹 {config.SYMBOL}: {ticker['last']}")
+        finally:
+            await REGISTRO_EXCHANGES.cerrar_todos()
+        print(f"📊 Métricas: {REGISTRO_EXCHANGES.metricas()}")
+
+    asyncio.run(_prueba())
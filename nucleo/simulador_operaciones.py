@@ -0,0 +1,204 @@
+# nucleo/simulador_operaciones.py
+# ⚔️ EL SIMULADOR DE OPERACIONES (STOP, OBJETIVO, COMISIONES Y APALANCAMIENTO)
+# El simulador simple del Laboratorio da por hecho que compramos y vendemos en la vela siguiente,
+# gratis y sin apalancamiento. En la vida real cada operación vive hasta que pasa algo:
+# salta el stop (2 ATR, lo que dice el Gestor de Riesgo), llega al objetivo, la estrategia
+# manda salir (exit_long) o se acaba el tiempo. Y el exchange cobra por entrar y por salir.
+# Aquí buscamos la primera salida de TODAS las operaciones a la vez con matrices
+# (operaciones x velas siguientes), sin recorrer las velas una a una en Python.
+
+import numpy as np  # Matemáticas rápidas.
+import pandas as pd  # La tabla mágica (para el informe de operaciones).
+
+from nucleo.gestor_riesgo import QuantEngine  # El que sabe dónde poner el stop.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+# Motivos de salida (en orden de prioridad si pasan varios en la misma vela).
+MOTIVOS = np.array(["STOP", "OBJETIVO", "SENAL", "TIEMPO"])
+
+
+class SimuladorOperaciones:
+    """
+    Backtest con salidas de verdad para señales de compra (largos).
+    Entramos al cierre de la vela con señal y salimos con la primera de:
+    - STOP: el mínimo toca el stop técnico (QuantEngine.calcular_stop_loss_tecnico).
+    - OBJETIVO: el máximo toca el take profit (ratio_objetivo x distancia del stop).
+    - SENAL: la estrategia marca exit_long (salimos al cierre).
+    - TIEMPO: pasan max_velas sin nada de lo anterior (o se acaba la historia).
+    Si stop y objetivo caen en la misma vela, suponemos lo peor: el stop.
+    """
+
+    def __init__(self, apalancamiento: float = None, comision_taker: float = None, deslizamiento: float = None,
+                 ratio_objetivo: float = None, max_velas: int = None, max_celdas: int = 2 ** 24):
+        self.apalancamiento = config.LEVERAGE if apalancamiento is None else apalancamiento
+        self.comision_taker = config.COMISION_TAKER if comision_taker is None else comision_taker
+        self.deslizamiento = config.DESLIZAMIENTO if deslizamiento is None else deslizamiento
+        self.ratio_objetivo = ratio_objetivo or config.RATIO_OBJETIVO
+        self.max_velas = max_velas or config.MAX_VELAS_OPERACION
+        self.max_celdas = max_celdas  # Tamaño máximo de cada matriz (operaciones x velas) en memoria.
+        self.quant = QuantEngine()
+
+    def _primeras_salidas(self, entradas, stops, objetivos, apertura, maximo, minimo, cierre, salida_senal):
+        """
+        Para cada entrada, busca la vela y el motivo de su primera salida.
+        Se hace por lotes de entradas: matriz (lote x max_velas) de índices de velas siguientes.
+        """
+        n = len(cierre)
+        total = len(entradas)
+        velas_salida = np.empty(total, dtype=np.int64)
+        motivos = np.empty(total, dtype=np.int64)
+        precios = np.empty(total)
+        pasos = np.arange(1, self.max_velas + 1)
+        lote = max(1, self.max_celdas // self.max_velas)
+
+        for a in range(0, total, lote):
+            e = entradas[a:a + lote]
+            stop = stops[a:a + lote, None]
+            objetivo = objetivos[a:a + lote, None]
+
+            indices = e[:, None] + pasos[None, :]
+            dentro = indices < n  # Las velas que ya no existen no cuentan.
+            indices = np.minimum(indices, n - 1)
+
+            toca_stop = (minimo[indices] <= stop) & dentro
+            toca_objetivo = (maximo[indices] >= objetivo) & dentro
+            manda_salir = salida_senal[indices] & dentro
+            # Matriz de motivos: la primera columna con algo es la salida.
+            hay_salida = toca_stop | toca_objetivo | manda_salir
+            paso = np.where(hay_salida.any(axis=1), hay_salida.argmax(axis=1), -1)
+
+            # Sin salida: cerramos por tiempo en la última vela disponible.
+            ultima = np.minimum(e + self.max_velas, n - 1)
+            sin_salida = paso < 0
+            paso = np.where(sin_salida, 0, paso)
+            fila = np.arange(len(e))
+            vela = np.where(sin_salida, ultima, indices[fila, paso])
+
+            stop_aqui = toca_stop[fila, paso] & ~sin_salida
+            objetivo_aqui = toca_objetivo[fila, paso] & ~sin_salida & ~stop_aqui
+            senal_aqui = ~sin_salida & ~stop_aqui & ~objetivo_aqui
+            motivo = np.select([stop_aqui, objetivo_aqui, senal_aqui], [0, 1, 2], default=3)
+
+            # Precio de salida: si la vela abre ya más allá del stop/objetivo, nos llenan en la apertura.
+            precio = np.select(
+                [stop_aqui, objetivo_aqui],
+                [np.minimum(apertura[vela], stop[:, 0]), np.maximum(apertura[vela], objetivo[:, 0])],
+                default=cierre[vela],
+            )
+
+            velas_salida[a:a + lote] = vela
+            motivos[a:a + lote] = motivo
+            precios[a:a + lote] = precio
+        return velas_salida, motivos, precios
+
+    def simular(self, apertura, maximo, minimo, cierre, atr, entrada_senal, salida_senal=None,
+                solapar: bool = False) -> pd.DataFrame:
+        """
+        Simula todas las operaciones y devuelve una fila por operación con su PnL neto.
+        Con solapar=False (lo normal) no se abre una operación nueva hasta cerrar la anterior.
+        Los PnL están en fracción del margen puesto (0.10 = +10% de lo apostado).
+        """
+        apertura, maximo, minimo, cierre, atr = (np.asarray(x, dtype=np.float64)
+                                                 for x in (apertura, maximo, minimo, cierre, atr))
+        n = len(cierre)
+        entrada_senal = np.asarray(entrada_senal).astype(bool)
+        salida_senal = np.zeros(n, dtype=bool) if salida_senal is None else np.asarray(salida_senal).astype(bool)
+
+        # Solo entramos donde hay ATR (sin volatilidad no sabemos dónde poner el stop).
+        entradas = np.flatnonzero(entrada_senal & (atr > 0) & (np.arange(n) < n - 1))
+        precio_senal = cierre[entradas]
+        stops = self.quant.calcular_stop_loss_tecnico(precio_senal, atr[entradas])  # Funciona con arrays.
+        objetivos = precio_senal + (precio_senal - stops) * self.ratio_objetivo
+
+        # 1. Primera salida de CADA posible entrada (todas a la vez).
+        velas_salida, motivos, precios_salida = self._primeras_salidas(
+            entradas, stops, objetivos, apertura, maximo, minimo, cierre, salida_senal)
+
+        # 2. Sin solapar: cada operación salta a la primera señal posterior a su salida.
+        #    Solo se recorren operaciones (no velas), y el salto se calcula de golpe con searchsorted.
+        if not solapar and len(entradas):
+            siguiente = np.searchsorted(entradas, velas_salida, side="right")
+            elegidas = []
+            i = 0
+            while i < len(entradas):
+                elegidas.append(i)
+                i = siguiente[i]
+            elegidas = np.asarray(elegidas, dtype=np.int64)
+            entradas, stops, objetivos = entradas[elegidas], stops[elegidas], objetivos[elegidas]
+            velas_salida, motivos, precios_salida = velas_salida[elegidas], motivos[elegidas], precios_salida[elegidas]
+
+        # 3. Dinero: deslizamiento en contra al entrar y al salir, comisión taker por lado sobre el nocional.
+        precio_entrada = cierre[entradas] * (1 + self.deslizamiento)
+        precio_salida = precios_salida * (1 - self.deslizamiento)
+        movimiento = precio_salida / precio_entrada - 1
+        pnl_bruto = movimiento * self.apalancamiento
+        comisiones = self.comision_taker * self.apalancamiento * (1 + precio_salida / precio_entrada)
+        pnl_neto = np.maximum(pnl_bruto - comisiones, -1.0)  # Como mucho perdemos el margen (liquidación).
+
+        return pd.DataFrame({
+            "vela_entrada": entradas,
+            "vela_salida": velas_salida,
+            "velas": velas_salida - entradas,
+            "precio_entrada": precio_entrada,
+            "precio_salida": precio_salida,
+            "stop": stops,
+            "objetivo": objetivos,
+            "motivo": MOTIVOS[motivos],
+            "pnl_bruto": pnl_bruto,
+            "comisiones": comisiones,
+            "pnl_neto": pnl_neto,
+        })
+
+    def simular_df(self, df: pd.DataFrame, solapar: bool = False) -> pd.DataFrame:
+        """Atajo para tablas con señales de Volman (ATR, enter_long, exit_long)."""
+        salida = df["exit_long"] if "exit_long" in df.columns else None
+        return self.simular(df["open"], df["high"], df["low"], df["close"], df["ATR"],
+                            df["enter_long"], salida, solapar=solapar)
+
+    @staticmethod
+    def resumen(operaciones: pd.DataFrame, monto: float = None) -> dict:
+        """Números clave de una lista de operaciones (PnL en USD apostando 'monto' cada vez)."""
+        monto = config.MONTO_APUESTA if monto is None else monto
+        pnl = operaciones["pnl_neto"].to_numpy()
+        ganadas = pnl[pnl > 0]
+        perdidas = pnl[pnl <= 0]
+        return {
+            "operaciones": int(len(pnl)),
+            "acierto": float(len(ganadas) / len(pnl)) if len(pnl) else 0.0,
+            "pnl_medio": float(pnl.mean()) if len(pnl) else 0.0,
+            "ratio_ganancia_perdida": float(ganadas.mean() / -perdidas.mean()) if len(ganadas) and len(perdidas) and perdidas.mean() < 0 else 0.0,
+            "pnl_usd": float(pnl.sum() * monto),
+            "comisiones_usd": float(operaciones["comisiones"].sum() * monto),
+            "salidas": operaciones["motivo"].value_counts().to_dict(),
+        }
+
+
+# Banco de pruebas: un millón de velas con señales aleatorias.
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(3)
+    n = 1_000_000
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = np.concatenate([[cierres[0]], cierres[:-1]])
+    maximos = np.maximum(aperturas, cierres) * (1 + rng.uniform(0, 0.002, n))
+    minimos = np.minimum(aperturas, cierres) * (1 - rng.uniform(0, 0.002, n))
+    atr = pd.Series(maximos - minimos).ewm(alpha=1 / 14, adjust=False).mean().to_numpy()
+    entradas = rng.random(n) < 0.02
+    salidas = rng.random(n) < 0.01
+
+    simulador = SimuladorOperaciones()
+    inicio = time.perf_counter()
+    operaciones = simulador.simular(aperturas, maximos, minimos, cierres, atr, entradas, salidas)
+    duracion = time.perf_counter() - inicio
+    print(f"⚔️ {n:,} velas, {entradas.sum():,} señales -> {len(operaciones):,} operaciones en {duracion:.2f}s "
+          f"({n / duracion:,.0f} velas/s)")
+    print(f"   {SimuladorOperaciones.resumen(operaciones)}")
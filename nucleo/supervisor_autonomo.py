@@ -2,124 +2,433 @@
 # 🛡️ EL ESCUDO ANTI-HACKERS (SUPERVISOR DE CONTRATOS MEJORADO)
 # Este archivo es el policía del robot.
 # Se conecta a la cadena de bloques y busca trampas en los contratos antes de comprar.
+#
+# Antes cada auditoría eran varias idas y vueltas al nodo (¿conectado?, código, approve)
+# y el mismo token se volvía a auditar cada 10 segundos. Ahora:
+# - Las preguntas que hacen falta viajan JUNTAS en un lote JSON-RPC (una sola petición HTTP)
+#   por una sesión con conexiones reutilizables.
+# - Los informes se guardan en caché con la clave (cadena, token, hash del código): si el código
+#   del contrato cambia (proxy actualizado, redespliegue), el informe viejo deja de valer.
+# - Antes de fiarse de la simulación, el bytecode pasa por el microscopio (analisis_bytecode):
+#   listas negras, comisiones modificables, SELFDESTRUCT, proxies... Si el código ya condena
+#   al token, se rechaza sin más llamadas al nodo.
 
-from web3 import Web3  # Usamos la herramienta para hablar con la blockchain.
 import os  # Para leer las variables de entorno.
+import time  # Para caducidades y latencias.
+import threading  # La caché se comparte entre hilos.
+from web3 import Web3  # Solo para validar direcciones y calcular hashes (keccak).
 from dotenv import load_dotenv  # Para cargar las claves secretas.
 
+from nucleo.analisis_bytecode import AnalizadorBytecode  # Trampas que se ven en el propio código.
+
+# Importamos la configuración (con truco por si probamos este archivo suelto).
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
 # Cargamos el archivo .env por si acaso.
 load_dotenv()
 
+# Usamos una dirección muerta para probar como remitente.
+DIRECCION_MUERTA = "0x000000000000000000000000000000000000dEaD"
+# Usamos el router de Uniswap V2 como ejemplo de destino seguro.
+ROUTER_SEGURO = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
+# approve(address,uint256): los 4 primeros bytes del keccak de la firma.
+SELECTOR_APPROVE = "0x095ea7b3"
+CANTIDAD_PRUEBA = 1_000_000 * 10 ** 18  # Un millón de tokens (con 18 decimales).
+
+# Una sesión HTTP por nodo para todo el proceso (las conexiones se reutilizan).
+_SESIONES = {}
+_CANDADO_SESIONES = threading.Lock()
+
+
+def sesion_rpc(url: str):
+    """Sesión de 'requests' compartida para este nodo, con su propio grupo de conexiones."""
+    with _CANDADO_SESIONES:
+        if url not in _SESIONES:
+            import requests  # Solo se carga si de verdad hablamos con un nodo.
+            from requests.adapters import HTTPAdapter
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=config.RPC_CONEXIONES)
+            sesion.mount("http://", adaptador)
+            sesion.mount("https://", adaptador)
+            _SESIONES[url] = sesion
+        return _SESIONES[url]
+
+
+class ErrorRPC(Exception):
+    """El nodo no contesta o contesta algo que no es JSON-RPC."""
+
+
+def cuerpo_lote(llamadas: list) -> list:
+    """[(metodo, params), ...] -> el cuerpo JSON-RPC del lote (ids = posición)."""
+    return [{"jsonrpc": "2.0", "id": i, "method": metodo, "params": params}
+            for i, (metodo, params) in enumerate(llamadas)]
+
+
+def leer_lote(datos, n: int) -> list:
+    """Respuesta del nodo -> [(resultado, error), ...] en el orden del lote. ErrorRPC si no es un lote."""
+    if not isinstance(datos, list):
+        # Algunos nodos no aceptan lotes y devuelven un único error.
+        raise ErrorRPC(f"Respuesta que no es un lote: {datos}")
+    por_id = {d.get("id"): d for d in datos if isinstance(d, dict)}
+    sin_respuesta = {"message": "El nodo no devolvió esta llamada"}
+    return [(por_id.get(i, {}).get("result"), por_id[i].get("error") if i in por_id else sin_respuesta)
+            for i in range(n)]
+
+
+def percentil(valores_ordenados: list, p: float) -> float:
+    """Percentil p (0-100) de una lista YA ordenada (el valor más cercano por arriba)."""
+    if not valores_ordenados:
+        return 0.0
+    posicion = min(len(valores_ordenados) - 1, max(0, int(-(-p * len(valores_ordenados) // 100)) - 1))
+    return valores_ordenados[posicion]
+
+
+class ClienteRPC:
+    """JSON-RPC mínimo con lotes: varias llamadas, una sola petición HTTP."""
+
+    def __init__(self, url: str, timeout: float = None):
+        self.url = url
+        self.timeout = timeout or config.RPC_TIMEOUT
+        self.sesion = sesion_rpc(url)
+        self.llamadas = 0    # Llamadas JSON-RPC enviadas (lo que cuenta el proveedor).
+        self.peticiones = 0  # Peticiones HTTP (idas y vueltas de red).
+
+    def lote(self, llamadas: list) -> list:
+        """
+        llamadas = [(metodo, params), ...]. Devuelve [(resultado, error), ...] en el mismo orden.
+        Lanza ErrorRPC si falla el transporte (el lote entero se pierde).
+        """
+        cuerpo = cuerpo_lote(llamadas)
+        self.llamadas += len(cuerpo)
+        self.peticiones += 1
+        try:
+            respuesta = self.sesion.post(self.url, json=cuerpo, timeout=self.timeout)
+            respuesta.raise_for_status()
+            datos = respuesta.json()
+        except Exception as e:
+            raise ErrorRPC(f"{type(e).__name__}: {e}") from e
+        return leer_lote(datos, len(cuerpo))
+
+
+class CacheAuditorias:
+    """
+    Informes por (cadena, token, hash del código), con caducidad.
+    Además recuerda el último hash visto de cada token: mientras sea reciente (ttl_codigo),
+    ni siquiera hace falta volver a pedir el código al nodo.
+    """
+
+    def __init__(self, ttl_informe: float = None, ttl_codigo: float = None, reloj=time.monotonic):
+        self.ttl_informe = config.AUDITOR_TTL_INFORME if ttl_informe is None else ttl_informe
+        self.ttl_codigo = config.AUDITOR_TTL_CODIGO if ttl_codigo is None else ttl_codigo
+        self.reloj = reloj
+        self._informes = {}  # (cadena, token, hash) -> (informe, caduca_en)
+        self._codigos = {}   # (cadena, token) -> (hash, comprobado_en)
+        self._candado = threading.Lock()
+
+    def hash_reciente(self, cadena, token):
+        """El hash del código si lo comprobamos hace menos de ttl_codigo; si no, None."""
+        with self._candado:
+            visto = self._codigos.get((cadena, token))
+            if visto and self.reloj() - visto[1] < self.ttl_codigo:
+                return visto[0]
+            return None
+
+    def ultimo_hash(self, cadena, token):
+        with self._candado:
+            visto = self._codigos.get((cadena, token))
+            return visto[0] if visto else None
+
+    def informe(self, cadena, token, hash_codigo):
+        """El informe guardado para ESTE código, o None si no hay o ha caducado."""
+        with self._candado:
+            guardado = self._informes.get((cadena, token, hash_codigo))
+            if guardado is None:
+                return None
+            if self.reloj() >= guardado[1]:
+                del self._informes[(cadena, token, hash_codigo)]
+                return None
+            return guardado[0]
+
+    def codigo_visto(self, cadena, token, hash_codigo):
+        """Apunta que el código del token es este. Si ha cambiado, los informes del código viejo se borran."""
+        with self._candado:
+            anterior = self._codigos.get((cadena, token))
+            if anterior and anterior[0] != hash_codigo:
+                self._informes.pop((cadena, token, anterior[0]), None)
+            self._codigos[(cadena, token)] = (hash_codigo, self.reloj())
+
+    def guardar(self, cadena, token, hash_codigo, informe: dict):
+        self.codigo_visto(cadena, token, hash_codigo)
+        with self._candado:
+            self._informes[(cadena, token, hash_codigo)] = (informe, self.reloj() + self.ttl_informe)
+
+
 class AuditorEVM:
-    def __init__(self, rpc_url: str = None):
+    def __init__(self, rpc_url: str = None, cache: CacheAuditorias = None, rpc=None,
+                 analizador: AnalizadorBytecode = None):
         """
         Preparamos al policía para trabajar.
         Si no le damos una dirección web, busca una por defecto.
+        'rpc' permite darle otro cliente con el mismo lote() (p. ej. un grupo de nodos).
         """
         # Intentamos usar la URL que nos pasan, o la del archivo secreto, o una pública de Base.
-        self.rpc_url = rpc_url or os.getenv("BASE_RPC_URL", "https://mainnet.base.org")
-        
-        # Conectamos con la blockchain.
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-        
-        # Este es el "molde" mínimo de un token (ABI) para poder hablar con él.
-        # Solo necesitamos saber preguntar el saldo (balanceOf), el total (totalSupply) y aprobar gasto (approve).
-        self.erc20_abi = [
-            {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
-            {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"}
-        ]
-
-    def _simular_transaccion(self, token_address: str, router_address: str) -> bool:
+        self.rpc_url = rpc_url or os.getenv("BASE_RPC_URL", config.RPC_BASE)
+
+        # El cliente JSON-RPC (sesión compartida con los demás auditores del mismo nodo).
+        self.rpc = rpc or ClienteRPC(self.rpc_url)
+        self.cache = cache or CacheAuditorias()
+        self.analizador = analizador or AnalizadorBytecode()  # Su caché va por hash del código.
+        self.cadena = None  # chainId del nodo (se pregunta una vez, dentro del primer lote).
+
+        # Métricas del ciclo actual (se reinician con nuevo_ciclo()).
+        self.metricas = self._metricas_vacias()
+
+    @staticmethod
+    def _metricas_vacias() -> dict:
+        return {"auditorias": 0, "aciertos_cache": 0, "llamadas_rpc": 0, "peticiones_http": 0, "latencias": []}
+
+    def nuevo_ciclo(self) -> dict:
+        """Devuelve el resumen del ciclo que termina y empieza a contar de cero."""
+        resumen = self.estadisticas()
+        self.metricas = self._metricas_vacias()
+        return resumen
+
+    def estadisticas(self) -> dict:
+        latencias = sorted(self.metricas["latencias"])
+        return {
+            "auditorias": self.metricas["auditorias"],
+            "aciertos_cache": self.metricas["aciertos_cache"],
+            "llamadas_rpc": self.metricas["llamadas_rpc"],
+            "peticiones_http": self.metricas["peticiones_http"],
+            "latencia_media_ms": 1000 * sum(latencias) / len(latencias) if latencias else 0.0,
+            "latencia_p50_ms": 1000 * percentil(latencias, 50),
+            "latencia_p99_ms": 1000 * percentil(latencias, 99),
+            "latencia_max_ms": 1000 * latencias[-1] if latencias else 0.0,
+        }
+
+    def _lote(self, llamadas: list) -> list:
+        """Envía un lote y apunta cuántas llamadas y peticiones ha costado."""
+        self.metricas["llamadas_rpc"] += len(llamadas)
+        self.metricas["peticiones_http"] += 1
+        return self.rpc.lote(llamadas)
+
+    @staticmethod
+    def _datos_approve(router: str, cantidad: int) -> str:
+        """Los datos de la llamada approve(router, cantidad) codificados a mano (ABI)."""
+        return SELECTOR_APPROVE + router[2:].lower().rjust(64, "0") + format(cantidad, "x").rjust(64, "0")
+
+    def _llamadas_auditoria(self, token: str, con_codigo: bool = True, con_simulacion: bool = True) -> list:
+        llamadas = []
+        if self.cadena is None:
+            llamadas.append(("eth_chainId", []))
+        if con_codigo:
+            llamadas.append(("eth_getCode", [token, "latest"]))
+        if con_simulacion:
+            # PRUEBA DE FUEGO: Intentamos aprobar al router para gastar tokens (eth_call: sin gastar gas).
+            # Muchos Honeypots fallan aquí para que no puedas vender.
+            llamada = {"from": DIRECCION_MUERTA, "to": token, "data": self._datos_approve(ROUTER_SEGURO, CANTIDAD_PRUEBA)}
+            llamadas.append(("eth_call", [llamada, "latest"]))
+        return llamadas
+
+    def _simular_transaccion(self, resultado, error) -> bool:
         """
-        (PRIVADO) Intenta hacer una operación falsa (sin gastar dinero) para ver si falla.
-        Si falla, es probable que sea un Honeypot (trampa).
+        (PRIVADO) Interpreta la operación falsa (approve simulado).
+        Si falla o no devuelve nada, es probable que sea un Honeypot (trampa).
         """
-        try:
-            # Convertimos las direcciones a formato seguro (Checksum).
-            token = self.w3.to_checksum_address(token_address)
-            router = self.w3.to_checksum_address(router_address)
-            
-            # Usamos una dirección muerta para probar como remitente.
-            sender = self.w3.to_checksum_address("0x000000000000000000000000000000000000dead") 
-
-            # Creamos el objeto contrato para interactuar.
-            contract = self.w3.eth.contract(address=token, abi=self.erc20_abi)
-            
-            # PRUEBA DE FUEGO: Intentamos aprobar al router para gastar tokens.
-            # Muchos Honeypots fallan aquí para que no puedas vender.
-            # Usamos .call() para simular sin gastar gas real.
-            cantidad_infinita = self.w3.to_wei(1000000, 'ether')
-            
-            # Si esto da error, saltará al bloque 'except'.
-            contract.functions.approve(router, cantidad_infinita).call({'from': sender})
-            
-            # Si llegamos aquí sin errores, el contrato responde bien. ¡Es buena señal!
-            return True
-            
-        except Exception as e:
-            # Si da error, asumimos que es una trampa o está roto.
-            print(f"⚠️ Error simulando transacción (Honeypot sospechoso): {e}")
+        if error is not None:
+            print(f"⚠️ Error simulando transacción (Honeypot sospechoso): {error.get('message', error)}")
             return False
+        return bool(resultado) and resultado != "0x"
 
-    def _verificar_liquidez_quemada(self, token_address: str) -> bool:
+    @staticmethod
+    def _verificar_liquidez_quemada(codigo) -> bool:
         """
         (PRIVADO) Comprueba si el creador ha renunciado al contrato o quemado la liquidez.
         (Versión simplificada: solo comprueba si el contrato tiene código).
         """
-        try:
-            address = self.w3.to_checksum_address(token_address)
-            codigo = self.w3.eth.get_code(address)
-            
-            # Si el código está vacío, es una estafa seguro (no existe).
-            if codigo == b'' or codigo == b'0x':
-                return False
-                
-            return True
-        except:
-            return False
+        return bool(codigo) and codigo != "0x"
 
-    def auditar_token(self, token_address: str) -> dict:
-        """
-        MÉTODO PÚBLICO PRINCIPAL.
-        Orquesta todas las comprobaciones de seguridad.
-        Devuelve un informe completo.
-        """
+    @staticmethod
+    def _hash_codigo(codigo) -> str:
+        return Web3.keccak(hexstr=codigo or "0x").hex()
+
+    def _informe(self, codigo, simulacion, analisis: dict = None) -> dict:
+        """Construye el informe a partir del código, su análisis estático y el approve simulado."""
         # Preparamos el informe de auditoría.
         reporte = {
             "es_seguro": False, # Por defecto, decimos que NO es seguro.
             "motivo": "",      # Aquí explicamos por qué.
         }
-        
-        print(f"🛡️ Auditor: Iniciando escaneo de {token_address}...")
-
-        # 1. Comprobamos conexión básica.
-        if not self.w3.is_connected():
-            reporte["motivo"] = "Sin conexión al nodo RPC"
-            return reporte
-            
-        # 2. Validamos la dirección del contrato.
-        if not self.w3.is_address(token_address):
-            reporte["motivo"] = "Dirección de contrato inválida"
+        # Verificamos que el contrato existe (tiene código).
+        if not self._verificar_liquidez_quemada(codigo):
+            reporte["motivo"] = "Contrato fantasma (sin código)"
             return reporte
-
-        # 3. Verificamos que el contrato existe (tiene código).
-        if not self._verificar_liquidez_quemada(token_address):
-             reporte["motivo"] = "Contrato fantasma (sin código)"
-             return reporte
-
-        # 4. SIMULACIÓN DE HONEYPOT (La prueba más importante).
-        # Usamos el router de Uniswap V2 como ejemplo de destino seguro.
-        router_seguro = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D" 
-        
-        es_simulacion_exitosa = self._simular_transaccion(token_address, router_seguro)
-        
-        if not es_simulacion_exitosa:
+        # ANÁLISIS ESTÁTICO: lo que el propio código deja ver (sin preguntar a nadie).
+        if analisis is not None:
+            reporte["rasgos"] = analisis["rasgos"]
+            reporte["riesgo_estatico"] = analisis["riesgo"]
+            if analisis["rechazar"]:
+                reporte["motivo"] = "Bytecode con trampas: " + "; ".join(analisis["detalles"])
+                return reporte
+        # SIMULACIÓN DE HONEYPOT (La prueba más importante).
+        if not self._simular_transaccion(*simulacion):
             reporte["motivo"] = "Fallo crítico en simulación de venta (Posible Honeypot)"
             return reporte
-
         # Si llegamos hasta aquí, ha pasado todas las pruebas básicas.
         reporte["es_seguro"] = True
         reporte["motivo"] = "Auditoría EVM superada: Código válido y simulación exitosa."
-        
         return reporte
+
+    def auditar_token(self, token_address: str) -> dict:
+        """
+        MÉTODO PÚBLICO PRINCIPAL.
+        Orquesta todas las comprobaciones de seguridad.
+        Devuelve un informe completo (más 'desde_cache' y 'hash_codigo').
+        """
+        inicio = time.perf_counter()
+        self.metricas["auditorias"] += 1
+        try:
+            flujo = self._flujo_auditoria(token_address)
+            try:
+                llamadas = next(flujo)
+                while True:
+                    try:
+                        respuestas = self._lote(llamadas)
+                    except ErrorRPC as e:
+                        llamadas = flujo.throw(e)
+                    else:
+                        llamadas = flujo.send(respuestas)
+            except StopIteration as fin:
+                reporte = fin.value
+        finally:
+            self.metricas["latencias"].append(time.perf_counter() - inicio)
+        if reporte.get("desde_cache"):
+            self.metricas["aciertos_cache"] += 1
+        return reporte
+
+    def _flujo_auditoria(self, token_address: str):
+        """
+        Los pasos de la auditoría SIN red: cada 'yield' entrega un lote de llamadas y recibe
+        sus respuestas (o la ErrorRPC del transporte). El informe sale en el 'return'.
+        Así el mismo flujo sirve al auditor síncrono (requests) y al concurrente (aiohttp).
+        """
+        # 1. Validamos la dirección del contrato (sin preguntar a nadie).
+        if not Web3.is_address(token_address):
+            return {"es_seguro": False, "motivo": "Dirección de contrato inválida", "desde_cache": False}
+        token = Web3.to_checksum_address(token_address)
+
+        # 2. ¿Código comprobado hace poco y con informe vigente? Cero llamadas al nodo.
+        if self.cadena is not None:
+            hash_reciente = self.cache.hash_reciente(self.cadena, token)
+            guardado = hash_reciente and self.cache.informe(self.cadena, token, hash_reciente)
+            if guardado:
+                return {**guardado, "desde_cache": True, "hash_codigo": hash_reciente}
+
+        print(f"🛡️ Auditor: Iniciando escaneo de {token}...")
+        try:
+            # 3. Si hay un informe vigente de un código anterior, basta con comprobar que el código sigue igual.
+            ultimo = self.cadena is not None and self.cache.ultimo_hash(self.cadena, token)
+            previo = ultimo and self.cache.informe(self.cadena, token, ultimo)
+            # Lo decidimos ANTES del yield: mientras esperamos, otra auditoría en paralelo puede saberlo ya.
+            pregunta_cadena = self.cadena is None
+            respuestas = yield self._llamadas_auditoria(token, con_simulacion=not previo)
+            if pregunta_cadena:
+                cadena, _ = respuestas.pop(0)
+                self.cadena = int(cadena, 16) if cadena else 0
+            codigo, error_codigo = respuestas.pop(0)
+            if error_codigo is not None:
+                raise ErrorRPC(error_codigo.get("message", error_codigo))
+            hash_codigo = self._hash_codigo(codigo)
+            analisis = self.analizador.analizar(codigo, hash_codigo) if self._verificar_liquidez_quemada(codigo) else None
+
+            if previo and hash_codigo == ultimo:
+                self.cache.codigo_visto(self.cadena, token, hash_codigo)
+                return {**previo, "desde_cache": True, "hash_codigo": hash_codigo}
+            if previo:
+                # El código ha cambiado: toca auditar de nuevo (una ida y vuelta más)...
+                print(f"🛡️ Auditor: ⚠️ El código de {token} ha cambiado. Auditoría invalidada.")
+                if analisis is not None and analisis["rechazar"]:
+                    respuestas = [None]  # ...salvo que el código nuevo ya se condene solo: no hace falta simular.
+                else:
+                    respuestas = yield self._llamadas_auditoria(token, con_codigo=False)
+                    respuestas = respuestas[-1:]  # Solo la simulación (por si el lote llevó también el chainId).
+        except ErrorRPC as e:
+            # Sin conexión no se guarda nada en caché: se reintentará en la próxima vuelta.
+            print(f"🛡️ Auditor: Sin respuesta del nodo ({e}).")
+            return {"es_seguro": False, "motivo": "Sin conexión al nodo RPC", "desde_cache": False}
+
+        reporte = self._informe(codigo, respuestas[0], analisis)
+        self.cache.guardar(self.cadena, token, hash_codigo, reporte)
+        return {**reporte, "desde_cache": False, "hash_codigo": hash_codigo}
+
+
+# Banco de pruebas: un nodo RPC falso en local (con latencia) y 10 ciclos auditando 3 tokens.
+if __name__ == "__main__":
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    LATENCIA_NODO = 0.02  # 20 ms por petición HTTP, como un nodo público cercano.
+    CODIGOS = {
+        "0x4200000000000000000000000000000000000006": "0x6080604052",  # Token normal.
+        "0x1111111111111111111111111111111111111111": "0x6080604053",  # Honeypot: el approve revierte.
+        "0x2222222222222222222222222222222222222222": "0x",            # Fantasma.
+    }
+    HONEYPOTS = {"0x1111111111111111111111111111111111111111"}
+    contador = {"peticiones": 0, "llamadas": 0}
+
+    class _NodoFalso(BaseHTTPRequestHandler):
+        def do_POST(self):
+            lote = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            contador["peticiones"] += 1
+            contador["llamadas"] += len(lote)
+            time.sleep(LATENCIA_NODO)
+            respuestas = []
+            for llamada in lote:
+                metodo, params = llamada["method"], llamada["params"]
+                respuesta = {"jsonrpc": "2.0", "id": llamada["id"]}
+                if metodo == "eth_chainId":
+                    respuesta["result"] = "0x2105"  # Base.
+                elif metodo == "eth_getCode":
+                    respuesta["result"] = CODIGOS.get(params[0].lower(), "0x")
+                elif params[0]["to"].lower() in HONEYPOTS:
+                    respuesta["error"] = {"code": 3, "message": "execution reverted"}
+                else:
+                    respuesta["result"] = "0x" + "0" * 63 + "1"
+                respuestas.append(respuesta)
+            cuerpo = json.dumps(respuestas).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass  # Sin ruido en la consola.
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _NodoFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    reloj_falso = [0.0]
+    auditor = AuditorEVM(url, CacheAuditorias(ttl_informe=3600, ttl_codigo=30, reloj=lambda: reloj_falso[0]))
+    for ciclo in range(10):
+        if ciclo == 6:
+            # ¡Actualizan el contrato! Y el código nuevo trae un SELFDESTRUCT (0xff).
+            CODIGOS["0x4200000000000000000000000000000000000006"] = "0x60806040ff"
+        for token in CODIGOS:
+            reporte = auditor.auditar_token(token)
+            if ciclo == 6 and token.startswith("0x42"):
+                print(f"🔬 Tras la actualización: {reporte['motivo']} (sin simular)")
+        resumen = auditor.nuevo_ciclo()
+        print(f"🔁 Ciclo {ciclo} (t={reloj_falso[0]:.0f}s): {resumen['llamadas_rpc']} llamadas RPC en "
+              f"{resumen['peticiones_http']} peticiones HTTP, {resumen['aciertos_cache']}/{resumen['auditorias']} de caché, "
+              f"latencia media {resumen['latencia_media_ms']:.1f} ms")
+        reloj_falso[0] += 10  # El Scout vuelve cada 10 segundos.
+    print(f"📡 El nodo falso recibió {contador['peticiones']} peticiones con {contador['llamadas']} llamadas "
+          f"(antes: al menos 3 peticiones por auditoría = {3 * 3 * 10}).")
+    servidor.shutdown()
@@ -0,0 +1,142 @@
+# test_despachador_alertas.py
+# 🧪 PRUEBA DEL CARTERO ASÍNCRONO (SIN INTERNET)
+# Levantamos un Discord falso en nuestro propio ordenador y comprobamos que el cartero:
+# agrupa ráfagas, tira duplicados, respeta los 429 y no se desborda.
+
+import asyncio  # El cartero es asíncrono.
+import time  # Para medir esperas.
+from aiohttp import web  # Para montar el Discord falso.
+
+from nucleo.sentidos import DespachadorAlertas  # El cartero que queremos probar.
+
+
+class WebhookFalso:
+    """Discord de mentira: guarda lo que recibe y puede contestar 429 las primeras veces."""
+
+    def __init__(self, respuestas_429: int = 0, retry_after: float = 0.2):
+        self.recibidos = []  # (momento, contenido)
+        self.respuestas_429 = respuestas_429
+        self.retry_after = retry_after
+        self._runner = None
+        self.url = None
+
+    async def _recibir(self, peticion):
+        datos = await peticion.json()
+        if self.respuestas_429 > 0:
+            self.respuestas_429 -= 1
+            return web.json_response({"retry_after": self.retry_after, "global": False}, status=429)
+        self.recibidos.append((time.monotonic(), datos["content"]))
+        return web.Response(status=204)
+
+    async def arrancar(self):
+        app = web.Application()
+        app.router.add_post("/webhook", self._recibir)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        sitio = web.TCPSite(self._runner, "127.0.0.1", 0)  # Puerto libre cualquiera.
+        await sitio.start()
+        puerto = sitio._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{puerto}/webhook"
+
+    async def parar(self):
+        await self._runner.cleanup()
+
+
+def test_agrupa_rafagas_y_tira_duplicados():
+    async def _prueba():
+        discord = WebhookFalso()
+        await discord.arrancar()
+        cartero = DespachadorAlertas(discord.url, ventana_agrupado=0.1)
+        cartero.iniciar()
+
+        for i in range(5):
+            cartero.encolar(f"Aviso {i}")
+        cartero.encolar("Aviso 0")  # Duplicado dentro de la ventana.
+
+        await cartero.detener()
+        await discord.parar()
+        return discord, cartero
+
+    discord, cartero = asyncio.run(_prueba())
+    assert len(discord.recibidos) == 1, "La ráfaga debe llegar en un solo resumen"
+    contenido = discord.recibidos[0][1]
+    assert "RESUMEN (5 avisos)" in contenido
+    assert all(f"Aviso {i}" in contenido for i in range(5))
+    assert cartero.metricas["duplicados"] == 1
+
+
+def test_respeta_retry_after_del_429():
+    async def _prueba():
+        discord = WebhookFalso(respuestas_429=2, retry_after=0.2)
+        await discord.arrancar()
+        cartero = DespachadorAlertas(discord.url, ventana_agrupado=0)
+        cartero.iniciar()
+        inicio = time.monotonic()
+        cartero.encolar("Hola")
+        await cartero.detener()
+        await discord.parar()
+        return discord, cartero, inicio
+
+    discord, cartero, inicio = asyncio.run(_prueba())
+    assert len(discord.recibidos) == 1
+    assert cartero.metricas["reintentos_429"] == 2
+    # Dos esperas de 0.2 s antes de que Discord acepte la carta.
+    assert discord.recibidos[0][0] - inicio >= 0.4
+
+
+def test_politica_de_desborde():
+    async def _prueba():
+        antigua = DespachadorAlertas("http://127.0.0.1:9/nadie", capacidad=3, politica_desborde="DESCARTAR_ANTIGUA")
+        nueva = DespachadorAlertas("http://127.0.0.1:9/nadie", capacidad=3, politica_desborde="DESCARTAR_NUEVA")
+        resultados_nueva = [nueva.encolar(f"m{i}") for i in range(5)]
+        for i in range(5):
+            antigua.encolar(f"m{i}")
+        return antigua, nueva, resultados_nueva
+
+    antigua, nueva, resultados_nueva = asyncio.run(_prueba())
+    assert list(antigua._bandeja) == ["m2", "m3", "m4"]
+    assert list(nueva._bandeja) == ["m0", "m1", "m2"]
+    assert resultados_nueva == [True, True, True, False, False]
+    assert antigua.metricas["desbordes"] == 2 and nueva.metricas["desbordes"] == 2
+
+    # Una carta descartada no se mandó nunca: si vuelve a llegar no es un duplicado.
+    nueva._bandeja.clear()
+    assert nueva.encolar("m3") is True
+    assert antigua.encolar("m0") is True
+    assert nueva.metricas["duplicados"] == 0 and antigua.metricas["duplicados"] == 0
+
+
+def test_encolar_no_bloquea_aunque_discord_sea_lento():
+    async def _prueba():
+        async def _lento(peticion):
+            await asyncio.sleep(1.0)  # Discord tarda un segundo en contestar.
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.router.add_post("/webhook", _lento)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        sitio = web.TCPSite(runner, "127.0.0.1", 0)
+        await sitio.start()
+        puerto = sitio._server.sockets[0].getsockname()[1]
+
+        cartero = DespachadorAlertas(f"http://127.0.0.1:{puerto}/webhook", ventana_agrupado=0)
+        cartero.iniciar()
+        cartero.encolar("primero")
+        await asyncio.sleep(0.05)  # El cartero ya está esperando a Discord.
+        inicio = time.perf_counter()
+        for i in range(100):
+            cartero.encolar(f"aviso {i}")
+        duracion = time.perf_counter() - inicio
+        await cartero.detener()
+        await runner.cleanup()
+        return duracion
+
+    assert asyncio.run(_prueba()) < 0.05, "Encolar debe ser instantáneo"
+
+
+if __name__ == "__main__":
+    for prueba in (test_agrupa_rafagas_y_tira_duplicados, test_respeta_retry_after_del_429,
+                   test_politica_de_desborde, test_encolar_no_bloquea_aunque_discord_sea_lento):
+        prueba()
+        print(f"✅ {prueba.__name__}")
@@ -0,0 +1,44 @@
+# test_estadisticas_estrategia.py
+# 🧪 PRUEBA DE LAS ESTADÍSTICAS QUE SOBREVIVEN A LOS REINICIOS
+# Lo que cada estrategia lleva hecho en vivo tiene que seguir ahí después de un apagón
+# (solo diario, sin foto limpia) y después de un apagado ordenado: Kelly no puede volver a empezar de cero.
+
+import numpy as np
+
+from nucleo.estadisticas_estrategia import EstadisticasEstrategias  # Lo que queremos probar.
+
+
+def _apagon(estadisticas: EstadisticasEstrategias):
+    """Cerramos el diario sin foto limpia, como si se fuera la luz."""
+    estadisticas.memoria._journal.flush()
+    estadisticas.memoria._journal.close()
+
+
+def test_las_estadisticas_sobreviven_a_un_apagon_y_a_un_apagado(tmp_path):
+    ruta = str(tmp_path / "estadisticas.json")
+    rng = np.random.default_rng(24)
+
+    estadisticas = EstadisticasEstrategias(ruta, decaimiento=0.99)
+    for _ in range(200):
+        estadisticas.registrar("BUENA", 0.02 if rng.random() < 0.55 else -0.01)
+    estadisticas.registrar("NUEVA", -0.01)
+    antes = estadisticas.resumen()
+    kelly_antes = estadisticas.parametros("BUENA", 0.5, 2.0)
+    _apagon(estadisticas)
+
+    # Reinicio tras el apagón: todo sale del diario.
+    estadisticas = EstadisticasEstrategias(ruta, decaimiento=0.99)
+    assert estadisticas.resumen() == antes
+    assert estadisticas.parametros("BUENA", 0.5, 2.0) == kelly_antes
+
+    # Seguimos operando y apagamos bien: la foto limpia lleva lo de antes y lo de después.
+    estadisticas.registrar("BUENA", 0.02)
+    despues = estadisticas.resumen()
+    estadisticas.cerrar()
+
+    estadisticas = EstadisticasEstrategias(ruta, decaimiento=0.99)
+    assert estadisticas.resumen() == despues
+    assert despues["BUENA"]["operaciones"] == antes["BUENA"]["operaciones"] + 1
+    # Una estrategia sin operaciones en vivo sigue usando lo que midió el laboratorio.
+    assert estadisticas.parametros("SIN_OPERAR", 0.4, 1.5) == (0.4, 1.5)
+    estadisticas.cerrar()
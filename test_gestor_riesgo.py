@@ -0,0 +1,24 @@
+# test_gestor_riesgo.py
+# 🧪 PRUEBA DE LAS FASES DE KELLY CON STOP Y APALANCAMIENTO
+# El 20% es el tope de la apuesta (lo que se pierde en el stop), no del margen:
+# con un stop típico, cada fase de riqueza tiene que seguir dando un tamaño distinto.
+
+from nucleo.gestor_riesgo import QuantEngine, LIMITE_APUESTA
+
+
+def _riesgo_relativo(capital, prob_win, ratio, stop, **opciones):
+    motor = QuantEngine(capital, **opciones)
+    return float(motor.calcular_kelly_lote(prob_win, ratio, stop, apalancamiento=5)["riesgo"][0]) / capital
+
+
+def test_las_tres_fases_dan_tamanos_distintos_con_un_stop_tipico():
+    # Stop de 2 ATR (~1% en 15m) y una estrategia con ventaja: 40% de acierto a ratio 2.
+    riesgos = [_riesgo_relativo(c, 0.4, 2.0, 0.01) for c in (500.0, 5_000.0, 500_000.0)]
+    assert riesgos[0] > riesgos[1] > riesgos[2] > 0
+
+
+def test_el_limite_es_de_la_apuesta_y_el_tope_de_margen_es_aparte():
+    # Stop ancho: el presupuesto no aprieta y manda el 20% de la apuesta.
+    assert abs(_riesgo_relativo(500.0, 0.9, 3.0, 0.2) - LIMITE_APUESTA) < 1e-12
+    # Con tope de margen explícito, el riesgo queda en tope x apalancamiento x stop.
+    assert abs(_riesgo_relativo(500.0, 0.9, 3.0, 0.01, limite_margen=0.2) - 0.2 * 5 * 0.01) < 1e-12
@@ -0,0 +1,67 @@
+# test_memoria_estado.py
+# 🧪 PRUEBA DE LA MEMORIA A PRUEBA DE APAGONES
+# Un apagón deja la última línea del diario a medio escribir. La memoria tiene que:
+# ignorarla al arrancar, cortarla del diario y seguir apuntando detrás sin perder nada
+# en los arranques siguientes.
+
+import os  # Para mirar el diario.
+import json  # Para leerlo línea a línea.
+
+from nucleo.memoria_estado import GestorEstado  # La memoria que queremos probar.
+
+
+def _apagon(gestor: GestorEstado):
+    """Cerramos el diario sin foto limpia, como si se fuera la luz."""
+    gestor._journal.flush()
+    gestor._journal.close()
+
+
+def test_cola_rota_se_corta_y_no_se_pierde_nada_en_dos_reinicios(tmp_path):
+    ruta = str(tmp_path / "estado_bot.json")
+
+    gestor = GestorEstado(ruta)
+    gestor.actualizar(capital=20.0)
+    _apagon(gestor)
+    # El apagón pilló una línea a medias.
+    with open(gestor.ruta_journal, "a", encoding="utf-8") as f:
+        f.write('{"n":2,"k":"capital","v":99')
+
+    # Primer reinicio: la línea rota no cuenta, y lo nuevo se apunta detrás.
+    gestor = GestorEstado(ruta)
+    assert gestor.obtener("capital") == 20.0
+    gestor.actualizar(capital=30.0, posiciones=[1])
+    _apagon(gestor)
+
+    # Segundo reinicio: lo apuntado después del apagón tiene que seguir ahí.
+    gestor = GestorEstado(ruta)
+    assert gestor.obtener("capital") == 30.0
+    assert gestor.obtener("posiciones") == [1]
+    gestor.actualizar(capital=40.0)
+    _apagon(gestor)
+
+    # Tercer arranque, y el diario entero es legible línea a línea.
+    gestor = GestorEstado(ruta)
+    assert gestor.obtener("capital") == 40.0
+    assert gestor.obtener("posiciones") == [1]
+    with open(gestor.ruta_journal, "r", encoding="utf-8") as f:
+        assert [json.loads(linea)["n"] for linea in f] == [1, 2, 3, 4]
+    gestor.cerrar()
+
+
+def test_trae_la_memoria_de_la_ruta_heredada(tmp_path):
+    antigua = str(tmp_path / "estado_bot.json")
+    gestor = GestorEstado(antigua)
+    gestor.actualizar(capital=55.0)
+    _apagon(gestor)  # El último cambio solo está en el diario antiguo.
+
+    nueva = str(tmp_path / "datos" / "estado_bot.json")
+    gestor = GestorEstado(nueva, ruta_heredada=antigua)
+    assert gestor.obtener("capital") == 55.0
+    assert os.path.exists(nueva)  # Ya quedó en la foto nueva.
+    gestor.cerrar()
+
+    # Y desde ahora manda la ruta nueva, aunque la antigua siga ahí.
+    gestor = GestorEstado(nueva, ruta_heredada=antigua)
+    gestor.actualizar(capital=60.0)
+    gestor.cerrar()
+    assert GestorEstado(nueva, ruta_heredada=antigua).obtener("capital") == 60.0
@@ -0,0 +1,86 @@
+# test_volman_incremental.py
+# 🧪 PRUEBA DE PARIDAD: VOLMAN EN DIRECTO vs VOLMAN VECTORIZADO
+# El analista incremental tiene que dar EXACTAMENTE las mismas señales que el vectorizado,
+# vela a vela, sobre historias sintéticas con tendencias, rangos estrechos y dojis.
+
+import numpy as np  # Para fabricar mercados falsos.
+import pandas as pd  # Para la tabla del vectorizado.
+import pytest  # Para las pruebas parametrizadas.
+
+from nucleo.estrategia_volman import AnalistaVolmanVectorizado  # La referencia.
+from nucleo.indicadores_streaming import AnalistaVolmanIncremental  # El que probamos.
+
+COLUMNAS_FLOTANTES = ["EMA_20", "ATR", "donchian_high", "donchian_low", "block_height", "dist_ema"]
+
+
+def _mercado_falso(n: int, semilla: int) -> pd.DataFrame:
+    """Historia OHLCV con tramos tranquilos (para cajas comprimidas) y muchos dojis."""
+    rng = np.random.default_rng(semilla)
+    volatilidad = np.where((np.arange(n) // 50) % 2 == 0, 0.05, 0.6)  # Alternamos calma y nervios.
+    cierres = 100 + np.cumsum(rng.normal(0, 1, n) * volatilidad)
+    aperturas = np.roll(cierres, 1)
+    aperturas[0] = cierres[0]
+    dojis = rng.random(n) < 0.2
+    aperturas[dojis] = cierres[dojis] + rng.normal(0, 0.001, dojis.sum())
+    maximos = np.maximum(aperturas, cierres) + rng.uniform(0, 0.3, n) * volatilidad
+    minimos = np.minimum(aperturas, cierres) - rng.uniform(0, 0.3, n) * volatilidad
+    return pd.DataFrame({
+        "timestamp": np.arange(n) * 900000, "open": aperturas, "high": maximos,
+        "low": minimos, "close": cierres, "volume": np.ones(n),
+    })
+
+
+def _incremental(df: pd.DataFrame, **parametros) -> pd.DataFrame:
+    analista = AnalistaVolmanIncremental(**parametros)
+    filas = [analista.actualizar(vela) for vela in df.to_numpy().tolist()]
+    return pd.DataFrame(filas).astype({c: float for c in COLUMNAS_FLOTANTES})
+
+
+@pytest.mark.parametrize("semilla, factores", [
+    (1, {}), (2, {}), (3, {}),
+    # Una pareja que no es la de serie (como las que prueba el barrido): los factores tienen que llegar.
+    (1, {"factor_compresion": 2.5, "factor_cercania": 1.0}),
+    (2, {"factor_compresion": 1.0, "factor_cercania": 0.25}),
+])
+def test_senales_identicas_al_vectorizado(semilla, factores):
+    df = _mercado_falso(3000, semilla)
+    vectorizado = AnalistaVolmanVectorizado(**factores).populate_signals(df.copy())
+    directo = _incremental(df, **factores)
+
+    assert vectorizado["enter_long"].sum() > 0, "El mercado falso debe producir alguna entrada"
+    np.testing.assert_array_equal(directo["enter_long"].to_numpy(), vectorizado["enter_long"].to_numpy())
+    np.testing.assert_array_equal(directo["exit_long"].to_numpy(), vectorizado["exit_long"].to_numpy())
+    np.testing.assert_array_equal(directo["is_doji"].to_numpy(), vectorizado["is_doji"].to_numpy().astype(bool))
+
+
+@pytest.mark.parametrize("semilla", [1, 2])
+def test_indicadores_identicos_al_vectorizado(semilla):
+    df = _mercado_falso(1000, semilla)
+    vectorizado = AnalistaVolmanVectorizado().populate_indicators(df.copy())
+    directo = _incremental(df)
+    for columna in COLUMNAS_FLOTANTES:
+        np.testing.assert_allclose(directo[columna].to_numpy(), vectorizado[columna].to_numpy(),
+                                   rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=columna)
+
+
+def test_vela_sin_cerrar_no_se_duplica():
+    df = _mercado_falso(300, 5)
+    velas = df.to_numpy().tolist()
+
+    limpio = AnalistaVolmanIncremental()
+    esperado = [limpio.actualizar(v) for v in velas][-1]
+
+    # Mandamos cada vela tres veces: dos versiones "a medias" y la definitiva.
+    repetido = AnalistaVolmanIncremental()
+    for vela in velas:
+        a_medias = list(vela)
+        a_medias[4] = vela[1]  # Cierre provisional = apertura.
+        repetido.actualizar(a_medias)
+        repetido.actualizar([vela[0], vela[1], vela[2] + 5, vela[3] - 5, vela[4] + 1, vela[5]])
+        ultimo = repetido.actualizar(vela)
+
+    for clave, valor in esperado.items():
+        if isinstance(valor, float):
+            assert ultimo[clave] == pytest.approx(valor, rel=1e-12), clave
+        else:
+            assert ultimo[clave] == valor, clave
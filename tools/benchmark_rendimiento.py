@@ -0,0 +1,232 @@
+# tools/benchmark_rendimiento.py
+# ⏱️ BANCO DE PRUEBAS DE RENDIMIENTO (SIN INTERNET)
+# Mide los caminos calientes de la estrategia y del backtest con velas sintéticas
+# (1k / 100k / 10M filas): velocidad, memoria máxima y comparación con una base guardada.
+# Si algo va más lento que la base por encima del umbral, el programa sale con error.
+#
+# Uso:
+#   python tools/benchmark_rendimiento.py                    # Compara con la base (y le añade los casos nuevos).
+#   python tools/benchmark_rendimiento.py --tamanos 1k,100k  # Solo los tamaños pequeños.
+#   python tools/benchmark_rendimiento.py --guardar-base     # Sobrescribe en la base lo medido en esta máquina.
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Configuración
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)  # Para poder importar 'nucleo' y 'config' desde aquí.
+# La base depende de la máquina: vive en 'cache/' (fuera de git), no junto al código.
+ARCHIVO_BASE = os.path.join(ROOT_DIR, "cache", "benchmark_base.json")
+TAMANOS = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+UMBRAL_REGRESION = 0.25  # Más de un 25% más lento que la base = regresión.
+MAX_LLAMADAS_KELLY = 1_000_000  # Kelly es escalar: no tiene sentido llamarlo 10 millones de veces.
+TIEMPO_MINIMO = 0.2  # Los casos rapidísimos se repiten hasta sumar al menos esto (menos ruido).
+MAX_REPETICIONES = 1000
+
+
+def velas_sinteticas(n: int, semilla: int = 42) -> pd.DataFrame:
+    """Velas OHLCV de 15 minutos con paseo aleatorio (siempre las mismas para la misma semilla)."""
+    rng = np.random.default_rng(semilla)
+    cierres = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    aperturas = np.concatenate([[cierres[0]], cierres[:-1]]) * (1 + rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "timestamp": np.arange(n, dtype=np.int64) * 900_000,
+        "open": aperturas,
+        "high": np.maximum(aperturas, cierres) * (1 + rng.uniform(0, 0.002, n)),
+        "low": np.minimum(aperturas, cierres) * (1 - rng.uniform(0, 0.002, n)),
+        "close": cierres,
+        "volume": rng.uniform(1, 100, n),
+    })
+
+
+# --- CASOS (cada uno devuelve (preparar, medir, unidades)) ---
+# 'preparar' se ejecuta fuera del cronómetro; 'medir' es lo que se cronometra.
+
+def caso_populate_indicators(datos):
+    from nucleo.estrategia_volman import AnalistaVolmanVectorizado
+    analista = AnalistaVolmanVectorizado()
+    return (lambda: datos.copy()), analista.populate_indicators, len(datos)
+
+
+def caso_populate_signals(datos):
+    from nucleo.estrategia_volman import AnalistaVolmanVectorizado
+    analista = AnalistaVolmanVectorizado()
+    con_indicadores = analista.populate_indicators(datos.copy())
+    return (lambda: con_indicadores.copy()), analista.populate_signals, len(datos)
+
+
+def caso_simular_estrategia(datos):
+    from nucleo.laboratorio_genetico import LaboratorioGenetico
+    lab = LaboratorioGenetico()
+    estrategia = {"nombre": "PATRON_NISON_ENGULFING_ALCISTA"}
+    return (lambda: datos), (lambda d: lab.simular_estrategia(d, estrategia)), len(datos)
+
+
+def caso_walk_forward_analysis(datos):
+    from nucleo.laboratorio_genetico import LaboratorioGenetico
+    lab = LaboratorioGenetico()
+    estrategia = {"nombre": "PATRON_NISON_MARTILLO"}
+    return (lambda: datos), (lambda d: lab.walk_forward_analysis(d, estrategia)), len(datos)
+
+
+def caso_calcular_kelly_adaptativo(datos):
+    from nucleo.gestor_riesgo import QuantEngine
+    llamadas = min(len(datos), MAX_LLAMADAS_KELLY)
+    # Capitales y probabilidades variados para recorrer las tres fases.
+    capitales = (datos["close"].to_numpy()[:llamadas] * 1000).tolist()
+    probabilidades = np.linspace(0.3, 0.7, llamadas).tolist()
+    motor = QuantEngine()
+
+    def _medir(_):
+        for capital, prob in zip(capitales, probabilidades):
+            motor.capital = capital
+            motor.calcular_kelly_adaptativo(prob, 2.0)
+
+    return (lambda: None), _medir, llamadas
+
+
+def caso_calcular_kelly_lote(datos):
+    from nucleo.gestor_riesgo import QuantEngine
+    candidatas = min(len(datos), MAX_LLAMADAS_KELLY)
+    # Las mismas probabilidades que el caso escalar, con stops del 0.5% al 5% (un ciclo con N señales).
+    probabilidades = np.linspace(0.3, 0.7, candidatas)
+    distancias = np.linspace(0.005, 0.05, candidatas)
+    motor = QuantEngine(capital_inicial=5_000.0)
+    return (lambda: None), (lambda _: motor.calcular_kelly_lote(probabilidades, 2.0, distancias)), candidatas
+
+
+CASOS = {
+    "populate_indicators": caso_populate_indicators,
+    "populate_signals": caso_populate_signals,
+    "simular_estrategia": caso_simular_estrategia,
+    "walk_forward_analysis": caso_walk_forward_analysis,
+    "calcular_kelly_adaptativo": caso_calcular_kelly_adaptativo,
+    "calcular_kelly_lote": caso_calcular_kelly_lote,
+}
+
+
+def medir_caso(nombre: str, datos: pd.DataFrame, repeticiones: int) -> dict:
+    """
+    Cronometra un caso (el mejor de al menos N intentos; los muy rápidos se repiten
+    hasta sumar TIEMPO_MINIMO) y mide su memoria máxima en una pasada aparte.
+    """
+    preparar, medir, unidades = CASOS[nombre](datos)
+
+    mejor, acumulado, intentos = float("inf"), 0.0, 0
+    while intentos < repeticiones or (acumulado < TIEMPO_MINIMO and intentos < MAX_REPETICIONES):
+        entrada = preparar()
+        inicio = time.perf_counter()
+        medir(entrada)
+        duracion = time.perf_counter() - inicio
+        mejor = min(mejor, duracion)
+        acumulado += duracion
+        intentos += 1
+
+    # Memoria: NumPy y pandas avisan a tracemalloc de sus reservas.
+    entrada = preparar()
+    tracemalloc.start()
+    medir(entrada)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "segundos": mejor,
+        "unidades_por_segundo": unidades / mejor if mejor > 0 else float("inf"),
+        "pico_mb": pico / 1e6,
+    }
+
+
+def cargar_base() -> dict:
+    try:
+        with open(ARCHIVO_BASE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_base(resultados: dict):
+    os.makedirs(os.path.dirname(ARCHIVO_BASE), exist_ok=True)
+    with open(ARCHIVO_BASE, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "maquina": f"{platform.node()} | {platform.processor() or platform.machine()} | Python {platform.python_version()}",
+            "resultados": resultados,
+        }, f, indent=4)
+    print(f"💾 Base guardada en {ARCHIVO_BASE}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento de ZEROX (sin internet).")
+    parser.add_argument("--tamanos", default=",".join(TAMANOS), help="Tamaños a medir (p. ej. 1k,100k,10M).")
+    parser.add_argument("--casos", default=",".join(CASOS), help="Casos a medir (separados por comas).")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por caso (se queda con la mejor).")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION, help="Pérdida de velocidad tolerada (0.25 = 25%%).")
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda estos resultados como nueva base.")
+    args = parser.parse_args()
+
+    tamanos = [t.strip() for t in args.tamanos.split(",") if t.strip()]
+    casos = [c.strip() for c in args.casos.split(",") if c.strip()]
+    desconocidos = [t for t in tamanos if t not in TAMANOS]
+    if desconocidos:
+        parser.error(f"tamaño desconocido: {', '.join(desconocidos)} (hay: {', '.join(TAMANOS)})")
+    desconocidos = [c for c in casos if c not in CASOS]
+    if desconocidos:
+        parser.error(f"caso desconocido: {', '.join(desconocidos)} (hay: {', '.join(CASOS)})")
+    base = cargar_base()
+    resultados_base = base.get("resultados", {})
+    if base:
+        print(f"📏 Base del {base.get('fecha')} ({base.get('maquina')})")
+
+    resultados, regresiones = {}, []
+    for tamano in tamanos:
+        datos = velas_sinteticas(TAMANOS[tamano])
+        # Los tamaños enormes se miden una sola vez (ya tardan lo suficiente).
+        repeticiones = 1 if TAMANOS[tamano] >= 1_000_000 else args.repeticiones
+        for caso in casos:
+            clave = f"{caso}@{tamano}"
+            try:
+                medida = medir_caso(caso, datos, repeticiones)
+            except ImportError as e:
+                print(f"⚠️ {clave}: no se puede medir ({e}).")
+                continue
+            resultados[clave] = medida
+
+            linea = (f"{clave:38s} {medida['segundos'] * 1000:10.1f} ms  "
+                     f"{medida['unidades_por_segundo']:14,.0f} u/s  {medida['pico_mb']:9.1f} MB")
+            anterior = resultados_base.get(clave)
+            if anterior:
+                cambio = medida["unidades_por_segundo"] / anterior["unidades_por_segundo"] - 1
+                linea += f"  {cambio:+7.1%}"
+                if cambio < -args.umbral:
+                    linea += "  🐢 REGRESIÓN"
+                    regresiones.append(clave)
+            print(linea)
+        del datos
+
+    # Con --guardar-base, lo medido sustituye a lo guardado. Si no, solo se añaden a la base los casos que
+    # aún no tenía (los que se midieron por primera vez): los que ya tenían base no se tocan.
+    if args.guardar_base:
+        guardar_base({**resultados_base, **resultados})
+    else:
+        nuevos = {clave: medida for clave, medida in resultados.items() if clave not in resultados_base}
+        if nuevos:
+            print(f"➕ {len(nuevos)} casos sin base: se añaden ({', '.join(nuevos)}).")
+            guardar_base({**resultados_base, **nuevos})
+
+    if regresiones:
+        print(f"❌ {len(regresiones)} regresiones por encima del {args.umbral:.0%}: {', '.join(regresiones)}")
+        sys.exit(1)
+    print("✅ Sin regresiones.")
+
+
+if __name__ == "__main__":
+    main()